@@ -0,0 +1,623 @@
+import os, sys
+sys.path.insert(1, os.path.join(os.path.dirname(os.path.abspath(__file__)), "modules"))
+
+import glob
+import json
+import time
+
+from modules.hunt_wumpus_model import HuntWumpusCostModel, HuntWumpusNode, HuntWumpusProblem
+from search_algorithms import SearchStatistics, astar_search, lazy_astar_search, partial_expansion_astar_search, ucs_search
+from solve import DEFAULT_HEURISTIC, load_heuristic
+from world_generator import generate_world
+
+# Benchmarks of the search algorithms on generated worlds and on the worlds of the data folder, they only need the problem model
+# (not the wumpus environment).
+#
+# usage: python benchmarks.py [BENCHMARK_NAME]
+
+def _generate_worlds(size, seeds, **world_options):
+    worlds = [generate_world(size, seed=seed, **world_options) for seed in seeds]
+    return [world for world in worlds if world is not None]
+
+
+def _load_data_worlds():
+    worlds = []
+    for path in sorted(glob.glob(os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "*.json"))):
+        with open(path) as world_file:
+            worlds.append((os.path.splitext(os.path.basename(path))[0], json.load(world_file)))
+    return worlds
+
+
+def benchmark_parallel_astar(size=(24, 24), seeds=(1, 2, 3), workers=(2, 4, 8)):
+    """Compare the parallel A* (HDA*) with the sequential A* search on generated worlds."""
+    from parallel_astar import ParallelSearchStatistics, parallel_astar_search
+
+    heuristic_func = load_heuristic(DEFAULT_HEURISTIC)
+    print(f"CPUs available: {os.cpu_count()}")
+    print(f"{'world':>8} {'workers':>8} {'reward':>8} {'nodes':>8} {'batches':>8} {'time':>9} {'speedup':>8}")
+
+    for world in _generate_worlds(size, seeds, wumpuses=2):
+        statistics = SearchStatistics()
+        start_time = time.perf_counter()
+        result = astar_search(HuntWumpusProblem.from_dict(world, heuristic_func=heuristic_func), statistics)
+        sequential_time = time.perf_counter() - start_time
+        name = world["id"].split("(")[1].split(",")[0]
+        print(f"{name:>8} {'A*':>8} {result.total_reward:>8} {statistics.visited_nodes:>8} {'':>8} "
+              + f"{sequential_time:>8.2f}s {1:>8.2f}")
+
+        for worker_count in workers:
+            statistics = ParallelSearchStatistics()
+            start_time = time.perf_counter()
+            result = parallel_astar_search(world, DEFAULT_HEURISTIC, worker_count, statistics=statistics)
+            parallel_time = time.perf_counter() - start_time
+            print(f"{name:>8} {worker_count:>8} {result.total_reward:>8} {statistics.visited_nodes:>8} "
+                  + f"{statistics.sent_batches:>8} {parallel_time:>8.2f}s {sequential_time / parallel_time:>8.2f}")
+
+
+def benchmark_lazy_astar(size=(16, 16), seeds=range(1, 6), heuristic="heuristic_func_best_neighbour_smart_manhattan"):
+    """Compare the heuristic evaluations and the time of lazy A* with the ones of A* on generated worlds."""
+    heuristic_func = load_heuristic(heuristic)
+    print(f"{'world':>8} {'reward':>8} {'nodes':>8} {'lazy':>8} {'evaluated':>10} {'avoided':>8} {'time':>9} {'lazy':>9}")
+
+    for world in _generate_worlds(size, seeds, wumpuses=2, pit_ratio=0.15):
+        name = world["id"].split("(")[1].split(",")[0]
+
+        statistics = SearchStatistics()
+        start_time = time.perf_counter()
+        result = astar_search(HuntWumpusProblem.from_dict(world, heuristic_func=heuristic_func), statistics)
+        search_time = time.perf_counter() - start_time
+
+        lazy_statistics = SearchStatistics()
+        start_time = time.perf_counter()
+        lazy_result = lazy_astar_search(HuntWumpusProblem.from_dict(world, heuristic_func=heuristic_func), lazy_statistics)
+        lazy_search_time = time.perf_counter() - start_time
+
+        assert result.total_reward == lazy_result.total_reward
+        print(f"{name:>8} {result.total_reward:>8} {statistics.visited_nodes:>8} {lazy_statistics.visited_nodes:>8} "
+              + f"{lazy_statistics.heuristic_evaluations:>10} {lazy_statistics.avoided_heuristic_evaluations:>8} "
+              + f"{search_time:>8.2f}s {lazy_search_time:>8.2f}s")
+
+
+def benchmark_partial_expansion_astar(sizes=((20, 20), (32, 32)), seeds=range(1, 6)):
+    """Compare the largest frontier, the peak memory and the expansions of partial expansion A* with the ones of A* on generated worlds."""
+    import tracemalloc
+
+    heuristic_func = load_heuristic(DEFAULT_HEURISTIC)
+    print(f"{'world':>8} {'size':>6} {'reward':>8} {'nodes':>8} {'PEA*':>8} {'frontier':>9} {'PEA*':>8} "
+          + f"{'memory':>9} {'PEA*':>9} {'time':>9} {'PEA*':>9}")
+
+    for size in sizes:
+        for world in _generate_worlds(size, seeds, wumpuses=2, pit_ratio=0.15):
+            name = world["id"].split("(")[1].split(",")[0]
+            measures = []
+
+            for search in (astar_search, partial_expansion_astar_search):
+                problem = HuntWumpusProblem.from_dict(world, heuristic_func=heuristic_func)
+                # the world constants of the heuristic are computed before measuring the memory
+                problem.heuristic_func(problem.initial_state)
+                statistics = SearchStatistics()
+                tracemalloc.start()
+                start_time = time.perf_counter()
+                result = search(problem, statistics)
+                search_time = time.perf_counter() - start_time
+                peak_memory = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+                measures.append((result.total_reward, statistics, peak_memory, search_time))
+
+            (reward, statistics, peak_memory, search_time), \
+                (pea_reward, pea_statistics, pea_peak_memory, pea_search_time) = measures
+            assert reward == pea_reward
+            print(f"{name:>8} {size[0]:>6} {reward:>8} {statistics.visited_nodes:>8} {pea_statistics.visited_nodes:>8} "
+                  + f"{statistics.max_frontier_size:>9} {pea_statistics.max_frontier_size:>8} "
+                  + f"{peak_memory / 1e3:>7.1f}KB {pea_peak_memory / 1e3:>7.1f}KB "
+                  + f"{search_time:>8.2f}s {pea_search_time:>8.2f}s")
+
+
+def benchmark_hierarchical_search(sizes=((16, 16), (32, 32), (48, 48)), seeds=(1, 2), pit_ratios=(0.1, 0.25)):
+    """Compare the time and the reward of the hierarchical search (HPA*) with the ones of A* on large generated worlds."""
+    from hierarchical_search import HierarchicalGraph, HierarchicalSearchStatistics, hierarchical_search
+
+    heuristic_func = load_heuristic(DEFAULT_HEURISTIC)
+    print(f"{'world':>8} {'size':>6} {'pits':>5} {'reward':>8} {'HPA*':>8} {'bound':>6} {'nodes':>8} {'HPA*':>8} "
+          + f"{'time':>9} {'build':>9} {'HPA*':>9}")
+
+    for size in sizes:
+        for pit_ratio in pit_ratios:
+            for world in _generate_worlds(size, seeds, wumpuses=2, pit_ratio=pit_ratio):
+                name = world["id"].split("(")[1].split(",")[0]
+
+                statistics = SearchStatistics()
+                start_time = time.perf_counter()
+                result = astar_search(HuntWumpusProblem.from_dict(world, heuristic_func=heuristic_func), statistics)
+                search_time = time.perf_counter() - start_time
+
+                problem = HuntWumpusProblem.from_dict(world, heuristic_func=heuristic_func)
+                start_time = time.perf_counter()
+                graph = HierarchicalGraph(problem)
+                build_time = time.perf_counter() - start_time
+
+                hierarchical_statistics = HierarchicalSearchStatistics()
+                start_time = time.perf_counter()
+                hierarchical_result = hierarchical_search(problem, hierarchical_statistics, graph=graph)
+                hierarchical_time = time.perf_counter() - start_time
+
+                print(f"{name:>8} {size[0]:>6} {pit_ratio:>5.0%} {result.total_reward:>8} "
+                      + f"{hierarchical_result.total_reward:>8} {hierarchical_statistics.suboptimality_bound:>6.2f} "
+                      + f"{statistics.visited_nodes:>8} {hierarchical_statistics.visited_nodes:>8} "
+                      + f"{search_time:>8.2f}s {build_time:>8.2f}s {hierarchical_time:>8.2f}s")
+
+
+def benchmark_multi_goal(size=(10, 10), seeds=(1, 2), golds=(2, 4, 6, 8),
+                         heuristics=("heuristic_func_multi_goal_mst", "heuristic_func_smart_manhattan", 
+                                     "heuristic_func_manhattan")):
+    """Compare the rewards, the expansions and the time of A* with the heuristics on generated worlds with several golds and two exits."""
+    heuristic_funcs = [load_heuristic(heuristic) for heuristic in heuristics]
+    print(f"{'world':>8} {'golds':>6} " + " ".join(f"{heuristic[15:]:>32}" for heuristic in heuristics))
+
+    for gold_count in golds:
+        for world in _generate_worlds(size, seeds, wumpuses=1, golds=gold_count, exits=2, pit_ratio=0.15):
+            name = world["id"].split("(")[1].split(",")[0]
+            measures = []
+
+            for heuristic_func in heuristic_funcs:
+                statistics = SearchStatistics()
+                start_time = time.perf_counter()
+                result = astar_search(HuntWumpusProblem.from_dict(world, heuristic_func=heuristic_func), statistics)
+                search_time = time.perf_counter() - start_time
+                measures.append(f"{result.total_reward:>6} {statistics.visited_nodes:>8} nodes {search_time:>8.2f}s")
+
+            print(f"{name:>8} {gold_count:>6} " + " ".join(f"{measure:>32}" for measure in measures))
+
+
+def benchmark_orientation_tables(radius=3, repetitions=200):
+    """Time a call of the orientation lookup tables and of the functions filling them on every pair of nearby locations and orientation (their equivalence with the original helpers is checked by tests/test_orientation_tables.py)."""
+    import modules.orientation_tables as orientation_tables
+    from modules.linear_space import SmartCoordinate
+
+    offsets = range(-radius, radius + 1)
+    from_location = SmartCoordinate(radius, radius)
+    cases = [(SmartCoordinate(radius + dx, radius + dy), orientation)
+             for dx in offsets for dy in offsets for orientation in orientation_tables.ALL_ORIENTATIONS]
+
+    functions = (
+        ("orientations_to_reach", 
+         lambda to_location, orientation: orientation_tables.compute_orientations_to_reach(to_location, from_location=from_location),
+         lambda to_location, orientation: orientation_tables.get_orientations_to_reach(to_location, from_location=from_location)),
+        ("orientations_to_move_away_from", 
+         lambda to_location, orientation: orientation_tables.compute_orientations_to_move_away_from(to_location, from_location=from_location),
+         lambda to_location, orientation: orientation_tables.get_orientations_to_move_away_from(to_location, from_location=from_location)),
+        ("cost_to_orientate_to", 
+         lambda to_location, orientation: orientation_tables.compute_cost_to_orientate_to(to_location, from_location=from_location, with_orientation=orientation),
+         lambda to_location, orientation: orientation_tables.get_cost_to_orientate_to(to_location, from_location=from_location, with_orientation=orientation))
+    )
+
+    print(f"{'helper':>32} {'cases':>6} {'reference':>10} {'table':>10} {'speedup':>8}")
+    for name, reference, table in functions:
+        times = []
+        for function in (reference, table):
+            start_time = time.perf_counter()
+            for _ in range(repetitions):
+                for to_location, orientation in cases:
+                    function(to_location, orientation)
+            times.append((time.perf_counter() - start_time) / (repetitions * len(cases)))
+
+        print(f"{name:>32} {len(cases):>6} {times[0] * 1e6:>8.2f}us {times[1] * 1e6:>8.2f}us {times[0] / times[1]:>8.1f}")
+
+
+def benchmark_batch_heuristics(size=(16, 16), seeds=range(1, 6), heuristic="heuristic_func_smart_manhattan", 
+                               repetitions=5):
+    """Compare the time of evaluating the heuristic of the children of every expansion of A* state by state and in one call, and the time of A* with each one."""
+    heuristic_func = load_heuristic(heuristic)
+    print(f"{'world':>8} {'expansions':>10} {'by state':>10} {'batch':>10} {'A* by state':>12} {'A* batch':>9}")
+
+    for world in _generate_worlds(size, seeds, wumpuses=2, pit_ratio=0.15):
+        name = world["id"].split("(")[1].split(",")[0]
+        search_times = []
+        # the lambda hides the batch version of the heuristic function
+        for search_heuristic_func in (lambda state: heuristic_func(state), heuristic_func):
+            problem = HuntWumpusProblem.from_dict(world, heuristic_func=search_heuristic_func)
+            start_time = time.perf_counter()
+            astar_search(problem)
+            search_times.append(time.perf_counter() - start_time)
+
+        # the children of every expansion, recorded through the batches the search evaluates
+        batches = []
+        def record_batch(states):
+            batches.append(states)
+            return heuristic_func.batch(states)
+        recording_heuristic_func = lambda state: heuristic_func(state)
+        recording_heuristic_func.batch = record_batch
+        astar_search(HuntWumpusProblem.from_dict(world, heuristic_func=recording_heuristic_func))
+
+        evaluation_times = []
+        for evaluate in (lambda states: [heuristic_func(state) for state in states], heuristic_func.batch):
+            times = []
+            for _ in range(repetitions):
+                start_time = time.perf_counter()
+                for states in batches:
+                    evaluate(states)
+                times.append(time.perf_counter() - start_time)
+            evaluation_times.append(min(times))
+
+        print(f"{name:>8} {len(batches):>10} {evaluation_times[0] * 1000:>8.1f}ms {evaluation_times[1] * 1000:>8.1f}ms "
+              + f"{search_times[0]:>11.2f}s {search_times[1]:>8.2f}s")
+
+def benchmark_canonical_states(heuristic=DEFAULT_HEURISTIC):
+    """Compare the rewards and the expansions of UCS and A* on the data worlds with and without collapsing the interchangeable terminal and exit states."""
+    heuristic_func = load_heuristic(heuristic)
+    searches = (("UCS", ucs_search, lambda state: 0), ("A*", astar_search, heuristic_func))
+    print(f"{'world':>8} {'search':>6} {'reward':>8} {'nodes':>8} {'canonical reward':>17} {'nodes':>8}")
+
+    for name, world in _load_data_worlds():
+        for search_name, search, search_heuristic_func in searches:
+            measures = []
+            for canonical in (False, True):
+                problem = HuntWumpusProblem.from_dict(world, heuristic_func=search_heuristic_func)
+                if not canonical:
+                    # every state is its own representative and exits allow every action
+                    problem.get_canonical_state = lambda state: state
+                    problem.is_exit_reached = lambda state: False
+                statistics = SearchStatistics()
+                result = search(problem, statistics)
+                measures.append((result.total_reward, statistics.visited_nodes))
+
+            print(f"{name:>8} {search_name:>6} {measures[0][0]:>8} {measures[0][1]:>8} "
+                  + f"{measures[1][0]:>17} {measures[1][1]:>8}")
+
+
+def benchmark_child_generation(repetitions=5):
+    """Time a call of get_child_from and measure the memory retained per child on the children generated by UCS on the data worlds, and the time of the whole UCS search."""
+    import gc
+    import tracemalloc
+
+    print(f"{'world':>8} {'children':>9} {'per call':>10} {'retained':>10} {'blocks':>7} {'UCS':>9}")
+    total_search_time = 0
+
+    for name, world in _load_data_worlds():
+        problem = HuntWumpusProblem.from_dict(world)
+        start_time = time.perf_counter()
+        ucs_search(problem)
+        search_time = time.perf_counter() - start_time
+        total_search_time += search_time
+
+        # the children generated by the search are recorded through the actions it asks for
+        expansions = []
+        get_best_actions_for = problem.get_best_actions_for
+        def record_actions_for(state):
+            actions = get_best_actions_for(state)
+            expansions.extend((HuntWumpusNode(state), action) for action in actions)
+            return actions
+        problem.get_best_actions_for = record_actions_for
+        ucs_search(problem)
+        if not expansions:
+            print(f"{name:>8} {0:>9} {'-':>10} {'-':>10} {'-':>7} {search_time * 1000:>7.1f}ms")
+            continue
+
+        # the best of the repetitions, the others are slowed down by the rest of the machine
+        call_times = []
+        for _ in range(repetitions):
+            start_time = time.perf_counter()
+            for node, action in expansions:
+                problem.get_child_from(node, with_action=action)
+            call_times.append((time.perf_counter() - start_time) / len(expansions))
+        call_time = min(call_times)
+
+        gc.collect()
+        tracemalloc.start()
+        snapshot = tracemalloc.take_snapshot()
+        children = [problem.get_child_from(node, with_action=action) for node, action in expansions]
+        differences = tracemalloc.take_snapshot().compare_to(snapshot, "filename")
+        tracemalloc.stop()
+        retained_bytes = sum(difference.size_diff for difference in differences) / len(children)
+        retained_blocks = sum(difference.count_diff for difference in differences) / len(children)
+
+        print(f"{name:>8} {len(children):>9} {call_time * 1e6:>8.2f}us {retained_bytes:>8.0f} B "
+              + f"{retained_blocks:>7.1f} {search_time * 1000:>7.1f}ms")
+
+    print(f"{'total':>8} {'':>9} {'':>10} {'':>10} {'':>7} {total_search_time * 1000:>7.1f}ms")
+
+
+def benchmark_cost_models():
+    """Compare the rewards, the expansions and the time of UCS on the data worlds with each cost model of the cost_models folder (the time of get_child_from is measured by benchmark_child_generation)."""
+    paths = sorted(glob.glob(os.path.join(os.path.dirname(os.path.abspath(__file__)), "cost_models", "*.json")))
+    cost_models = [HuntWumpusCostModel.load(path) for path in paths]
+    print(f"{'world':>8} " + " ".join(f"{cost_model.name:>28}" for cost_model in cost_models))
+    total_search_times = [0] * len(cost_models)
+
+    for name, world in _load_data_worlds():
+        measures = []
+        for position, cost_model in enumerate(cost_models):
+            problem = HuntWumpusProblem.from_dict(world, cost_model=cost_model)
+            statistics = SearchStatistics()
+            start_time = time.perf_counter()
+            result = ucs_search(problem, statistics)
+            search_time = time.perf_counter() - start_time
+            total_search_times[position] += search_time
+            measures.append(f"{result.total_reward:>6} {statistics.visited_nodes:>6} nodes {search_time * 1000:>7.1f}ms")
+
+        print(f"{name:>8} " + " ".join(f"{measure:>28}" for measure in measures))
+
+    print(f"{'total':>8} " + " ".join(f"{search_time * 1000:>26.1f}ms" for search_time in total_search_times))
+
+
+def benchmark_infeasibility_check(size=(16, 16), seeds=(1, 2, 4), small_worlds=300):
+    """Compare the infeasibility check with a full UCS on generated worlds with the gold walled by pits, and check on random small worlds that it never flags a world that UCS solves."""
+    import random
+
+    print(f"{'world':>8} {'check':>10} {'reason':>6} {'UCS':>10} {'nodes':>8}")
+    for world in _generate_worlds(size, seeds):
+        name = world["id"].split("(")[1].split(",")[0]
+        gold_x, gold_y = world["golds"][0]
+        world["pits"] += [[x, y] for x, y in ((gold_x + 1, gold_y), (gold_x - 1, gold_y), (gold_x, gold_y + 1), (gold_x, gold_y - 1))
+                          if 0 <= x < size[0] and 0 <= y < size[1] and [x, y] not in world["pits"] + world["exits"]]
+
+        problem = HuntWumpusProblem.from_dict(world)
+        start_time = time.perf_counter()
+        reason = problem.get_infeasibility_reason()
+        check_time = time.perf_counter() - start_time
+
+        # the full search, without the check
+        problem.get_infeasibility_reason = lambda: None
+        statistics = SearchStatistics()
+        start_time = time.perf_counter()
+        ucs_search(problem, statistics)
+        search_time = time.perf_counter() - start_time
+
+        print(f"{name:>8} {check_time * 1000:>8.2f}ms {'yes' if reason else 'no':>6} {search_time * 1000:>8.1f}ms "
+              + f"{statistics.visited_nodes:>8}")
+
+    flagged_worlds = wrongly_flagged_worlds = 0
+    for seed in range(small_worlds):
+        generator = random.Random(seed)
+        width, height = generator.randint(3, 7), generator.randint(3, 7)
+        cells = [[x, y] for x in range(width) for y in range(height)]
+        generator.shuffle(cells)
+        world = {"size": [width, height], "hunters": [cells[0] + ["N"]], "exits": [cells[generator.randint(0, 2)]],
+                 "golds": [cells[3]], "wumpuses": cells[4:4 + generator.randint(0, 3)],
+                 "pits": cells[7:7 + generator.randint(0, len(cells) // 3)], "blocks": []}
+
+        problem = HuntWumpusProblem.from_dict(world)
+        reason = problem.get_infeasibility_reason()
+        problem.get_infeasibility_reason = lambda: None
+        if reason is not None:
+            flagged_worlds += 1
+            if ucs_search(problem).sequence_actions:
+                wrongly_flagged_worlds += 1
+
+    print(f"{small_worlds} random small worlds: {flagged_worlds} flagged as unsolvable, "
+          + f"{wrongly_flagged_worlds} of them solved by UCS")
+
+
+def benchmark_dense_closed_list(sizes=((8, 8), (16, 16), (24, 24)), seeds=(1, 2)):
+    """Compare the peak memory and the time of A* and UCS storing the closed list in an array (DenseReached) with the ones using a dict."""
+    import tracemalloc
+
+    heuristic_func = load_heuristic(DEFAULT_HEURISTIC)
+    print(f"{'world':>8} {'size':>6} {'search':>7} {'nodes':>8} {'indexes':>9} {'dict':>9} {'dense':>9} {'time':>9} {'dense':>9}")
+
+    for size in sizes:
+        for world in _generate_worlds(size, seeds, wumpuses=2, pit_ratio=0.15):
+            name = world["id"].split("(")[1].split(",")[0]
+
+            for search_name, search, heuristic in (("A*", astar_search, heuristic_func), ("UCS", ucs_search, None)):
+                measures = []
+                for dense_closed_list in (False, True):
+                    problem = HuntWumpusProblem.from_dict(world, heuristic_func=heuristic or (lambda state: 0))
+                    statistics = SearchStatistics()
+                    tracemalloc.start()
+                    start_time = time.perf_counter()
+                    result = search(problem, statistics, dense_closed_list=dense_closed_list)
+                    search_time = time.perf_counter() - start_time
+                    peak_memory = tracemalloc.get_traced_memory()[1]
+                    tracemalloc.stop()
+                    measures.append((result.total_reward, peak_memory, search_time))
+
+                (reward, peak_memory, search_time), (dense_reward, dense_peak_memory, dense_search_time) = measures
+                assert reward == dense_reward
+                print(f"{name:>8} {size[0]:>6} {search_name:>7} {statistics.visited_nodes:>8} {problem.state_index_size:>9} "
+                      + f"{peak_memory / 1e6:>7.2f}MB {dense_peak_memory / 1e6:>7.2f}MB "
+                      + f"{search_time:>8.2f}s {dense_search_time:>8.2f}s")
+
+
+def benchmark_external_search(sizes=((16, 16), (24, 24)), seeds=(1, 2), buffer_sizes=(1 << 10, 1 << 16)):
+    """Compare the peak memory, the time and the I/O of UCS keeping the closed list on disk (external_search.py) with the UCS in memory."""
+    import tracemalloc
+    from external_search import ExternalSearchStatistics, external_ucs_search
+
+    print(f"{'world':>8} {'size':>6} {'buffer':>8} {'reward':>8} {'nodes':>8} {'memory':>9} {'time':>9} "
+          + f"{'merges':>7} {'read':>9} {'written':>9} {'io time':>8}")
+
+    for size in sizes:
+        for world in _generate_worlds(size, seeds, wumpuses=2, pit_ratio=0.15):
+            name = world["id"].split("(")[1].split(",")[0]
+
+            for buffer_size in (None,) + tuple(buffer_sizes):
+                problem = HuntWumpusProblem.from_dict(world)
+                tracemalloc.start()
+                start_time = time.perf_counter()
+                if buffer_size is None:
+                    statistics = SearchStatistics()
+                    result = ucs_search(problem, statistics)
+                else:
+                    statistics = ExternalSearchStatistics()
+                    result = external_ucs_search(problem, statistics, buffer_size=buffer_size)
+                search_time = time.perf_counter() - start_time
+                peak_memory = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+
+                line = f"{name:>8} {size[0]:>6} {buffer_size or '-':>8} {result.total_reward:>8} " \
+                       + f"{statistics.visited_nodes:>8} {peak_memory / 1e6:>7.2f}MB {search_time:>8.2f}s"
+                if buffer_size is not None:
+                    line += f" {statistics.merges:>7} {statistics.bytes_read / 1e6:>7.2f}MB " \
+                            + f"{statistics.bytes_written / 1e6:>7.2f}MB {statistics.io_time:>7.2f}s"
+                print(line)
+
+
+def benchmark_frontier_search(sizes=((16, 16), (24, 24)), seeds=(1, 2)):
+    """Compare the peak memory and the time of BFS and UCS keeping only the frontier in memory (frontier_search.py) with the ones keeping all reached states."""
+    import tracemalloc
+    from search_algorithms import breadth_first_search
+    from frontier_search import FrontierSearchStatistics, frontier_breadth_first_search, frontier_ucs_search
+
+    print(f"{'world':>8} {'size':>6} {'search':>7} {'actions':>8} {'nodes':>8} {'frontier':>9} {'memory':>9} "
+          + f"{'frontier':>9} {'time':>9} {'frontier':>9}")
+
+    for size in sizes:
+        for world in _generate_worlds(size, seeds, wumpuses=2, pit_ratio=0.15):
+            name = world["id"].split("(")[1].split(",")[0]
+
+            for search_name, search, frontier_search in (("BFS", breadth_first_search, frontier_breadth_first_search),
+                                                         ("UCS", ucs_search, frontier_ucs_search)):
+                measures = []
+                for search_func, statistics in ((search, SearchStatistics()), (frontier_search, FrontierSearchStatistics())):
+                    problem = HuntWumpusProblem.from_dict(world)
+                    tracemalloc.start()
+                    start_time = time.perf_counter()
+                    result = search_func(problem, statistics)
+                    search_time = time.perf_counter() - start_time
+                    peak_memory = tracemalloc.get_traced_memory()[1]
+                    tracemalloc.stop()
+                    measures.append((result, statistics.visited_nodes, peak_memory, search_time))
+
+                (result, visited_nodes, peak_memory, search_time), \
+                    (frontier_result, frontier_visited_nodes, frontier_peak_memory, frontier_search_time) = measures
+                print(f"{name:>8} {size[0]:>6} {search_name:>7} {len(frontier_result.sequence_actions):>8} "
+                      + f"{visited_nodes:>8} {frontier_visited_nodes:>9} {peak_memory / 1e6:>7.2f}MB "
+                      + f"{frontier_peak_memory / 1e6:>7.2f}MB {search_time:>8.2f}s {frontier_search_time:>8.2f}s")
+
+
+def benchmark_policy_table(sizes=((8, 8), (16, 16), (24, 24)), seeds=(1, 2), starts=20):
+    """Compare one policy table of all the starts (policy_table.py) with an A* search for each one of random starts."""
+    import random
+    from policy_table import PolicyStatistics, PolicyTable
+
+    heuristic_func = load_heuristic(DEFAULT_HEURISTIC)
+    print(f"{'world':>8} {'size':>6} {'states':>8} {'starts':>7} {'build':>8} {'plans':>8} {'A*':>8} {'table':>9}")
+
+    for size in sizes:
+        for world in _generate_worlds(size, seeds, wumpuses=2, pit_ratio=0.15):
+            name = world["id"].split("(")[1].split(",")[0]
+            problem = HuntWumpusProblem.from_dict(world)
+            statistics = PolicyStatistics()
+            start_time = time.perf_counter()
+            policy = PolicyTable.build(problem, statistics)
+            build_time = time.perf_counter() - start_time
+
+            occupied_cells = [tuple(location) for key in ("pits", "wumpuses", "blocks") for location in world[key]]
+            free_cells = [(x, y) for x in range(size[0]) for y in range(size[1]) if (x, y) not in occupied_cells]
+            random.seed(0)
+            plans_time = search_time = 0
+            for _ in range(starts):
+                x, y = random.choice(free_cells)
+                problem = HuntWumpusProblem.from_dict(dict(world, hunters=[[x, y, random.choice("NESW")]]), 
+                                                      heuristic_func=heuristic_func)
+                start_time = time.perf_counter()
+                result = policy.get_plan(problem)
+                plans_time += time.perf_counter() - start_time
+                start_time = time.perf_counter()
+                search_result = astar_search(problem)
+                search_time += time.perf_counter() - start_time
+                # the plans of the table are optimal, A* with the default heuristic not always
+                assert result.total_reward >= search_result.total_reward
+
+            print(f"{name:>8} {size[0]:>6} {statistics.states:>8} {starts:>7} {build_time:>7.2f}s "
+                  + f"{plans_time:>7.3f}s {search_time:>7.2f}s {len(policy.next_actions) * 5 / 1e3:>7.0f}KB")
+
+
+def benchmark_search_checkpoint(sizes=((24, 24), (32, 32)), seeds=(1, 2), intervals=(1000, 5000)):
+    """Measure the overhead of the periodic checkpoints of UCS (search_checkpoint.py) every given number of nodes, and the time to resume from the last one."""
+    import tempfile
+    from search_checkpoint import SearchCheckpoint
+
+    print(f"{'world':>8} {'size':>6} {'nodes':>8} {'interval':>9} {'saves':>6} {'size':>9} {'time':>9} "
+          + f"{'saving':>9} {'overhead':>9} {'resume':>9}")
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "search.checkpoint")
+        for size in sizes:
+            for world in _generate_worlds(size, seeds, wumpuses=2, pit_ratio=0.15):
+                name = world["id"].split("(")[1].split(",")[0]
+                # the best of two searches, the first one also fills the caches of the world
+                search_times = []
+                for _ in range(2):
+                    statistics = SearchStatistics()
+                    start_time = time.perf_counter()
+                    result = ucs_search(HuntWumpusProblem.from_dict(world), statistics)
+                    search_times.append(time.perf_counter() - start_time)
+                search_time = min(search_times)
+                print(f"{name:>8} {size[0]:>6} {statistics.visited_nodes:>8} {'-':>9} {0:>6} {'-':>9} {search_time:>8.2f}s")
+
+                for interval in intervals:
+                    checkpoint = SearchCheckpoint(path, seconds=None, nodes=interval)
+                    problem = HuntWumpusProblem.from_dict(world)
+                    start_time = time.perf_counter()
+                    checkpoint_result = ucs_search(problem, SearchStatistics(), checkpoint=checkpoint)
+                    checkpoint_time = time.perf_counter() - start_time
+                    assert checkpoint_result.total_reward == result.total_reward
+
+                    line = f"{name:>8} {size[0]:>6} {statistics.visited_nodes:>8} {interval:>9} {checkpoint.saves:>6} " \
+                           + f"{checkpoint.bytes_written / 1e6:>7.2f}MB {checkpoint_time:>8.2f}s " \
+                           + f"{checkpoint.save_time:>8.2f}s {checkpoint.save_time / search_time * 100:>8.1f}%"
+
+                    # resuming from the last checkpoint, written again stopping the search there
+                    if checkpoint.saves > 0:
+                        _save_checkpoint_of(world, path, checkpoint.saves * interval)
+                        resumed_checkpoint = SearchCheckpoint(path, seconds=None, nodes=None)
+                        start_time = time.perf_counter()
+                        resumed_result = ucs_search(HuntWumpusProblem.from_dict(world), SearchStatistics(), 
+                                                    checkpoint=resumed_checkpoint)
+                        line += f" {time.perf_counter() - start_time:>8.2f}s"
+                        assert resumed_checkpoint.resumed and resumed_result.total_reward == result.total_reward
+                    print(line)
+
+
+def _save_checkpoint_of(world, path, visited_nodes):
+    """
+    writes the checkpoint of UCS on the given world after the given number of expanded nodes
+    """
+    from search_checkpoint import SearchCheckpoint
+
+    class InterruptedSearch(Exception):
+        pass
+
+    class InterruptingCheckpoint(SearchCheckpoint):
+        def save(self, *args, **kwargs):
+            super().save(*args, **kwargs)
+            raise InterruptedSearch()
+
+    try:
+        ucs_search(HuntWumpusProblem.from_dict(world), SearchStatistics(), 
+                   checkpoint=InterruptingCheckpoint(path, seconds=None, nodes=visited_nodes))
+    except InterruptedSearch:
+        pass
+
+
+BENCHMARKS = (benchmark_parallel_astar, benchmark_lazy_astar, 
+              benchmark_partial_expansion_astar, benchmark_hierarchical_search, benchmark_multi_goal, 
+              benchmark_orientation_tables, benchmark_batch_heuristics, benchmark_canonical_states, 
+              benchmark_child_generation, benchmark_cost_models, 
+              benchmark_infeasibility_check, benchmark_dense_closed_list,
+              benchmark_external_search, benchmark_frontier_search, 
+              benchmark_policy_table, benchmark_search_checkpoint)
+
+
+def main(*args):
+    benchmark_names = {benchmark.__name__.lower(): benchmark for benchmark in BENCHMARKS}
+    if len(args) > 0:
+        if args[0].lower() not in benchmark_names:
+            print('Benchmark {} not among the available {}'.format(args[0], list(benchmark_names.keys())))
+            return -1
+        benchmarks = [benchmark_names[args[0].lower()]]
+    else:
+        benchmarks = BENCHMARKS
+
+    for benchmark in benchmarks:
+        print('Benchmark {}:'.format(benchmark.__name__))
+        print('  ' + benchmark.__doc__)
+        benchmark()
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(*sys.argv[1:]))
@@ -0,0 +1,256 @@
+import os, sys
+sys.path.insert(1, os.path.join(os.path.dirname(os.path.abspath(__file__)), "modules"))
+
+import mmap
+import shutil
+import tempfile
+import time
+from array import array
+from bisect import bisect_left
+
+from modules.hunt_wumpus_model import HuntWumpusNode, HuntWumpusResult
+from search_algorithms import SearchStatistics, is_infeasible
+
+# External memory search: the closed list is kept on disk as two memory-mapped files of 64 bits
+# numbers, the sorted keys of the closed states (their perfect index, see
+# HuntWumpusProblem.get_state_index) and, at the same position, the key of the parent and the
+# action that reached them. Only the open layer (the states of the current and of the next costs)
+# and a bounded buffer of the states closed since the last merge are kept in memory.
+# The layers are expanded in order of cost (depth for BFS) with delayed duplicate detection: the
+# keys of a layer are sorted and searched in the closed files in a single forward pass, the buffer
+# is merged into the files (a sequential read and write) when it is full.
+
+# action stored for the initial state (no parent)
+NO_ACTION = 7
+
+
+class ExternalSearchStatistics(SearchStatistics):
+    """
+    Collects the statistics of an external memory search:
+    - closed_states: number
+            the number of states in the closed list (on disk and in the buffer)
+    - merges: number
+            the number of times the buffer was merged into the closed files
+    - bytes_read: number
+            the bytes read from the closed files: whole files by the merges, 8 bytes for each probe
+            of the binary searches of the lookups
+    - bytes_written: number
+            the bytes written to the closed files
+    - io_time: number
+            the seconds spent merging and looking up the closed files
+    - max_open_states: number
+            the largest number of states in the open layers kept in memory
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.closed_states = 0
+        self.merges = 0
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.io_time = 0
+        self.max_open_states = 0
+
+    def __str__(self):
+        return f"ExternalSearchStatistics: (visited_nodes = {self.visited_nodes}, " \
+               + f"closed_states = {self.closed_states}, merges = {self.merges}, " \
+               + f"bytes_read = {self.bytes_read}, bytes_written = {self.bytes_written}, " \
+               + f"io_time = {self.io_time:.3f}, max_open_states = {self.max_open_states})"
+
+    def __repr__(self):
+        return self.__str__()
+
+
+class ExternalClosedList(object):
+    """
+    Closed list stored in the given directory (see the description at the top of the file):
+    - buffer: {key: number}
+            the states closed since the last merge, with their parent key * 8 + action index
+    - buffer_size: number
+            the number of states in the buffer that triggers a merge
+    """
+
+    def __init__(self, directory, statistics, buffer_size):
+        self.directory = directory
+        self.statistics = statistics
+        self.buffer_size = buffer_size
+        self.buffer = {}
+        self.size = 0 # numbers in each file
+        self._files = []
+        self._keys = self._parents = memoryview(array("Q"))
+
+    def _open(self):
+        self._keys = self._parents = memoryview(array("Q"))
+        for mapped_file in self._files:
+            mapped_file.close()
+        self._files = []
+
+        if self.size > 0:
+            for name in ("keys", "parents"):
+                with open(os.path.join(self.directory, name), "rb") as closed_file:
+                    mapped_file = mmap.mmap(closed_file.fileno(), 0, access=mmap.ACCESS_READ)
+                self._files.append(mapped_file)
+            self._keys, self._parents = (memoryview(mapped_file).cast("Q") for mapped_file in self._files)
+
+    def close(self):
+        self._keys.release()
+        self._parents.release()
+        self._keys = self._parents = memoryview(array("Q"))
+        for mapped_file in self._files:
+            mapped_file.close()
+        self._files = []
+
+    def add(self, key, parent):
+        self.buffer[key] = parent
+        self.statistics.closed_states += 1
+        if len(self.buffer) >= self.buffer_size:
+            self.merge()
+
+    def merge(self):
+        """
+        writes the closed files again merging the sorted buffer with them, then empties the buffer
+        """
+        start_time = time.perf_counter()
+        buffer_keys = sorted(self.buffer)
+        merged_keys, merged_parents = array("Q"), array("Q")
+        keys, parents = self._keys, self._parents
+        position = 0
+
+        for key in buffer_keys:
+            next_position = bisect_left(keys, key, position)
+            merged_keys.frombytes(keys[position:next_position].cast("B"))
+            merged_parents.frombytes(parents[position:next_position].cast("B"))
+            merged_keys.append(key)
+            merged_parents.append(self.buffer[key])
+            position = next_position
+        merged_keys.frombytes(keys[position:].cast("B"))
+        merged_parents.frombytes(parents[position:].cast("B"))
+
+        self.statistics.bytes_read += 16 * self.size
+        self.close()
+        for name, numbers in (("keys", merged_keys), ("parents", merged_parents)):
+            with open(os.path.join(self.directory, name + ".new"), "wb") as closed_file:
+                numbers.tofile(closed_file)
+            os.replace(os.path.join(self.directory, name + ".new"), os.path.join(self.directory, name))
+
+        self.size = len(merged_keys)
+        self.statistics.bytes_written += 16 * self.size
+        self.statistics.merges += 1
+        self.buffer = {}
+        self._open()
+        self.statistics.io_time += time.perf_counter() - start_time
+
+    def get_new_keys(self, sorted_keys):
+        """
+        returns the given sorted keys that are not in the closed list (delayed duplicate detection)
+        """
+        start_time = time.perf_counter()
+        keys = self._keys
+        new_keys = []
+        position = 0
+
+        for key in sorted_keys:
+            if key in self.buffer:
+                continue
+            # the keys are sorted, so the search starts from the position of the previous one
+            position = bisect_left(keys, key, position)
+            self.statistics.bytes_read += 8 * max(1, (self.size - position).bit_length())
+            if position == self.size or keys[position] != key:
+                new_keys.append(key)
+
+        self.statistics.io_time += time.perf_counter() - start_time
+        return new_keys
+
+    def get_parent(self, key):
+        """
+        returns the key of the parent of the closed state with the given key and the index of the action
+        """
+        parent = self.buffer.get(key)
+        if parent is None:
+            parent = self._parents[bisect_left(self._keys, key)]
+        return parent >> 3, parent & 7
+
+
+def external_ucs_search(problem, statistics=None, *, directory=None, buffer_size=1 << 16):
+    """
+    UCS search keeping the closed list on disk (see the description at the top of the file), in a
+    temporary directory created inside the given one. It returns the HuntWumpusResult with the
+    sequence of actions of the cheapest plan.
+    """
+    return _external_search(problem, statistics, lambda child, depth: child.path_cost, directory, buffer_size)
+
+
+def external_breadth_first_search(problem, statistics=None, *, directory=None, buffer_size=1 << 16):
+    """
+    BFS search keeping the closed list on disk (see external_ucs_search). It returns the
+    HuntWumpusResult with the sequence of actions of a plan with the least number of actions.
+    """
+    return _external_search(problem, statistics, lambda child, depth: depth, directory, buffer_size)
+
+
+def _external_search(problem, statistics, get_layer_of, directory, buffer_size):
+    statistics = statistics if statistics is not None else ExternalSearchStatistics()
+
+    if problem.is_goal_state(problem.initial_state):
+        statistics.visited_nodes += 1
+        return HuntWumpusResult([], 0)
+
+    if is_infeasible(problem, statistics):
+        return HuntWumpusResult([], 0)
+
+    if problem.state_index_size >= 1 << 61:
+        raise ValueError("The states of the problem can't be packed in 64 bits keys")
+
+    actions = list(problem.possible_actions)
+    action_indexes = {action: index for index, action in enumerate(actions)}
+    initial_key = problem.get_state_index(problem.initial_state)
+
+    # {layer: {key: (state, path_cost, depth, parent key * 8 + action index)}}
+    layers = {0: {initial_key: (problem.initial_state, 0, 0, initial_key << 3 | NO_ACTION)}}
+    working_directory = tempfile.mkdtemp(prefix="hunt_wumpus_closed_", dir=directory)
+    closed = ExternalClosedList(working_directory, statistics, buffer_size)
+    goal_key = None
+
+    try:
+        while layers and goal_key is None:
+            statistics.max_open_states = max(statistics.max_open_states, sum(map(len, layers.values())))
+            layer = layers.pop(min(layers))
+
+            for key in closed.get_new_keys(sorted(layer)):
+                state, path_cost, depth, parent = layer[key]
+                closed.add(key, parent)
+
+                if problem.is_goal_state(state):
+                    goal_key = key
+                    break
+
+                node = HuntWumpusNode(state, path_cost)
+                statistics.visited_nodes += 1
+                for action in problem.get_best_actions_for(state):
+                    child = problem.get_child_from(node, with_action=action, with_heuristic=False)
+                    child_key = problem.get_state_index(child.state)
+                    child_layer = layers.setdefault(get_layer_of(child, depth + 1), {})
+                    if child_key not in child_layer:
+                        child_layer[child_key] = (child.state, child.path_cost, depth + 1,
+                                                  key << 3 | action_indexes[action])
+
+        if goal_key is None:
+            return HuntWumpusResult([], 0)
+
+        # rebuilding the path from the parents in the closed list
+        sequence_actions = []
+        key = goal_key
+        while True:
+            key, action_index = closed.get_parent(key)
+            if action_index == NO_ACTION:
+                break
+            sequence_actions.append(actions[action_index])
+        sequence_actions.reverse()
+    finally:
+        closed.close()
+        shutil.rmtree(working_directory, ignore_errors=True)
+
+    node = HuntWumpusNode(problem.initial_state)
+    for action in sequence_actions:
+        node = problem.get_child_from(node, with_action=action, with_heuristic=False)
+    return HuntWumpusResult(sequence_actions, node.reward - node.path_cost)
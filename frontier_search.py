@@ -0,0 +1,197 @@
+import os, sys
+sys.path.insert(1, os.path.join(os.path.dirname(os.path.abspath(__file__)), "modules"))
+
+from modules.hunt_wumpus_model import HuntWumpusNode, HuntWumpusResult
+from search_algorithms import SearchStatistics, is_infeasible
+
+# Frontier search: BFS and UCS keeping in memory only the open layers and the closed states of the
+# last costs (depths for BFS), no reached set of all the explored states and no parent chains.
+# Every open state only keeps its relay: the edge (parent state, action, state) where its path
+# crossed the cost threshold of the search. When the goal is found the plan is recovered by divide
+# and conquer: the path before the relay edge and the one after it are found again by searches
+# towards the states of the edge, whose costs are known and at most half of the whole one.
+#
+# The actions are not reversible (turns are pruned by get_best_actions_for, arrows and golds can't
+# be recovered), so a closed state dropped from memory can be generated again and expanded a second
+# time: the plan stays optimal, only some work is repeated. The larger the window of kept costs,
+# the fewer states are expanded again.
+
+
+class FrontierSearchStatistics(SearchStatistics):
+    """
+    Collects the statistics of a frontier search:
+    - searches: number
+            the number of searches, the one finding the goal and the ones recovering the plan
+    - recovery_visited_nodes: number
+            the number of nodes expanded by the searches recovering the plan (included in visited_nodes)
+    - max_stored_states: number
+            the largest number of states in memory (open layers and closed states kept)
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.searches = 0
+        self.recovery_visited_nodes = 0
+        self.max_stored_states = 0
+
+    def __str__(self):
+        return f"FrontierSearchStatistics: (visited_nodes = {self.visited_nodes}, searches = {self.searches}, " \
+               + f"recovery_visited_nodes = {self.recovery_visited_nodes}, " \
+               + f"max_stored_states = {self.max_stored_states})"
+
+    def __repr__(self):
+        return self.__str__()
+
+
+def get_default_window(problem, unit_costs=False):
+    """
+    returns the window of costs of the closed states kept in memory: going back after a move
+    (turning around twice, moving and turning around again), plus the cost of the move
+    """
+    if unit_costs:
+        return 6
+    action_costs = problem.cost_model.action_costs
+    return 4 * max(action_costs["RIGHT"], action_costs["LEFT"]) + 2 * action_costs["MOVE"]
+
+
+def frontier_ucs_search(problem, statistics=None, *, window=None):
+    """
+    UCS search keeping in memory only the frontier and the closed states whose cost is within the
+    window from the current one (see the description at the top of the file and get_default_window).
+    It returns the HuntWumpusResult with the sequence of actions of the cheapest plan.
+    """
+    return _frontier_search(problem, statistics, window, unit_costs=False)
+
+
+def frontier_breadth_first_search(problem, statistics=None, *, window=None):
+    """
+    BFS search keeping in memory only the frontier and the last layers (see frontier_ucs_search).
+    It returns the HuntWumpusResult with the sequence of actions of a plan with the least number
+    of actions.
+    """
+    return _frontier_search(problem, statistics, window, unit_costs=True)
+
+
+def _frontier_search(problem, statistics, window, unit_costs):
+    statistics = statistics if statistics is not None else FrontierSearchStatistics()
+
+    if problem.is_goal_state(problem.initial_state):
+        statistics.visited_nodes += 1
+        return HuntWumpusResult([], 0)
+
+    if is_infeasible(problem, statistics):
+        return HuntWumpusResult([], 0)
+
+    window = window if window is not None else get_default_window(problem, unit_costs)
+
+    # the cost of the goal isn't known yet: the relays are the edges crossing the largest power of 2
+    # below the cost of each state, the one of the goal is above half of its cost
+    found = _search_layers(problem, problem.initial_state, problem.is_goal_state, _get_power_of_two_below,
+                           None, window, unit_costs, statistics)
+    if found is None:
+        return HuntWumpusResult([], 0)
+
+    goal_state, cost, (parent_state, action, parent_cost, relay_state, relay_cost) = found
+    visited_nodes = statistics.visited_nodes
+    sequence_actions = _find_actions(problem, problem.initial_state, parent_state, parent_cost, window,
+                                     unit_costs, statistics) \
+                       + [action] \
+                       + _find_actions(problem, relay_state, goal_state, cost - relay_cost, window,
+                                       unit_costs, statistics)
+    statistics.recovery_visited_nodes += statistics.visited_nodes - visited_nodes
+
+    node = HuntWumpusNode(problem.initial_state)
+    for action in sequence_actions:
+        node = problem.get_child_from(node, with_action=action, with_heuristic=False)
+    # the same total reward as breadth_first_search and ucs_search
+    return HuntWumpusResult(sequence_actions, node.path_cost + node.reward if unit_costs else node.reward - node.path_cost)
+
+
+def _get_power_of_two_below(cost):
+    return 1 << (cost.bit_length() - 1) if cost > 0 else 0
+
+
+def _find_actions(problem, start_state, goal_state, cost, window, unit_costs, statistics):
+    """
+    returns the actions of a plan of the given (optimal) cost from the start state to the goal state,
+    splitting it at the edge crossing half of the cost
+    """
+    if cost == 0:
+        return []
+
+    goal_index = problem.get_state_index(goal_state)
+    threshold = (cost + 1) // 2
+    _, _, (parent_state, action, parent_cost, relay_state, relay_cost) = _search_layers(
+        problem, start_state, lambda state: problem.get_state_index(state) == goal_index, lambda cost: threshold,
+        cost, window, unit_costs, statistics)
+
+    return _find_actions(problem, start_state, parent_state, parent_cost, window, unit_costs, statistics) \
+           + [action] \
+           + _find_actions(problem, relay_state, goal_state, cost - relay_cost, window, unit_costs, statistics)
+
+
+def _search_layers(problem, start_state, is_goal, get_threshold, max_cost, window, unit_costs, statistics):
+    """
+    expands the layers of states with the same cost (depth if unit_costs) from the start state until
+    a goal state is found, it returns the goal state, its cost and its relay (the edge crossing
+    get_threshold(cost): parent state, action, parent cost, state and cost). It returns None if no
+    goal is found within max_cost.
+    Without max_cost the search stops when the cost goes over the largest cost at which a state was
+    generated for the first time: every state on a cheapest path to the goal would have been generated
+    at its cost by then, while the closed states forgotten out of the window could otherwise be
+    expanded again forever. The generated states are marked in a bitmap of the state indexes.
+    """
+    statistics.searches += 1
+    layers = {0: {start_state: None}} # {cost: {state: relay}}
+    closed = {} # {state index: cost}
+    closed_layers = {} # {cost: [state index]}
+
+    if max_cost is None:
+        generated = bytearray((problem.state_index_size + 7) >> 3)
+        start_index = problem.get_state_index(start_state)
+        generated[start_index >> 3] |= 1 << (start_index & 7)
+        last_generation_cost = 0
+
+    while layers:
+        cost = min(layers)
+        if cost > (max_cost if max_cost is not None else last_generation_cost):
+            return None
+        layer = layers.pop(cost)
+
+        # forgetting the closed states out of the window
+        for closed_cost in [closed_cost for closed_cost in closed_layers if closed_cost < cost - window]:
+            for index in closed_layers.pop(closed_cost):
+                if closed.get(index) == closed_cost:
+                    del closed[index]
+        statistics.max_stored_states = max(statistics.max_stored_states,
+                                           len(closed) + len(layer) + sum(map(len, layers.values())))
+
+        closed_layer = closed_layers[cost] = []
+        for state, relay in layer.items():
+            index = problem.get_state_index(state)
+            if index in closed:
+                continue
+            closed[index] = cost
+            closed_layer.append(index)
+
+            if is_goal(state):
+                return state, cost, relay
+
+            node = HuntWumpusNode(state)
+            statistics.visited_nodes += 1
+            for action in problem.get_best_actions_for(state):
+                child = problem.get_child_from(node, with_action=action, with_heuristic=False)
+                child_cost = cost + (1 if unit_costs else child.path_cost)
+                child_index = problem.get_state_index(child.state)
+                if child_index in closed:
+                    continue
+                if max_cost is None and not generated[child_index >> 3] & (1 << (child_index & 7)):
+                    generated[child_index >> 3] |= 1 << (child_index & 7)
+                    last_generation_cost = max(last_generation_cost, child_cost)
+
+                child_layer = layers.setdefault(child_cost, {})
+                if child.state not in child_layer:
+                    child_layer[child.state] = (state, action, cost, child.state, child_cost) \
+                                               if cost < get_threshold(child_cost) <= child_cost else relay
+
+    return None
@@ -1,8 +1,17 @@
 import os, sys
 sys.path.insert(1, os.path.abspath("modules/"))
 
+import math
+from collections import deque
+from functools import lru_cache
+
 from modules.linear_space import SmartCoordinate, SmartVector
 from modules.hunt_wumpus_model import HuntWumpusState
+# the orientation helpers are lookup tables (see orientation_tables.py)
+from modules.orientation_tables import COSTS_TO_ORIENTATE
+from modules.orientation_tables import get_cost_to_orientate_to as _get_cost_to_orientate_to
+from modules.orientation_tables import get_orientations_to_move_away_from as _get_orientations_to_move_away_from
+from modules.orientation_tables import get_orientations_to_reach as _get_orientations_to_reach
 
 # HELPER FUNCTIONS
 
@@ -12,58 +21,6 @@ def _manhattan_distance_between(start, destination):
     """
     return abs(destination.x - start.x) + abs(destination.y - start.y)
 
-def _get_orientations_to_reach(to_location, *, from_location):
-    """
-    rerturns the list of vectors aligned to to the destination, from the from_location
-    """
-    #list of vectors reaching the destination                
-    reaching_destination_orientations = []
-
-    if from_location == to_location:
-        return []
-    elif to_location.x == from_location.x: # goal and agent on same row (axes Y)
-        if to_location.y > from_location.y:
-            reaching_destination_orientations.append(SmartVector(0, 1))
-        else:
-            reaching_destination_orientations.append(SmartVector(0, -1))
-    elif to_location.y == from_location.y:
-        if to_location.x > from_location.x:
-            reaching_destination_orientations.append(SmartVector(1, 0))
-        else:
-            reaching_destination_orientations.append(SmartVector(-1, 0))
-    else:
-        y_component = 1 if to_location.y > from_location.y else -1
-        x_component = 1 if to_location.x > from_location.x else -1
-        reaching_destination_orientations.extend([SmartVector(x_component, 0), 
-                                                  SmartVector(0, y_component)])
-
-    return reaching_destination_orientations
-
-def _get_orientations_to_move_away_from(to_location, *, from_location):
-    """
-    rerturns the list of vectors that take you away from the destination
-    """       
-    all_vectors = [SmartVector(1, 0), SmartVector(0, 1), SmartVector(0, -1), SmartVector(-1, 0)]
-    return [vec for vec in all_vectors if vec not in _get_orientations_to_reach(to_location, 
-                                                                                from_location=from_location)]
-def _get_cost_to_orientate_to(to_location, *, from_location, with_orientation):
-    """
-    returns the minimum cost to orientate the agent to point to the destination location
-    """
-    from_orientation = with_orientation
-               
-    reaching_destination_orientations = _get_orientations_to_reach(to_location, from_location=from_location)
-
-    if not reaching_destination_orientations:
-        return 0
-
-    if from_orientation not in reaching_destination_orientations:
-        return (1 if from_orientation.get_perpendicular_vector_clockwise() in reaching_destination_orientations 
-                    or -from_orientation.get_perpendicular_vector_clockwise() in reaching_destination_orientations
-               else 2)
-    else:
-        return 0
-
 def _get_orientation_overhead_to_reach(to_location, *, from_location):
     """
     returns the orientation overhead to reach a location (NOT considering the agent orientation) but only 
@@ -218,6 +175,134 @@ def _smart_manhattan_distance(start, *, destination, with_block_locations):
             return base_manhattan_distance + 3 # all other cases
 
 
+# values depending only on the world, computed by the heuristics (see _get_world_context)
+_world_context = {"version": None}
+
+# largest number of smart manhattan distances cached, of the current and of the previous worlds 
+# (the least recently used are dropped), so long running processes solving many worlds don't grow
+SMART_DISTANCES_CACHE_SIZE = 1 << 16
+
+def _get_world_context():
+    """
+    returns the values depending only on the world set up in the static properties of the states, 
+    built again only when a new world is set up (HuntWumpusState.world_version changes):
+    - pit_block_locations: [SmartCoordinate]
+            the pits and the blocks (the obstacles of the smart manhattan distance)
+    - pit_block_cells: {(x, y)}
+            the cells of the pits and the blocks
+    - base_distances: {gold_mask: number}
+            the smart manhattan distance from the first gold left to the first exit
+    - distance_maps: {(x, y) | "exits": {(x, y): number}}
+            see _get_distance_map
+    - spanning_tree_costs: {gold_mask: number}
+            see _get_spanning_tree_cost
+    """
+    global _world_context
+    if _world_context["version"] != HuntWumpusState.world_version:
+        pit_block_locations = HuntWumpusState.pit_locations + HuntWumpusState.block_locations
+        _world_context = {
+            "version": HuntWumpusState.world_version,
+            "pit_block_locations": pit_block_locations,
+            "pit_block_cells": set((location.x, location.y) for location in pit_block_locations),
+            "base_distances": {},
+            "distance_maps": {},
+            "spanning_tree_costs": {}
+        }
+
+    return _world_context
+
+def _get_smart_manhattan_distance(start, destination, context):
+    """
+    returns the _smart_manhattan_distance avoiding the pits and the blocks of the world of the context,
+    computed once for each pair of locations (among the last SMART_DISTANCES_CACHE_SIZE ones)
+    """
+    return _get_cached_smart_manhattan_distance(context["version"], start.x, start.y, destination.x, destination.y)
+
+@lru_cache(maxsize=SMART_DISTANCES_CACHE_SIZE)
+def _get_cached_smart_manhattan_distance(world_version, start_x, start_y, destination_x, destination_y):
+    # the world version is part of the key, it is always the one of the current world context
+    return _smart_manhattan_distance(SmartCoordinate(start_x, start_y), 
+                                     destination=SmartCoordinate(destination_x, destination_y), 
+                                     with_block_locations=_get_world_context()["pit_block_locations"])
+
+def _get_smart_manhattan_base_cost(state, context):
+    """
+    returns the part of the smart manhattan heuristics not depending on the agent location: the smart manhattan 
+    distance from the gold to the exit, grabbing, climbing and the penalty of a wumpus on the goal
+    """
+    base_cost = 0
+    if state.gold_locations:
+        base_distances = context["base_distances"]
+        if state.gold_mask not in base_distances:
+            base_distances[state.gold_mask] = _get_smart_manhattan_distance(state.gold_locations[0], 
+                                                                            state.exit_locations[0], context)
+        base_cost = base_distances[state.gold_mask]
+
+    base_cost += 1 if state.gold_locations else 0
+    base_cost += 1 if not state.has_agent_climbed_out else 0
+
+    if state.wumpus_locations:
+        if state.gold_locations:
+            base_cost += 10 if state.gold_locations[0] in state.wumpus_locations or state.exit_locations[0] in state.wumpus_locations else 0
+        else:
+            base_cost += 10 if state.exit_locations[0] in state.wumpus_locations else 0
+
+    return base_cost
+
+def _get_distance_map(source):
+    """
+    returns {(x, y): moves} with the least number of moves from the source (a location (x, y) or
+    "exits" for the closest exit) to every cell, avoiding pits and blocks (wumpuses can be killed),
+    computed once per world
+    """
+    context = _get_world_context()
+    distance_maps = context["distance_maps"]
+
+    if source not in distance_maps:
+        width, height = HuntWumpusState.world_size
+        walls = context["pit_block_cells"]
+        starts = ([(location.x, location.y) for location in HuntWumpusState.exit_locations] 
+                  if source == "exits" else [source])
+
+        distances = {start: 0 for start in starts if start not in walls}
+        frontier = deque(distances)
+        while frontier:
+            x, y = frontier.popleft()
+            for cell in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
+                if 0 <= cell[0] < width and 0 <= cell[1] < height and cell not in walls and cell not in distances:
+                    distances[cell] = distances[(x, y)] + 1
+                    frontier.append(cell)
+
+        distance_maps[source] = distances
+
+    return distance_maps[source]
+
+def _get_spanning_tree_cost(gold_locations, gold_mask):
+    """
+    returns the cost of the minimum spanning tree (Prim) connecting the given golds and the exits
+    (a single node, at the distance of the closest exit), cached by the gold_mask
+    """
+    spanning_tree_costs = _get_world_context()["spanning_tree_costs"]
+    if gold_mask not in spanning_tree_costs:
+        nodes = [(location.x, location.y) for location in gold_locations]
+        exit_distances = _get_distance_map("exits")
+        # cheapest edge connecting each node to the tree, which starts from the exits
+        connection_costs = {node: exit_distances.get(node, math.inf) for node in nodes}
+        cost = 0
+
+        while connection_costs:
+            node = min(connection_costs, key=connection_costs.get)
+            cost += connection_costs.pop(node)
+            node_distances = _get_distance_map(node)
+            for other_node in connection_costs:
+                connection_costs[other_node] = min(connection_costs[other_node], 
+                                                   node_distances.get(other_node, math.inf))
+
+        spanning_tree_costs[gold_mask] = cost
+
+    return spanning_tree_costs[gold_mask]
+
+
 # HEURISTIC FUNCTIONS
 
 def heuristic_func_manhattan(state):
@@ -280,7 +365,7 @@ def heuristic_func_best_neighbour(state):
     It eventually return the lowest value of all of them.
     """
     goal_location = state.gold_locations[0] if state.gold_locations else state.exit_locations[0]
-    pit_block_locations = state.pit_locations + HuntWumpusState.block_locations
+    pit_block_cells = _get_world_context()["pit_block_cells"]
 
     base_cost = 0
     if state.gold_locations:
@@ -310,7 +395,7 @@ def heuristic_func_best_neighbour(state):
     for neighbour in neighbour_locations:
         if not (neighbour.x in range(HuntWumpusState.world_size[0]) 
                 and neighbour.y in range(HuntWumpusState.world_size[1]) 
-                and neighbour not in pit_block_locations):
+                and (neighbour.x, neighbour.y) not in pit_block_cells):
             neighbour_blocks.append(neighbour)
 
     # never executed since no movement allowed for the agent
@@ -329,7 +414,7 @@ def heuristic_func_best_neighbour(state):
                                                                           with_orientation=state.agent_orientation)
         move_cost = 1
         shoot_cost = 0 if escape_location not in state.wumpus_locations else 10
-        orientation_cost = _get_cost_to_orientate_to(goal_location, from_location=escape_location, with_orientation=SmartVector.from_coordinate(escape_location - state.agent_location))
+        orientation_cost = _get_cost_to_orientate_to(goal_location, from_location=escape_location, with_orientation=escape_location - state.agent_location)
         goal_manhattan_distance = _manhattan_distance_between(escape_location, goal_location)
         orientation_overhead = _get_orientation_overhead_to_reach(goal_location, 
                                                                   from_location=escape_location)
@@ -352,20 +437,8 @@ def heuristic_func_smart_manhattan(state):
     For more information on how this manhattan work look at the documentation.
     """
     goal_location = state.gold_locations[0] if state.gold_locations else state.exit_locations[0]
-    pit_block_locations = state.pit_locations + HuntWumpusState.block_locations
-    
-    base_cost = 0
-    if state.gold_locations:
-        base_cost = _smart_manhattan_distance(state.gold_locations[0], destination=state.exit_locations[0], with_block_locations=pit_block_locations)
-
-    base_cost += 1 if state.gold_locations else 0
-    base_cost += 1 if not state.has_agent_climbed_out else 0
-
-    if state.wumpus_locations:
-        if state.gold_locations:
-            base_cost += 10 if state.gold_locations[0] in state.wumpus_locations or state.exit_locations[0] in state.wumpus_locations else 0
-        else:
-            base_cost += 10 if state.exit_locations[0] in state.wumpus_locations else 0
+    context = _get_world_context()
+    base_cost = _get_smart_manhattan_base_cost(state, context)
 
     if state.agent_location == goal_location:
         return base_cost
@@ -374,10 +447,48 @@ def heuristic_func_smart_manhattan(state):
                                                                     from_location=state.agent_location, 
                                                                     with_orientation=state.agent_orientation)
 
-    manhattan_distance_to_goal = _smart_manhattan_distance(state.agent_location, destination=goal_location, with_block_locations=pit_block_locations)
+    manhattan_distance_to_goal = _get_smart_manhattan_distance(state.agent_location, goal_location, context)
     return cost_to_orientiate_to_goal_location + manhattan_distance_to_goal + base_cost
 
 
+def batch_heuristic_func_smart_manhattan(states):
+    """
+    heuristic_func_smart_manhattan of all given states in one call (e.g. the children of an expansion): the goal, 
+    the base cost, the distance to the goal and its direction are computed once for the states with the same 
+    agent location, golds, wumpuses and climbing (all the children but the one moving and the one shooting 
+    the wumpus), then only the turns depend on the orientation of each state
+    """
+    context = _get_world_context()
+    setups = {} # {(x, y, gold_mask, wumpuses, climbed out): (direction x, direction y, cost without turns)}
+    heuristic_costs = []
+
+    for state in states:
+        agent_location = state.agent_location
+        # the children of a node share the tuple of the wumpuses unless the arrow killed one
+        setup_key = (agent_location.x, agent_location.y, state.gold_mask, id(state.wumpus_locations), 
+                     state.has_agent_climbed_out)
+        setup = setups.get(setup_key)
+        if setup is None:
+            goal_location = state.gold_locations[0] if state.gold_locations else state.exit_locations[0]
+            base_cost = _get_smart_manhattan_base_cost(state, context)
+            if agent_location == goal_location:
+                setup = (None, None, base_cost)
+            else:
+                dx = goal_location.x - agent_location.x
+                dy = goal_location.y - agent_location.y
+                setup = ((dx > 0) - (dx < 0), (dy > 0) - (dy < 0), 
+                         _get_smart_manhattan_distance(agent_location, goal_location, context) + base_cost)
+            setups[setup_key] = setup
+
+        direction_x, direction_y, cost = setup
+        if direction_x is not None:
+            cost += COSTS_TO_ORIENTATE[(direction_x, direction_y, state.agent_orientation.x, state.agent_orientation.y)]
+        heuristic_costs.append(cost)
+
+    return heuristic_costs
+
+heuristic_func_smart_manhattan.batch = batch_heuristic_func_smart_manhattan
+
 def heuristic_func_best_neighbour_smart_manhattan(state):
     """
     This is a re-implementation of the heuristic_func_best_neighbour function using the _smart_manhattan_distance 
@@ -385,20 +496,9 @@ def heuristic_func_best_neighbour_smart_manhattan(state):
     an approximation of the distance from a starting location to a destination location look at the documentation
     """
     goal_location = state.gold_locations[0] if state.gold_locations else state.exit_locations[0]
-    pit_block_locations = state.pit_locations + HuntWumpusState.block_locations
-    
-    base_cost = 0
-    if state.gold_locations:
-        base_cost = _smart_manhattan_distance(state.gold_locations[0], destination=state.exit_locations[0], with_block_locations=pit_block_locations)
-
-    base_cost += 1 if state.gold_locations else 0
-    base_cost += 1 if not state.has_agent_climbed_out else 0
-
-    if state.wumpus_locations:
-        if state.gold_locations:
-            base_cost += 10 if state.gold_locations[0] in state.wumpus_locations or state.exit_locations[0] in state.wumpus_locations else 0
-        else:
-            base_cost += 10 if state.exit_locations[0] in state.wumpus_locations else 0
+    context = _get_world_context()
+    pit_block_cells = context["pit_block_cells"]
+    base_cost = _get_smart_manhattan_base_cost(state, context)
 
     if state.agent_location == goal_location:
         return base_cost
@@ -417,12 +517,12 @@ def heuristic_func_best_neighbour_smart_manhattan(state):
     for neighbour in neighbour_locations:
         if not (neighbour.x in range(HuntWumpusState.world_size[0]) 
                 and neighbour.y in range(HuntWumpusState.world_size[1]) 
-                and neighbour not in pit_block_locations):
+                and (neighbour.x, neighbour.y) not in pit_block_cells):
             neighbour_blocks.append(neighbour)
 
     # never executed since no movement allowed for the agent
     if neighbour_locations == neighbour_blocks:
-        return _smart_manhattan_distance(state.agent_location, destination=state.exit_locations[0], with_block_locations=pit_block_locations) + base_cost
+        return _get_smart_manhattan_distance(state.agent_location, state.exit_locations[0], context) + base_cost
 
     reaching_goal_orientations = _get_orientations_to_reach(goal_location, 
                                                             from_location=state.agent_location)
@@ -441,8 +541,8 @@ def heuristic_func_best_neighbour_smart_manhattan(state):
         if escape_location != goal_location:
             shoot_cost = 0 if escape_location not in state.wumpus_locations else 10
         
-        manhattan_distance_to_goal = _smart_manhattan_distance(escape_location, destination=goal_location, with_block_locations=pit_block_locations)
-        orientation_cost = _get_cost_to_orientate_to(goal_location, from_location=escape_location, with_orientation=SmartVector.from_coordinate(escape_location - state.agent_location))
+        manhattan_distance_to_goal = _get_smart_manhattan_distance(escape_location, goal_location, context)
+        orientation_cost = _get_cost_to_orientate_to(goal_location, from_location=escape_location, with_orientation=escape_location - state.agent_location)
 
         escape_locations_costs.append(cost_to_orientiate_to_escape_location
                                       + move_cost
@@ -452,3 +552,22 @@ def heuristic_func_best_neighbour_smart_manhattan(state):
 
     return min(escape_locations_costs) + base_cost
 
+
+def heuristic_func_multi_goal_mst(state):
+    """
+    Admissible heuristic for worlds with several golds and exits: the moves from the agent to the closest gold 
+    left (or exit) plus the minimum spanning tree of the golds left and the exits, since any path visiting all 
+    golds and ending on an exit is a spanning tree of them, plus a grab for each gold and the climb.
+    The distances avoid pits and blocks and are computed once per world.
+    """
+    if state.has_agent_climbed_out or not state.is_agent_alive:
+        return 0
+
+    agent_cell = (state.agent_location.x, state.agent_location.y)
+    distance_to_closest = _get_distance_map("exits").get(agent_cell, math.inf)
+    for location in state.gold_locations:
+        distance_to_closest = min(distance_to_closest, 
+                                  _get_distance_map((location.x, location.y)).get(agent_cell, math.inf))
+
+    return (distance_to_closest + _get_spanning_tree_cost(state.gold_locations, state.gold_mask) 
+            + len(state.gold_locations) + 1)
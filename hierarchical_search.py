@@ -0,0 +1,418 @@
+import os, sys
+sys.path.insert(1, os.path.join(os.path.dirname(os.path.abspath(__file__)), "modules"))
+
+import math
+import time
+from collections import deque
+from heapq import heappush, heappop
+
+from modules.hunt_wumpus_model import HuntWumpusNode, HuntWumpusProblem, HuntWumpusResult, HuntWumpusState
+from search_algorithms import SearchStatistics, astar_search
+
+# Hierarchical pathfinding (HPA*): the grid is split into square clusters, the free cells on the two
+# sides of the borders between clusters are the entrances. The abstract graph has a node for each
+# entrance and orientation, connected to the other entrances of the same cluster with the cost of
+# the cheapest oriented path inside the cluster (moves and turns) and to the entrance on the other
+# side of the border with a move. The graph is built once per world.
+# A search first finds the abstract path (hunter -> golds -> exit), then it is refined cluster by
+# cluster with the existing A* on the sub-world of each cluster, so the search time depends on the
+# clusters crossed rather than on the cells of the world.
+# Wumpuses are treated as walls (no arrow is used): worlds where a wumpus must be killed, or where
+# the refined plan is not valid, are solved with the full A* search.
+
+# orientations as indexes (turning right adds 1), with their names and vectors
+ORIENTATION_NAMES = ("N", "E", "S", "W")
+ORIENTATION_DELTAS = ((0, 1), (1, 0), (0, -1), (-1, 0))
+
+
+class HierarchicalSearchStatistics(SearchStatistics):
+    """
+    Collects the statistics of a hierarchical search:
+    - visited_nodes: number
+            the number of nodes expanded by the A* refining the clusters (or by the full search)
+    - abstract_nodes: number
+            the number of nodes expanded in the abstract graph
+    - refined_clusters: number
+            the number of A* searches run to refine the abstract path
+    - lower_bound: number
+            a lower bound of the cost of the optimal solution (grid distances, see get_lower_bound)
+    - suboptimality_bound: number
+            the cost of the solution found divided by the lower bound (the solution is at most
+            this many times the optimal one)
+    - used_fallback: bool
+            tells whether the full A* search was needed
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.abstract_nodes = 0
+        self.refined_clusters = 0
+        self.lower_bound = 0
+        self.suboptimality_bound = math.inf
+        self.used_fallback = False
+
+    def __str__(self):
+        return f"HierarchicalSearchStatistics: (visited_nodes = {self.visited_nodes}, " \
+               + f"abstract_nodes = {self.abstract_nodes}, refined_clusters = {self.refined_clusters}, " \
+               + f"lower_bound = {self.lower_bound}, suboptimality_bound = {self.suboptimality_bound:.3f}, " \
+               + f"used_fallback = {self.used_fallback})"
+
+    def __repr__(self):
+        return self.__str__()
+
+
+class HierarchicalGraph(object):
+    """
+    Abstract graph of a world for the hierarchical search:
+    - world_description: dict
+            the world (schema of the JSON files in the data folder)
+    - cluster_size: number
+            the side of the square clusters
+    - free_cells: {(x, y)}
+            the cells that can be crossed (no pits, blocks or wumpuses)
+    - edges: {(cell, orientation): [((cell, orientation), cost)]}
+            the edges between the entrance nodes
+    """
+
+    def __init__(self, problem, cluster_size=8):
+        self.world_description = problem.to_dict()
+        self.cluster_size = cluster_size
+        self.move_cost = problem.cost_model.action_costs["MOVE"]
+        self.turn_costs = (problem.cost_model.action_costs["RIGHT"], problem.cost_model.action_costs["LEFT"])
+        self.width, self.height = self.world_description["size"]
+
+        walls = set(tuple(location) for key in ("pits", "blocks", "wumpuses")
+                    for location in self.world_description[key])
+        self.free_cells = set((x, y) for x in range(self.width) for y in range(self.height)) - walls
+
+        self.entrances = {} # {cluster: set(cell)}
+        self.edges = {}
+        self._entrance_costs = {} # {(cell, orientation): {cell: cost}} cheapest cost to each cell of the cluster
+        self._find_entrances()
+
+        for cluster, cells in self.entrances.items():
+            for cell in cells:
+                for orientation in range(4):
+                    costs = self.get_cluster_costs(cell, orientation)
+                    node = (cell, orientation)
+                    self.edges.setdefault(node, []).extend(
+                        ((other_cell, other_orientation), cost)
+                        for (other_cell, other_orientation), cost in costs.items()
+                        if other_cell in cells and (other_cell, other_orientation) != node)
+
+                    cell_costs = {}
+                    for (other_cell, _), cost in costs.items():
+                        cell_costs[other_cell] = min(cost, cell_costs.get(other_cell, math.inf))
+                    self._entrance_costs[node] = cell_costs
+
+    def get_cluster_of(self, cell):
+        return (cell[0] // self.cluster_size, cell[1] // self.cluster_size)
+
+    def _find_entrances(self):
+        """
+        finds the transitions between adjacent clusters: one in the middle of each run of free cells
+        along a border, two at the ends of runs longer than 5 cells
+        """
+        def add_transitions(run, delta):
+            transitions = [run[len(run) // 2]] if len(run) <= 5 else [run[0], run[-1]]
+            orientation = ORIENTATION_DELTAS.index(delta)
+            backward_orientation = (orientation + 2) % 4
+            for cell in transitions:
+                other_cell = (cell[0] + delta[0], cell[1] + delta[1])
+                self.entrances.setdefault(self.get_cluster_of(cell), set()).add(cell)
+                self.entrances.setdefault(self.get_cluster_of(other_cell), set()).add(other_cell)
+                self.edges.setdefault((cell, orientation), []).append(((other_cell, orientation), self.move_cost))
+                self.edges.setdefault((other_cell, backward_orientation), []).append(
+                    ((cell, backward_orientation), self.move_cost))
+
+        for delta in ((1, 0), (0, 1)):
+            # borders between clusters: x (or y) is the last cell of a cluster
+            border_range = self.width if delta == (1, 0) else self.height
+            along_range = self.height if delta == (1, 0) else self.width
+            for border in range(self.cluster_size - 1, border_range - 1, self.cluster_size):
+                run = []
+                for along in range(along_range):
+                    cell = (border, along) if delta == (1, 0) else (along, border)
+                    other_cell = (cell[0] + delta[0], cell[1] + delta[1])
+                    # runs are split at the borders of the clusters along the border too
+                    if run and along % self.cluster_size == 0:
+                        add_transitions(run, delta)
+                        run = []
+                    if cell in self.free_cells and other_cell in self.free_cells:
+                        run.append(cell)
+                    elif run:
+                        add_transitions(run, delta)
+                        run = []
+                if run:
+                    add_transitions(run, delta)
+
+    def get_cluster_costs(self, cell, orientation):
+        """
+        returns {(cell, orientation): cost} of the cheapest paths (moves and turns) from the given cell
+        and orientation to the cells of the same cluster, without leaving it (Dijkstra)
+        """
+        cluster = self.get_cluster_of(cell)
+        right_cost, left_cost = self.turn_costs
+        costs = {(cell, orientation): 0}
+        frontier = [(0, cell, orientation)]
+
+        while frontier:
+            cost, cell, orientation = heappop(frontier)
+            if cost > costs[(cell, orientation)]:
+                continue
+
+            delta = ORIENTATION_DELTAS[orientation]
+            ahead = (cell[0] + delta[0], cell[1] + delta[1])
+            successors = [((cell, (orientation + 1) % 4), cost + right_cost),
+                          ((cell, (orientation + 3) % 4), cost + left_cost)]
+            if ahead in self.free_cells and self.get_cluster_of(ahead) == cluster:
+                successors.append(((ahead, orientation), cost + self.move_cost))
+
+            for node, successor_cost in successors:
+                if successor_cost < costs.get(node, math.inf):
+                    costs[node] = successor_cost
+                    heappush(frontier, (successor_cost, node[0], node[1]))
+
+        return costs
+
+    def find_abstract_path(self, start_cell, start_orientation, target_cells, statistics):
+        """
+        returns the cheapest abstract path [node] from the start (cell, orientation) to one of the
+        target cells (the last node is ("target", cell)) and its cost, or (None, math.inf)
+        """
+        target_cells = set(target_cells)
+        start = (start_cell, start_orientation)
+
+        # temporary edges of the start and of the targets
+        start_costs = self.get_cluster_costs(start_cell, start_orientation)
+        start_cluster = self.get_cluster_of(start_cell)
+        start_edges = [((cell, orientation), cost) for (cell, orientation), cost in start_costs.items()
+                       if cell in self.entrances.get(start_cluster, ())]
+        for target_cell in target_cells:
+            cost = min((cost for (cell, _), cost in start_costs.items() if cell == target_cell), default=math.inf)
+            if cost < math.inf:
+                start_edges.append((("target", target_cell), cost))
+
+        target_edges = {} # {node: [(target node, cost)]}
+        for target_cell in target_cells:
+            for cell in self.entrances.get(self.get_cluster_of(target_cell), ()):
+                for orientation in range(4):
+                    cost = self._entrance_costs[(cell, orientation)].get(target_cell, math.inf)
+                    if cost < math.inf:
+                        target_edges.setdefault((cell, orientation), []).append((("target", target_cell), cost))
+
+        costs = {start: 0}
+        parents = {start: None}
+        frontier = [(0, 0, start)]
+        order = 0
+
+        while frontier:
+            cost, _, node = heappop(frontier)
+            if cost > costs[node]:
+                continue
+            statistics.abstract_nodes += 1
+
+            if node[0] == "target":
+                path = []
+                while node is not None:
+                    path.append(node)
+                    node = parents[node]
+                return path[::-1], cost
+
+            edges = start_edges if node == start else self.edges.get(node, []) + target_edges.get(node, [])
+            for next_node, edge_cost in edges:
+                if cost + edge_cost < costs.get(next_node, math.inf):
+                    costs[next_node] = cost + edge_cost
+                    parents[next_node] = node
+                    order += 1
+                    heappush(frontier, (cost + edge_cost, order, next_node))
+
+        return None, math.inf
+
+
+def get_lower_bound(problem):
+    """
+    returns a lower bound of the cost of the solution of the problem: the moves along the grid
+    distances (crossing wumpuses, avoiding pits and blocks) from the agent to the farthest gold and
+    from it to the closest exit, plus grabbing all golds and climbing out
+    """
+    world_description = problem.to_dict()
+    width, height = world_description["size"]
+    walls = set(tuple(location) for key in ("pits", "blocks") for location in world_description[key])
+    action_costs = problem.cost_model.action_costs
+
+    def get_distances(start):
+        distances = {start: 0}
+        frontier = deque([start])
+        while frontier:
+            x, y = frontier.popleft()
+            for cell in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
+                if (0 <= cell[0] < width and 0 <= cell[1] < height
+                    and cell not in walls and cell not in distances):
+                    distances[cell] = distances[(x, y)] + 1
+                    frontier.append(cell)
+        return distances
+
+    agent_distances = get_distances(tuple(world_description["hunters"][0][:2]))
+    exits = [tuple(location) for location in world_description["exits"]]
+    golds = [tuple(location) for location in world_description["golds"]]
+
+    if not golds:
+        moves = min(agent_distances.get(exit_location, math.inf) for exit_location in exits)
+    else:
+        moves = max(agent_distances.get(gold, math.inf)
+                    + min(get_distances(gold).get(exit_location, math.inf) for exit_location in exits)
+                    for gold in golds)
+
+    return moves * action_costs["MOVE"] + len(golds) * action_costs["GRAB"] + action_costs["CLIMB"]
+
+
+def hierarchical_search(problem, statistics=None, *, graph=None, cluster_size=8):
+    """
+    HPA* search (see the description at the top of the file) on the given problem, refining the
+    abstract path with A* using the heuristic function of the problem. The abstract graph can be
+    given to reuse it for the same world. It returns the HuntWumpusResult with a solution that is
+    not always optimal, the statistics report how far it can be from the optimal one.
+    """
+    statistics = statistics if statistics is not None else HierarchicalSearchStatistics()
+    static_properties = (HuntWumpusState.world_size, HuntWumpusState.block_locations,
+                         HuntWumpusState.pit_locations, HuntWumpusState.exit_locations,
+                         list(HuntWumpusState.gold_bits))
+
+    if problem.is_goal_state(problem.initial_state) or problem.get_infeasibility_reason() is not None:
+        return astar_search(problem, statistics)
+
+    statistics.lower_bound = get_lower_bound(problem)
+    graph = graph if graph is not None else HierarchicalGraph(problem, cluster_size)
+
+    try:
+        sequence_actions = _find_refined_actions(problem, graph, statistics)
+    finally:
+        # the sub-worlds of the clusters changed the static properties of the states
+        HuntWumpusState.setup_static_properties(*static_properties)
+
+    node = HuntWumpusNode(problem.initial_state)
+    for action in sequence_actions or []:
+        node = problem.get_child_from(node, with_action=action)
+
+    if sequence_actions and problem.is_goal_state(node.state):
+        result = HuntWumpusResult(sequence_actions, node.reward - node.path_cost)
+        path_cost = node.path_cost
+    else:
+        statistics.used_fallback = True
+        result = astar_search(problem, statistics)
+        node = HuntWumpusNode(problem.initial_state)
+        for action in result.sequence_actions:
+            node = problem.get_child_from(node, with_action=action)
+        path_cost = node.path_cost
+
+    if result.sequence_actions and statistics.lower_bound > 0:
+        statistics.suboptimality_bound = path_cost / statistics.lower_bound
+
+    return result
+
+
+def _find_refined_actions(problem, graph, statistics):
+    """
+    returns the actions of the refined abstract path hunter -> golds (closest first) -> exit, or
+    None if there is no abstract path
+    """
+    world_description = graph.world_description
+    hunter = world_description["hunters"][0]
+    cell = (hunter[0], hunter[1])
+    orientation = ORIENTATION_NAMES.index(hunter[2])
+    remaining_golds = [tuple(location) for location in world_description["golds"]]
+    exits = [tuple(location) for location in world_description["exits"]]
+    sequence_actions = []
+
+    while True:
+        targets = remaining_golds or exits
+        path, _ = graph.find_abstract_path(cell, orientation, targets, statistics)
+        if path is None:
+            return None
+
+        for node, next_node in zip(path, path[1:]):
+            if next_node[0] == "target":
+                actions = _refine_in_cluster(problem, graph, cell, orientation, next_node[1],
+                                             goal="gold" if remaining_golds else "exit", statistics=statistics)
+            elif graph.get_cluster_of(node[0]) != graph.get_cluster_of(next_node[0]):
+                actions = _get_turns(orientation, next_node[1], problem) + [problem.possible_actions.MOVE]
+            elif cell != next_node[0]:
+                actions = _refine_in_cluster(problem, graph, cell, orientation, next_node[0],
+                                             goal=None, statistics=statistics)
+            else:
+                actions = []
+
+            if actions is None:
+                return None
+
+            sequence_actions.extend(actions)
+            cell, orientation = _simulate(cell, orientation, actions, problem)
+
+        if remaining_golds:
+            remaining_golds.remove(path[-1][1])
+        else:
+            return sequence_actions
+
+
+def _refine_in_cluster(problem, graph, cell, orientation, target_cell, *, goal, statistics):
+    """
+    returns the actions found by A* to reach the target cell without leaving the cluster, then
+    grabbing the gold on it (goal "gold") or climbing out (goal "exit"), or None if there are none
+    """
+    cluster_x, cluster_y = graph.get_cluster_of(cell)
+    origin = (cluster_x * graph.cluster_size, cluster_y * graph.cluster_size)
+    size = (min(graph.cluster_size, graph.width - origin[0]), min(graph.cluster_size, graph.height - origin[1]))
+
+    def translate(locations):
+        return [[x - origin[0], y - origin[1]] for x, y in map(tuple, locations)
+                if 0 <= x - origin[0] < size[0] and 0 <= y - origin[1] < size[1]]
+
+    target = [target_cell[0] - origin[0], target_cell[1] - origin[1]]
+    cluster_world = {
+        "size": list(size),
+        "hunters": [[cell[0] - origin[0], cell[1] - origin[1], ORIENTATION_NAMES[orientation]]],
+        # wumpuses are walls like the pits
+        "pits": translate(graph.world_description["pits"] + graph.world_description["wumpuses"]),
+        "blocks": translate(graph.world_description["blocks"]),
+        "wumpuses": [],
+        "golds": [target] if goal == "gold" else [],
+        "exits": [target]
+    }
+
+    cluster_problem = HuntWumpusProblem.from_dict(cluster_world, problem.possible_actions,
+                                                  problem.heuristic_func, problem.cost_model)
+    result = astar_search(cluster_problem, statistics)
+    statistics.refined_clusters += 1
+
+    if not result.sequence_actions:
+        return None
+
+    actions = list(result.sequence_actions)
+    # the sub-world ends climbing out of the target, which is only wanted on the final exit
+    if goal != "exit":
+        actions.pop()
+    return actions
+
+
+def _get_turns(orientation, target_orientation, problem):
+    turns = (target_orientation - orientation) % 4
+    if turns == 3:
+        return [problem.possible_actions.LEFT]
+    return [problem.possible_actions.RIGHT] * turns
+
+
+def _simulate(cell, orientation, actions, problem):
+    """
+    returns the cell and orientation of the agent after performing the given actions
+    """
+    for action in actions:
+        if action is problem.possible_actions.RIGHT:
+            orientation = (orientation + 1) % 4
+        elif action is problem.possible_actions.LEFT:
+            orientation = (orientation + 3) % 4
+        elif action is problem.possible_actions.MOVE:
+            delta = ORIENTATION_DELTAS[orientation]
+            cell = (cell[0] + delta[0], cell[1] + delta[1])
+
+    return cell, orientation
@@ -1,16 +1,15 @@
 import os, sys
 sys.path.insert(1, os.path.abspath("modules/"))
 
-import math
 import random
 from typing import Iterable
 
-from queue import PriorityQueue
-
 import wumpus as wws
 
 from modules.hunt_wumpus_model import HuntWumpusResult
-from modules.hunt_wumpus_model import HuntWumpusProblem, HuntWumpusNode
+from modules.hunt_wumpus_model import HuntWumpusProblem
+from search_algorithms import SearchStatistics, astar_search
+from solution_cache import solve_with_cache
 
 # All possible heuristics:
 #
@@ -25,50 +24,19 @@ from heuristic_functions import heuristic_func_smart_manhattan as heuristic_func
 class AStarPlayer(wws.InformedPlayer, wws.UserPlayer):
     """Informed player demonstrating the use of the start episode method to inspect the world."""
 
+    # SolutionCache consulted before searching (None means the default one, if enabled)
+    solution_cache = None
+
     def astar_search(self, problem):
         """
-        Implementation of the pseudocode UCS AIMA4e found on:
-        https://github.com/aimacode/aima-pseudocode/blob/master/md/Uniform-Cost-Search.md
-        Added heuristic function and cost to optimize search algorithm
+        A* search (see search_algorithms.astar_search), it adds the visited nodes to the counter
         """
-
-        if (problem.is_goal_state(problem.initial_state)):
-            self.counter+=1
-            return HuntWumpusResult([], 0)
-
-        frontier = PriorityQueue()
-        reached = {} # {state: int}
-        solution = HuntWumpusNode(problem.initial_state, math.inf)
-
-        initial_node = HuntWumpusNode(problem.initial_state)
-        frontier.put(initial_node)
-        reached[initial_node.state] = initial_node.get_cost_heuristic_sum()
-
-        while not frontier.empty() and (node := frontier.get()).get_cost_heuristic_sum() < solution.get_cost_heuristic_sum():
-            # this modification is needed since the PriorityQueue that we use doesn’t update the value  of a node that is 
-            # already present when put(node) is executed. It will just add the cheaper one in a lower position. 
-            # When backtracking occurs it is not needed to expand a node that was already expanded with a lower 
-            # value, therefore we can safely skip it.
-            if node.get_cost_heuristic_sum() > reached[node.state]:
-                continue
-
-            childs = [problem.get_child_from(node, with_action= action) for action in problem.get_best_actions_for(node.state)]
-            self.counter += 1
-
-            for child in childs:
-                if (child.state not in reached) or (child.get_cost_heuristic_sum() < reached[child.state]):
-                    reached[child.state] = child.get_cost_heuristic_sum()
-                    frontier.put(child)
-
-                    if problem.is_goal_state(child.state) and child.get_cost_heuristic_sum() < solution.get_cost_heuristic_sum():
-                        solution = child
-
-        sequence_actions = problem.unwrap_solution(solution)
-        if sequence_actions:
-            return HuntWumpusResult(sequence_actions, solution.reward - solution.path_cost)  
-        else:
-            return HuntWumpusResult([], 0)
-        
+        statistics = SearchStatistics()
+        result = astar_search(problem, statistics)
+        self.counter += statistics.visited_nodes
+        if statistics.infeasibility_reason is not None:
+            print(f"The world has no solution: {statistics.infeasibility_reason}")
+        return result
     
     def _say(self, text: str):
         print(self.name + ' says: ' + text)
@@ -100,7 +68,10 @@ class AStarPlayer(wws.InformedPlayer, wws.UserPlayer):
         self.counter = 0
         self.reward = 0
 
-        result = self.astar_search(hunt_wumpus_problem)
+        # solutions already found for the same world are taken from the cache (if enabled)
+        result, self.counter = solve_with_cache(hunt_wumpus_problem, "A*", heuristic_func.__name__,
+                                                lambda problem: (self.astar_search(problem), self.counter),
+                                                self.solution_cache)
 
         if not result.sequence_actions:
             self.result_reward = -1
@@ -149,13 +120,15 @@ WUMPUS_WORLD = '''
 '''
 
 
-def play_fixed_informed(world_json: str = WUMPUS_WORLD):
+def play_fixed_informed(world_json: str = WUMPUS_WORLD, solution_cache=None):
     """Play on a given world described in JSON format."""
     # create the world
     world = wws.WumpusWorld.from_JSON(world_json)
 
     # Run a player with knowledge about the world
-    world.run_episode(AStarPlayer())
+    player = AStarPlayer()
+    player.solution_cache = solution_cache
+    world.run_episode(player)
 
 
 EXAMPLES = (play_fixed_informed)
@@ -1,15 +1,16 @@
 import os, sys
 sys.path.insert(1, os.path.abspath("modules/"))
 
-import math
 import random
-import queue
 from typing import Iterable
 
 import wumpus as wws
 
 from modules.hunt_wumpus_model import HuntWumpusResult
-from modules.hunt_wumpus_model import HuntWumpusProblem, HuntWumpusNode
+from modules.hunt_wumpus_model import HuntWumpusProblem
+from search_algorithms import SearchStatistics, breadth_first_search
+from frontier_search import FrontierSearchStatistics, frontier_breadth_first_search
+from solution_cache import solve_with_cache
 
 # DISCLAIMER: 
 # this is the implementation of the uninformed search algorithm Breadth First Search (BFS) 
@@ -19,34 +20,28 @@ class BFSPlayer(wws.InformedPlayer, wws.UserPlayer):
     Uninformed player demonstrating the Breadth First Search algorithm (BFS)
     """
 
+    # SolutionCache consulted before searching (None means the default one, if enabled)
+    solution_cache = None
+
+    # search keeping only the frontier in memory (see frontier_search.py), for large worlds
+    frontier_search = False
+
     def breadth_first_search(self, problem):
         """
-        Implementation of the pseudocode found on: 
-        https://github.com/aimacode/aima-pseudocode/blob/master/md/Breadth-First-Search.md 
-        (AIMA4e version)
+        Breadth first search (see search_algorithms.breadth_first_search, or 
+        frontier_search.frontier_breadth_first_search in frontier search mode), it adds the visited 
+        nodes to the counter
         """
-        node = HuntWumpusNode(problem.initial_state)
-
-        if problem.is_goal_state(node.state):
-            return HuntWumpusResult(problem.unwrap_solution(node), node.path_cost + node.reward)
-
-        frontier = queue.Queue()
-        frontier.put(node)
-        reached = set([problem.initial_state])
-
-        while not frontier.empty():
-            node = frontier.get()
-            childs = [problem.get_child_from(node, with_action=action) for action in problem.get_best_actions_for(node.state)]
-            self.counter += 1
-            for child in childs:
-                child_state = child.state
-                if problem.is_goal_state(child_state):
-                    return HuntWumpusResult(problem.unwrap_solution(child), child.path_cost + child.reward)
-                if child_state not in reached:
-                    reached.add(child_state)
-                    frontier.put(child)
-   
-        return HuntWumpusResult([], 0)
+        if self.frontier_search:
+            statistics = FrontierSearchStatistics()
+            result = frontier_breadth_first_search(problem, statistics)
+        else:
+            statistics = SearchStatistics()
+            result = breadth_first_search(problem, statistics)
+        self.counter += statistics.visited_nodes
+        if statistics.infeasibility_reason is not None:
+            print(f"The world has no solution: {statistics.infeasibility_reason}")
+        return result
 
     def _say(self, text: str):
         print(self.name + ' says: ' + text)
@@ -78,7 +73,10 @@ class BFSPlayer(wws.InformedPlayer, wws.UserPlayer):
         self.counter = 0
         self.reward = 0
 
-        result = self.breadth_first_search(hunt_wumpus_problem)
+        # solutions already found for the same world are taken from the cache (if enabled)
+        result, self.counter = solve_with_cache(hunt_wumpus_problem, "frontier_BFS" if self.frontier_search else "BFS", "",
+                                                lambda problem: (self.breadth_first_search(problem), self.counter),
+                                                self.solution_cache)
 
         if not result.sequence_actions:
             self.result_reward = -1
@@ -126,13 +124,15 @@ WUMPUS_WORLD = '''
 '''
 
 
-def play_fixed_informed(world_json: str = WUMPUS_WORLD):
+def play_fixed_informed(world_json: str = WUMPUS_WORLD, solution_cache=None):
     """Play on a given world described in JSON format."""
     # create the world
     world = wws.WumpusWorld.from_JSON(world_json)
 
     # Run a player with knowledge about the world
-    world.run_episode(BFSPlayer())
+    player = BFSPlayer()
+    player.solution_cache = solution_cache
+    world.run_episode(player)
 
 
 EXAMPLES = (play_fixed_informed)
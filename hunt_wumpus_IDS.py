@@ -8,6 +8,7 @@ import wumpus as wws
 
 from modules.hunt_wumpus_model import HuntWumpusResult
 from modules.hunt_wumpus_model import HuntWumpusProblem, HuntWumpusNode
+from solution_cache import solve_with_cache
 
 # DISCLAIMER: 
 # this is the implementation of the uninformed search algorithm Iterative Deepening Search (IDS) 
@@ -15,6 +16,9 @@ from modules.hunt_wumpus_model import HuntWumpusProblem, HuntWumpusNode
 class IDSPlayer(wws.InformedPlayer, wws.UserPlayer):
     """Informed player demonstrating the use of the start episode method to inspect the world."""
 
+    # SolutionCache consulted before searching (None means the default one, if enabled)
+    solution_cache = None
+
     def iterative_deepening_search(self, problem):
         """
         Implementation of the pseudocode found on: 
@@ -23,6 +27,12 @@ class IDSPlayer(wws.InformedPlayer, wws.UserPlayer):
         cutoff flag is [-1]
         no admissible solution flag is [-2]    
         """
+        # worlds without solution would be explored up to the deepest path
+        infeasibility_reason = problem.get_infeasibility_reason()
+        if infeasibility_reason is not None:
+            print(f"The world has no solution: {infeasibility_reason}")
+            return HuntWumpusResult([], 0)
+
         depth = 0
 
         while True:
@@ -109,7 +119,11 @@ class IDSPlayer(wws.InformedPlayer, wws.UserPlayer):
         self.result_reward = 0
         hunt_wumpus_problem = HuntWumpusProblem(world, wws.Hunter.Actions)
 
-        result = self.iterative_deepening_search(hunt_wumpus_problem)
+        # solutions already found for the same world are taken from the cache (if enabled)
+        result, self.total_counter = solve_with_cache(hunt_wumpus_problem, "IDS", "",
+                                                      lambda problem: (self.iterative_deepening_search(problem),
+                                                                       self.total_counter),
+                                                      self.solution_cache)
         
         if not result.sequence_actions:
             self.result_reward = -1
@@ -160,13 +174,15 @@ WUMPUS_WORLD = '''
 '''
 
 
-def play_fixed_informed(world_json: str = WUMPUS_WORLD):
+def play_fixed_informed(world_json: str = WUMPUS_WORLD, solution_cache=None):
     """Play on a given world described in JSON format."""
     # create the world
     world = wws.WumpusWorld.from_JSON(world_json)
 
     # Run a player with knowledge about the world
-    world.run_episode(IDSPlayer())
+    player = IDSPlayer()
+    player.solution_cache = solution_cache
+    world.run_episode(player)
 
 
 EXAMPLES = (play_fixed_informed)
@@ -1,50 +1,41 @@
 import os, sys
 sys.path.insert(1, os.path.abspath("modules/"))
 
-import math
 import random
 from typing import Iterable
 
-from queue import PriorityQueue
-
 import wumpus as wws
 
 from modules.hunt_wumpus_model import HuntWumpusResult
-from modules.hunt_wumpus_model import HuntWumpusProblem, HuntWumpusNode
+from modules.hunt_wumpus_model import HuntWumpusProblem
+from search_algorithms import SearchStatistics, ucs_search
+from frontier_search import FrontierSearchStatistics, frontier_ucs_search
+from solution_cache import solve_with_cache
 
 class UCSPlayer(wws.InformedPlayer, wws.UserPlayer):
     """Informed player demonstrating the use of the start episode method to inspect the world."""
 
+    # SolutionCache consulted before searching (None means the default one, if enabled)
+    solution_cache = None
+
+    # search keeping only the frontier in memory (see frontier_search.py), for large worlds
+    frontier_search = False
+
     def ucs_search(self, problem):
         """
-        Implementation of the pseudocode UCS AIMA4e found on:
-        https://github.com/aimacode/aima-pseudocode/blob/master/md/Uniform-Cost-Search.md
+        Uniform cost search (see search_algorithms.ucs_search, or frontier_search.frontier_ucs_search 
+        in frontier search mode), it adds the visited nodes to the counter
         """
-
-        if (problem.is_goal_state(problem.initial_state)):
-            self.counter += 1
-            return HuntWumpusResult([], 0)
-
-        frontier = PriorityQueue()
-        frontier.put(HuntWumpusNode(problem.initial_state))
-        reached = {} # {state: int}
-        solution = HuntWumpusNode(problem.initial_state, math.inf)
-    
-        while not frontier.empty() and (node := frontier.get()).path_cost < solution.path_cost:
-            childs = [problem.get_child_from(node, with_action= action) for action in problem.get_best_actions_for(node.state)]
-            self.counter += 1
-            for child in childs:
-                if (child.state not in reached) or (child.path_cost < reached[child.state]):
-                    reached[child.state] = child.path_cost
-                    frontier.put(child)
-                    if problem.is_goal_state(child.state) and child.path_cost < solution.path_cost:
-                        solution = child
-
-        sequence_actions = problem.unwrap_solution(solution)
-        if sequence_actions:
-            return HuntWumpusResult(sequence_actions, solution.reward - solution.path_cost)  
+        if self.frontier_search:
+            statistics = FrontierSearchStatistics()
+            result = frontier_ucs_search(problem, statistics)
         else:
-            return HuntWumpusResult([], 0)
+            statistics = SearchStatistics()
+            result = ucs_search(problem, statistics)
+        self.counter += statistics.visited_nodes
+        if statistics.infeasibility_reason is not None:
+            print(f"The world has no solution: {statistics.infeasibility_reason}")
+        return result
     
     def _say(self, text: str):
         print(self.name + ' says: ' + text)
@@ -79,7 +70,10 @@ class UCSPlayer(wws.InformedPlayer, wws.UserPlayer):
         self.reward = 0
         self.counter = 0
 
-        result = self.ucs_search(hunt_wumpus_problem)
+        # solutions already found for the same world are taken from the cache (if enabled)
+        result, self.counter = solve_with_cache(hunt_wumpus_problem, "frontier_UCS" if self.frontier_search else "UCS", "",
+                                                lambda problem: (self.ucs_search(problem), self.counter),
+                                                self.solution_cache)
 
         if not result.sequence_actions:
             self.result_reward = -1
@@ -127,13 +121,15 @@ WUMPUS_WORLD = '''
 '''
 
 
-def play_fixed_informed(world_json: str = WUMPUS_WORLD):
+def play_fixed_informed(world_json: str = WUMPUS_WORLD, solution_cache=None):
     """Play on a given world described in JSON format."""
     # create the world
     world = wws.WumpusWorld.from_JSON(world_json)
 
     # Run a player with knowledge about the world
-    world.run_episode(UCSPlayer())
+    player = UCSPlayer()
+    player.solution_cache = solution_cache
+    world.run_episode(player)
 
 
 EXAMPLES = (play_fixed_informed)
@@ -0,0 +1,176 @@
+import os, sys
+sys.path.insert(1, os.path.abspath("modules/"))
+
+import json
+import random
+import time
+from typing import Iterable
+
+import wumpus as wws
+
+from modules.hunt_wumpus_model import HuntWumpusProblem
+from policy_table import PolicyStatistics, PolicyTable
+
+# Player reading its actions from the policy table of the world (see policy_table.py): the table
+# is built once for all the starts of the hunter, so the episodes of the same world with other
+# starts (e.g. random spawns) don't search again.
+
+class PolicyPlayer(wws.InformedPlayer, wws.UserPlayer):
+    """Informed player following the policy table of the world, shared by all the starts of the hunter."""
+
+    # file of the policy table, read if it was built for the same world and written otherwise
+    # (None keeps the table only in memory)
+    policy_path = None
+
+    # PolicyTable of the last episode, reused by the next ones of the same world
+    policy = None
+
+    def get_policy(self, problem):
+        """
+        returns the PolicyTable of the world of the given problem: the one of the previous episode
+        or the one in policy_path if they are valid for it, otherwise a new one (PolicyTable.build
+        raises ValueError if the world has too many states for a table)
+        """
+        if self.policy is not None and self.policy.is_valid_for(problem):
+            return self.policy
+
+        if self.policy_path is not None and os.path.exists(self.policy_path):
+            policy = PolicyTable.load(self.policy_path)
+            if policy.is_valid_for(problem):
+                return policy
+
+        statistics = PolicyStatistics()
+        build_start_time = time.perf_counter()
+        policy = PolicyTable.build(problem, statistics)
+        print(f"policy table built in {time.perf_counter() - build_start_time:.2f}s: {statistics}")
+        if self.policy_path is not None:
+            policy.save(self.policy_path)
+        return policy
+
+    def _say(self, text: str):
+        print(self.name + ' says: ' + text)
+
+    def start_episode(self, world: wws.WumpusWorld):
+        """Print the description of the world before starting."""
+
+        world_info = {k: [] for k in ('Hunter', 'Pits', 'Wumpus', 'Gold', 'Exits')}
+        world_info['Size'] = (world.size.x, world.size.y)
+        world_info['Blocks'] = [(c.x, c.y) for c in world.blocks]
+
+        for obj in world.objects:
+            if isinstance(obj, wws.Hunter):
+                world_info['Hunter'].append((obj.location.x, obj.location.y))
+            elif isinstance(obj, wws.Pit):
+                world_info['Pits'].append((obj.location.x, obj.location.y))
+            elif isinstance(obj, wws.Wumpus):
+                world_info['Wumpus'].append((obj.location.x, obj.location.y))
+            elif isinstance(obj, wws.Exit):
+                world_info['Exits'].append((obj.location.x, obj.location.y))
+            elif isinstance(obj, wws.Gold):
+                world_info['Gold'].append((obj.location.x, obj.location.y))
+
+        print('World details:')
+        for k in ('Size', 'Pits', 'Wumpus', 'Gold', 'Exits', 'Blocks'):
+            print('  {}: {}'.format(k, world_info.get(k, None)))
+
+        self.problem = HuntWumpusProblem(world, wws.Hunter.Actions)
+        self.policy = self.get_policy(self.problem)
+        self.state = self.problem.initial_state
+        self.reward = 0
+
+        result = self.policy.get_plan(self.problem)
+        self.result_reward = result.total_reward if result.sequence_actions else -1
+
+        print("")
+        print("".join(["*" for i in range(25)] + [" [ policy table ] "] + ["*" for i in range(25)]))
+        print(f"actions required to solve the problem: {len(result.sequence_actions)}\n")
+        print(f"Action sequence: \n{list(map(lambda x: x.name, result.sequence_actions))}\n")
+        print(f"total reward for the found solution: {self.result_reward}")
+        print("".join(["*" for i in range(104)]))
+        print("")
+
+    def end_episode(self, outcome: int, alive: bool, success: bool):
+        """Method called at the when an episode is completed."""
+        self._say('Episode completed, my reward is {}'.format(outcome))
+
+    def play(self, turn: int, percept: wws.Hunter.Percept, actions: Iterable[wws.Hunter.Actions]) -> wws.Hunter.Actions:
+        # the next action of the current state is read from the table, climbing out if there is none
+        action = self.policy.get_next_action(self.problem, self.state)
+        if action is None:
+            return wws.Hunter.Actions.CLIMB
+        self.state = self.problem.get_successor_state_from(self.state, with_action=action, with_heuristic=False)
+        return action
+
+    def feedback(self, action: wws.Hunter.Actions, reward: int, percept: wws.Hunter.Percept):
+        """Receive in input the reward of the last action and the resulting state. The function is called right after the execution of the action."""
+        self.reward += reward
+
+
+
+
+WUMPUS_WORLD = '''
+    {
+        "id": "simple wumpus world",
+        "size": [7, 7],
+        "hunters": [[0, 0]],
+        "pits": [[4, 0], [3, 1], [2, 2], [6, 2], [4, 4], [3, 5], [4, 6], [5, 6]],
+        "wumpuses": [[1, 2]],
+        "exits": [[0, 0]],
+        "golds": [[6, 3]],
+        "blocks": []
+    }
+'''
+
+
+def play_fixed_informed(world_json: str = WUMPUS_WORLD):
+    """Play on a given world described in JSON format."""
+    # create the world
+    world = wws.WumpusWorld.from_JSON(world_json)
+
+    # Run a player with knowledge about the world
+    player = PolicyPlayer()
+    world.run_episode(player)
+
+
+def play_random_starts(world_json: str = WUMPUS_WORLD, episodes: int = 5):
+    """Play several episodes of a given world with random starts of the hunter, building the policy table once."""
+    world_description = json.loads(world_json)
+    occupied_cells = [tuple(location) for name in ("pits", "wumpuses", "blocks")
+                      for location in world_description.get(name, [])]
+    free_cells = [(x, y) for x in range(world_description["size"][0]) for y in range(world_description["size"][1])
+                  if (x, y) not in occupied_cells]
+
+    player = PolicyPlayer()
+    for episode in range(episodes):
+        x, y = random.choice(free_cells)
+        world_description["hunters"] = [[x, y, random.choice("NESW")]]
+        world = wws.WumpusWorld.from_JSON(json.dumps(world_description))
+        world.run_episode(player)
+
+
+EXAMPLES = (play_fixed_informed, play_random_starts)
+
+
+def main(*args):
+    ex_names = {ex.__name__.lower(): ex for ex in EXAMPLES}
+    ex = None
+    if len(args) > 0:
+        ex_name = args[0]
+        if ex_name.lower() in ex_names:
+            ex = ex_names[ex_name.lower()]
+        else:
+            print('Example {} not among the available {}'.format(ex_name, list(ex_names.keys())))
+            return -1
+    else:
+        # Randomly play one of the examples
+        ex = random.choice(EXAMPLES)
+
+    print('Example {}:'.format(ex.__name__))
+    print('  ' + ex.__doc__)
+    ex()
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(*sys.argv[1:]))
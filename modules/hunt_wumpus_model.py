@@ -1,12 +1,33 @@
-from typing import NamedTuple, Iterable
-from copy import deepcopy
+from collections import deque, namedtuple
+from enum import Enum
+
+import hashlib
+import json
 
-from wumpus import Hunter, Pit, Wumpus, Gold, Exit
 from linear_space import SmartCoordinate, SmartVector
 
+class HuntWumpusActions(Enum):
+    """
+    Actions available to the agent, with the same names of wumpus.Hunter.Actions so that 
+    the problem can be solved without importing the wumpus environment 
+    (use wumpus.Hunter.Actions[action.name] to convert them)
+    """
+    MOVE = 0
+    RIGHT = 1
+    LEFT = 2
+    SHOOT = 3
+    GRAB = 4
+    CLIMB = 5
+
+# orientations of the hunter as written in the JSON description of the world
+ORIENTATION_VECTORS = {"N": SmartVector(0, 1), "E": SmartVector(1, 0), 
+                       "S": SmartVector(0, -1), "W": SmartVector(-1, 0)}
+
 class HuntWumpusState(object):
     """
-    Represent a state of the Hunt the Wumpus game with: 
+    Represent a state of the Hunt the Wumpus game, the locations are tuples so successors share the 
+    unchanged ones with their parent (the states are keys of the reached states: after the construction 
+    only heuristic_cost is assigned, the other fields are part of the hash): 
     - agent_location: SmartCoordinate
             represents the current location of the agent in the world
     - agent_orientation: SmartVector
@@ -17,12 +38,15 @@ class HuntWumpusState(object):
             represents the availability of the arrow to the agent
     - has_agent_climbed_out: bool
             tells whether the agent has climbed out of the world
-    - wumpus_locations: [SmartCoordinate]
-            the list of wumpuses locations in the world
-    - gold_locations: [SmartCoordinate]
-            the list of golds locations in the world
+    - wumpus_locations: (SmartCoordinate)
+            the tuple of wumpuses locations in the world
+    - gold_locations: (SmartCoordinate)
+            the tuple of golds locations in the world
     - heuristic_cost: number
             the value of the heuristic associated to this state
+    - gold_mask: number
+            the bitmask of the golds left to grab (see gold_bits), used to compare and hash the 
+            states instead of the locations
 
     @static properties
     - world_size: (number, number) 
@@ -33,29 +57,44 @@ class HuntWumpusState(object):
             the list of pit_locations in the world
     - exit_locations: [SmartCoordinate] 
             the list of locations where the agent can escape from the game
+    - gold_bits: {SmartCoordinate: number}
+            the bit of each gold of the world in the gold_mask of the states
+    - world_version: number
+            incremented every time the static properties are set up, so the values computed for a 
+            world (e.g. by the heuristics) know when they are stale
     """
+    __slots__ = ("agent_location", "agent_orientation", "is_agent_alive", "is_arrow_available", 
+                 "has_agent_climbed_out", "wumpus_locations", "gold_locations", "heuristic_cost", 
+                 "gold_mask")
+
     world_size = (0, 0)
     block_locations = []
     pit_locations = []
     exit_locations = SmartCoordinate(0,0)
+    gold_bits = {}
+    world_version = 0
 
     def __init__(self, agent_location=SmartCoordinate(0,0), 
                        agent_orientation=SmartVector(0,1), 
                        is_agent_alive=True, 
                        is_arrow_available=True, 
                        has_agent_climbed_out=False, 
-                       wumpus_locations=[], 
-                       gold_locations=[], 
-                       heuristic_cost=0):
+                       wumpus_locations=(), 
+                       gold_locations=(), 
+                       heuristic_cost=0, 
+                       gold_mask=None):
 
         self.agent_location = agent_location
         self.agent_orientation = agent_orientation
         self.is_agent_alive = is_agent_alive
         self.is_arrow_available = is_arrow_available
         self.has_agent_climbed_out = has_agent_climbed_out
-        self.wumpus_locations = wumpus_locations
-        self.gold_locations = gold_locations
+        # tuple() returns the same object when the locations are already a tuple
+        self.wumpus_locations = tuple(wumpus_locations)
+        self.gold_locations = tuple(gold_locations)
         self.heuristic_cost = heuristic_cost
+        # the successors pass the mask along, it is computed only for the states built from locations
+        self.gold_mask = gold_mask if gold_mask is not None else HuntWumpusState.get_gold_mask_of(self.gold_locations)
 
     def __eq__(self, other):
         return self.agent_location == other.agent_location and \
@@ -64,13 +103,12 @@ class HuntWumpusState(object):
                self.is_arrow_available == other.is_arrow_available and \
                self.has_agent_climbed_out == other.has_agent_climbed_out and \
                self.wumpus_locations == other.wumpus_locations and \
-               self.gold_locations == other.gold_locations
+               self.gold_mask == other.gold_mask
                
     def __hash__(self):
         return hash((self.agent_location.x, self.agent_location.y, self.agent_orientation.x, 
                      self.agent_orientation.y, self.is_agent_alive, self.is_arrow_available, 
-                     self.has_agent_climbed_out, str(self.wumpus_locations), 
-                     str(self.gold_locations)))
+                     self.has_agent_climbed_out, self.wumpus_locations, self.gold_mask))
     
     def __str__(self):
         return f"HuntWumpusState: (agent_location = {self.agent_location}," \
@@ -101,24 +139,36 @@ class HuntWumpusState(object):
                + f"\n\texit_locations = {HuntWumpusState.exit_locations})"
 
     @staticmethod
-    def setup_static_properties(world_size, block_locations, pit_locations, exit_locations):
+    def setup_static_properties(world_size, block_locations, pit_locations, exit_locations, gold_locations=()):
         HuntWumpusState.world_size = world_size
         HuntWumpusState.block_locations = block_locations
         HuntWumpusState.pit_locations = pit_locations
         HuntWumpusState.exit_locations = exit_locations
+        HuntWumpusState.gold_bits = {location: 1 << index for index, location in enumerate(gold_locations)}
+        HuntWumpusState.world_version += 1
+
+    @staticmethod
+    def get_gold_mask_of(gold_locations):
+        """
+        returns the bitmask of the given gold locations (golds of the world set up with 
+        setup_static_properties)
+        """
+        gold_mask = 0
+        for location in gold_locations:
+            gold_mask |= HuntWumpusState.gold_bits[location]
+        return gold_mask
 
 
-class HuntWumpusResult(NamedTuple):
+class HuntWumpusResult(namedtuple("HuntWumpusResult", ["sequence_actions", "total_reward"])):
     """
     represents the result of the search showing:
-    - sequence_actions: [Hunter.Action]
+    - sequence_actions: [Hunter.Actions | HuntWumpusActions]
             represents the sequence of actions needed to reach the solution of the problem
     - total_reward: number
             represents the total reward of the agent after performing all actions in the 
             list of sequence actions
     """
-    sequence_actions: Iterable[Hunter.Actions]
-    total_reward: int
+    __slots__ = ()
 
 
 class HuntWumpusNode(object):
@@ -242,30 +292,127 @@ class HuntWumpusNode(object):
         return self.parent.unwrap_previous_actions() + [self.previous_action]
     
 
+class HuntWumpusCostModel(object):
+    """
+    Declarative definition of the costs and rewards of the actions, loaded from a JSON config 
+    (see the cost_models folder) and compiled by each HuntWumpusProblem into integer tables:
+    - name: str
+            a readable name of the cost model (e.g. the game mode)
+    - action_costs: {str: number}
+            the cost of each action (by name), SHOOT costs this only when it doesn't use the arrow
+    - arrow_cost: number
+            the cost of the SHOOT that uses the arrow
+    - gold_reward: number
+            the reward of the GRAB that picks up a gold
+    - death_reward: number
+            the reward of the MOVE that kills the agent (into a pit or a wumpus)
+
+    The heuristic functions assume the default costs (rotations cost 1, using the arrow costs 10), 
+    with other cost models A* may lose optimality while UCS doesn't.
+    """
+    ACTION_NAMES = ("MOVE", "RIGHT", "LEFT", "SHOOT", "GRAB", "CLIMB")
+
+    def __init__(self, action_costs, arrow_cost, gold_reward, death_reward, name="custom"):
+        for action_name in self.ACTION_NAMES:
+            if not isinstance(action_costs.get(action_name), int) or action_costs[action_name] <= 0:
+                raise ValueError(f"The cost of {action_name} must be a positive integer")
+        for value_name, value in (("arrow_cost", arrow_cost), ("gold_reward", gold_reward), 
+                                  ("death_reward", death_reward)):
+            if not isinstance(value, int):
+                raise ValueError(f"The {value_name} must be an integer")
+        if arrow_cost <= 0:
+            raise ValueError("The arrow_cost must be positive")
+
+        self.name = name
+        self.action_costs = {action_name: action_costs[action_name] for action_name in self.ACTION_NAMES}
+        self.arrow_cost = arrow_cost
+        self.gold_reward = gold_reward
+        self.death_reward = death_reward
+
+    @classmethod
+    def from_dict(cls, cost_model_description):
+        """
+        returns the HuntWumpusCostModel described as in the JSON files of the cost_models folder
+        """
+        return cls(cost_model_description["costs"], 
+                   cost_model_description["arrow_cost"], 
+                   cost_model_description["rewards"]["gold"], 
+                   cost_model_description["rewards"]["death"], 
+                   cost_model_description.get("name", "custom"))
+
+    @classmethod
+    def from_json(cls, cost_model_json):
+        return cls.from_dict(json.loads(cost_model_json))
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as cost_model_file:
+            return cls.from_json(cost_model_file.read())
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "costs": dict(self.action_costs),
+            "arrow_cost": self.arrow_cost,
+            "rewards": {"gold": self.gold_reward, "death": self.death_reward}
+        }
+
+    @property
+    def fingerprint(self):
+        """
+        identifies the costs and rewards (not the name), so stored solutions computed with another 
+        cost model are never reused
+        """
+        description = self.to_dict()
+        del description["name"]
+        digest = hashlib.sha256(json.dumps(description, sort_keys=True).encode("utf-8")).hexdigest()
+        return f"{self.name}-{digest[:16]}"
+
+    def compile(self, possible_actions):
+        """
+        returns the cost of each action of the given enumeration ({action: number}), the arrow 
+        cost, the gold reward and the death reward
+        """
+        action_costs = {possible_actions[action_name]: cost for action_name, cost in self.action_costs.items()}
+        return action_costs, self.arrow_cost, self.gold_reward, self.death_reward
+
+    def __str__(self):
+        return f"HuntWumpusCostModel: {self.to_dict()}"
+
+    def __repr__(self):
+        return self.__str__()
+
+
+# costs and rewards of the original game (see cost_models/default.json)
+DEFAULT_COST_MODEL = HuntWumpusCostModel({"MOVE": 1, "RIGHT": 1, "LEFT": 1, "SHOOT": 1, "GRAB": 1, "CLIMB": 1}, 
+                                         arrow_cost=10, gold_reward=1000, death_reward=-1000, name="default")
+
+
 class HuntWumpusProblem(object):
     """
     Is the formal representation of the hunt the wumpus problem in general:
     - initial_state: HuntWumpusState
             the initial state of the problem
-    - possible_actions: [Hunter.Actions]
-            is the list of possible actions that can be performed by the agent 
+    - possible_actions: Hunter.Actions | HuntWumpusActions
+            is the enumeration of possible actions that can be performed by the agent 
     - heuristic_func: (HuntWumpusNode) -> number
             is a function that calculates the heuristic of the current node against 
             the goal of the problem
-    - action_costs: { Hunter.Actions: lambda (state, action, next_state) -> number }
-            is a mapping between each possible action available to the agent and the 
-            associated function which can be used to calculate its cost
-    - action_rewards: { Hunter.Actions: lambda (state, action, next_state) -> number }
-            is a mapping between each possible action available to the agent and the 
-            associated function which can be used to calculate its reward
+    - cost_model: HuntWumpusCostModel
+            the costs and rewards of the actions (DEFAULT_COST_MODEL if not given)
+    - cost_model_id: str
+            the fingerprint of the cost model (stored solutions are keyed by it)
     """
   
-    def __init__(self, world, possible_actions, heuristic_func=lambda x: 0):
+    def __init__(self, world, possible_actions, heuristic_func=lambda x: 0, cost_model=None):
+        # the environment is imported only when the problem is built from a WumpusWorld
+        from wumpus import Hunter, Pit, Wumpus, Gold, Exit
+
         # world info unwrapping
         world_info = {k: [] for k in ('Hunter', 'Pits', 'Wumpus', 'Gold', 
                                       'Exits', 'Hunter_orientation')}
         world_info['Size'] = (world.size.x, world.size.y)
-        world_info['Blocks'] = [(c.x, c.y) for c in world.blocks]
+        world_info['Blocks'] = [SmartCoordinate(c.x, c.y) for c in world.blocks]
 
         for obj in world.objects:
             if isinstance(obj, Hunter):
@@ -290,46 +437,150 @@ class HuntWumpusProblem(object):
         agent_location = world_info["Hunter"][0]
         agent_orientation = world_info['Hunter_orientation'][0]
 
+        self._setup(world_size, block_locations, pit_locations, wumpus_locations, gold_locations, 
+                    exit_locations, agent_location, agent_orientation, possible_actions, heuristic_func, 
+                    cost_model)
+
+    @classmethod
+    def from_dict(cls, world_description, possible_actions=HuntWumpusActions, heuristic_func=lambda x: 0, 
+                  cost_model=None):
+        """
+        returns the HuntWumpusProblem of a world described with the schema of the JSON files in 
+        the data folder, without building the WumpusWorld of the environment
+        """
+        def to_coordinates(locations):
+            # a single location can be written without the wrapping list (e.g. "wumpuses": [3, 2])
+            if locations and not isinstance(locations[0], (list, tuple)):
+                locations = [locations]
+            return [SmartCoordinate(location[0], location[1]) for location in locations]
+
+        hunter = world_description["hunters"][0]
+        world_size = (world_description["size"][0], world_description["size"][1])
+        agent_location = SmartCoordinate(hunter[0], hunter[1])
+        agent_orientation = ORIENTATION_VECTORS[hunter[2] if len(hunter) > 2 else "N"]
+
+        problem = cls.__new__(cls)
+        problem._setup(world_size, 
+                       to_coordinates(world_description.get("blocks", [])), 
+                       to_coordinates(world_description.get("pits", [])), 
+                       to_coordinates(world_description.get("wumpuses", [])), 
+                       to_coordinates(world_description.get("golds", [])), 
+                       to_coordinates(world_description.get("exits", [])), 
+                       agent_location, agent_orientation, possible_actions, heuristic_func, cost_model)
+        return problem
+
+    @classmethod
+    def from_json(cls, world_json, possible_actions=HuntWumpusActions, heuristic_func=lambda x: 0, 
+                  cost_model=None):
+        """
+        returns the HuntWumpusProblem of a world described in JSON format (see from_dict)
+        """
+        return cls.from_dict(json.loads(world_json), possible_actions, heuristic_func, cost_model)
+
+    def _setup(self, world_size, block_locations, pit_locations, wumpus_locations, gold_locations, 
+               exit_locations, agent_location, agent_orientation, possible_actions, heuristic_func, 
+               cost_model=None):
+        HuntWumpusState.setup_static_properties(world_size, block_locations, 
+                                                pit_locations, exit_locations, gold_locations)
+
         self.initial_state = HuntWumpusState(agent_location, 
                                              agent_orientation, 
                                              wumpus_locations=wumpus_locations, 
                                              gold_locations=gold_locations)
-
-        HuntWumpusState.setup_static_properties(world_size, block_locations, 
-                                                pit_locations, exit_locations)
         
         self.possible_actions = possible_actions
         self.heuristic_func = heuristic_func
         self.initial_state.heuristic_cost = self.heuristic_func(self.initial_state)
-
-        # Action costs:
-        # Shooting (using the arrow) -> 10 (otherwise 1)
-        # All other -> 1
-        self.action_costs = {
-            Hunter.Actions.LEFT: lambda state, action, next_state: 1,
-            Hunter.Actions.RIGHT: lambda state, action, next_state: 1,
-            Hunter.Actions.MOVE: lambda state, action, next_state: 1,
-            Hunter.Actions.SHOOT: lambda state, action, next_state: 10 if (state.is_arrow_available == True) 
-                                                                          and (next_state.is_arrow_available == False)
-                                                                    else 1,
-            Hunter.Actions.GRAB: lambda state, action, next_state: 1,
-            Hunter.Actions.CLIMB: lambda state, action, next_state: 1
+        self._setup_action_masks()
+        self._setup_state_index()
+
+        # the costs and rewards depending on the states are handled in get_child_from
+        self.cost_model = cost_model if cost_model is not None else DEFAULT_COST_MODEL
+        self.cost_model_id = self.cost_model.fingerprint
+        self._action_costs, self._arrow_cost, self._gold_reward, self._death_reward = \
+            self.cost_model.compile(self.possible_actions)
+        
+    def to_dict(self):
+        """
+        returns the description of the world of the problem using the same schema of the 
+        JSON files in the data folder
+        """
+        orientation_names = {vector: name for name, vector in ORIENTATION_VECTORS.items()}
+        agent_orientation = self.initial_state.agent_orientation
+
+        def to_list(locations):
+            return [[location.x, location.y] for location in locations]
+
+        return {
+            "size": list(HuntWumpusState.world_size),
+            "hunters": [[self.initial_state.agent_location.x, 
+                         self.initial_state.agent_location.y, 
+                         orientation_names[agent_orientation]]],
+            "pits": to_list(HuntWumpusState.pit_locations),
+            "wumpuses": to_list(self.initial_state.wumpus_locations),
+            "exits": to_list(HuntWumpusState.exit_locations),
+            "golds": to_list(self.initial_state.gold_locations),
+            "blocks": to_list(HuntWumpusState.block_locations)
         }
 
-        # Action rewards:
-        # Grabbing the gold -> 1000
-        # Falling down in a pit -> -1000 (also end of game)
-        self.action_rewards = {
-            Hunter.Actions.LEFT: lambda state, action, next_state: 0,
-            Hunter.Actions.RIGHT: lambda state, action, next_state: 0,
-            Hunter.Actions.MOVE: lambda state, action, next_state: 0 if next_state.is_agent_alive 
-                                                                   else -1000,
-            Hunter.Actions.SHOOT: lambda state, action, next_state: 0,
-            Hunter.Actions.GRAB: lambda state, action, next_state: 1000 if (len(state.gold_locations) > len(next_state.gold_locations))
-                                                                   else 0,
-            Hunter.Actions.CLIMB: lambda state, action, next_state: 0
-        }
-        
+    def get_infeasibility_reason(self):
+        """
+        returns why the problem has no solution or None if it may have one, without searching: 
+        a flood fill over the free cells from the agent must reach all golds and an exit, first 
+        without killing wumpuses and then killing each one of them (there is only one arrow).
+        It takes O(cells * (wumpuses + 1)).
+        """
+        def describe(location):
+            return f"({location.x}, {location.y})"
+
+        if not HuntWumpusState.exit_locations:
+            return "there is no exit"
+
+        for gold_location in self.initial_state.gold_locations:
+            if gold_location in HuntWumpusState.pit_locations:
+                return f"the gold in {describe(gold_location)} is on a pit"
+            if not self.is_legal(gold_location, for_state=self.initial_state):
+                return f"the gold in {describe(gold_location)} is out of the world or on a block"
+
+        wumpus_locations = self.initial_state.wumpus_locations
+        blocked_cells = set((location.x, location.y) for location in HuntWumpusState.pit_locations)
+        blocked_cells.update((location.x, location.y) for location in HuntWumpusState.block_locations)
+        reason = None
+
+        for killed_wumpus in (None, ) + wumpus_locations:
+            wumpus_cells = set((location.x, location.y) for location in wumpus_locations if location is not killed_wumpus)
+            reachable_cells = self._flood_fill(blocked_cells | wumpus_cells)
+
+            unreachable_golds = [location for location in self.initial_state.gold_locations 
+                                 if (location.x, location.y) not in reachable_cells]
+            if unreachable_golds:
+                reason = reason or f"the gold in {describe(unreachable_golds[0])} can't be reached"
+            elif not any((location.x, location.y) in reachable_cells for location in HuntWumpusState.exit_locations):
+                reason = reason or "no exit can be reached"
+            else:
+                return None
+
+        return reason + (" (not even killing a wumpus)" if wumpus_locations else "")
+
+    def _flood_fill(self, blocked_cells):
+        """
+        returns the cells (x, y) that the agent can reach without entering the blocked cells
+        """
+        width, height = HuntWumpusState.world_size
+        start = (self.initial_state.agent_location.x, self.initial_state.agent_location.y)
+        reachable_cells = set([start])
+        frontier = deque([start])
+
+        while frontier:
+            x, y = frontier.popleft()
+            for cell in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
+                if (0 <= cell[0] < width and 0 <= cell[1] < height 
+                    and cell not in blocked_cells and cell not in reachable_cells):
+                    reachable_cells.add(cell)
+                    frontier.append(cell)
+
+        return reachable_cells
+
     def is_legal(self, location, *, for_state):
         """
         returns a boolean indicating if the given location is inside the world and it is not a block
@@ -370,16 +621,16 @@ class HuntWumpusProblem(object):
             return (state.agent_location in HuntWumpusState.exit_locations)
 
         switcher = {
-            Hunter.Actions.MOVE: is_MOVE_effective_for,
-            Hunter.Actions.SHOOT: is_SHOOT_effective_for,
-            Hunter.Actions.GRAB: is_GRAB_effective_for,
-            Hunter.Actions.CLIMB: is_CLIMB_effective_for,
+            self.possible_actions.MOVE: is_MOVE_effective_for,
+            self.possible_actions.SHOOT: is_SHOOT_effective_for,
+            self.possible_actions.GRAB: is_GRAB_effective_for,
+            self.possible_actions.CLIMB: is_CLIMB_effective_for,
         }
 
         effective_actions = []
 
         for action in available_actions:
-            if action == Hunter.Actions.LEFT or action == Hunter.Actions.RIGHT:
+            if action == self.possible_actions.LEFT or action == self.possible_actions.RIGHT:
                 effective_actions.append(action)
                 continue
 
@@ -389,64 +640,150 @@ class HuntWumpusProblem(object):
         
         return effective_actions
 
+    def _setup_action_masks(self):
+        """
+        precomputes, for each cell and orientation of the agent, the bitmask of the actions that are 
+        useful only depending on the world (MOVE, LEFT, RIGHT, CLIMB), see get_best_actions_for
+        """
+        actions = self.possible_actions
+        self._action_bits = {action: 1 << index for index, action in enumerate((actions.MOVE, actions.RIGHT, actions.LEFT, 
+                                                                                 actions.SHOOT, actions.GRAB, actions.CLIMB))}
+        self._actions_by_mask = {mask: tuple(action for action, bit in self._action_bits.items() if mask & bit) 
+                                 for mask in range(1 << len(self._action_bits))}
+        self._action_masks = {} # {(x, y, orientation_x, orientation_y): number}
+
+        def is_free(location):
+            return (self.is_legal(location, for_state=self.initial_state) 
+                    and location not in HuntWumpusState.pit_locations)
+
+        for x in range(HuntWumpusState.world_size[0]):
+            for y in range(HuntWumpusState.world_size[1]):
+                location = SmartCoordinate(x, y)
+                if location in HuntWumpusState.block_locations:
+                    continue
+
+                for agent_orientation in ORIENTATION_VECTORS.values():
+                    perpendicular_orientation = agent_orientation.get_perpendicular_vector_clockwise()
+                    mask = 0
+
+                    # no move into a pit (or outside the world)
+                    if is_free(location + agent_orientation):
+                        mask |= self._action_bits[actions.MOVE]
+
+                    # best rotation moves to get around obstacles
+                    if not is_free(location - perpendicular_orientation): # WEST is a block
+                        if not is_free(location + perpendicular_orientation): # EAST is a block
+                            if is_free(location - agent_orientation): # SOUTH not a block
+                                mask |= self._action_bits[actions.RIGHT]
+                        else: # EAST not a block
+                            mask |= self._action_bits[actions.RIGHT]
+                    else: # WEST not a block
+                        mask |= self._action_bits[actions.LEFT]
+                        if is_free(location + perpendicular_orientation): # EAST not a block
+                            mask |= self._action_bits[actions.RIGHT]
+
+                    # climb out only from an exit (and after grabbing the gold, checked at runtime)
+                    if location in HuntWumpusState.exit_locations:
+                        mask |= self._action_bits[actions.CLIMB]
+
+                    self._action_masks[(x, y, agent_orientation.x, agent_orientation.y)] = mask
+
+    def _setup_state_index(self):
+        """
+        prepares the perfect index of the states (see get_state_index): the bits of the wumpuses of the 
+        initial state and the number of indexes (state_index_size)
+        """
+        self._orientation_indexes = {(vector.x, vector.y): index for index, vector in enumerate(ORIENTATION_VECTORS.values())}
+        self._wumpus_bits = {location: 1 << index for index, location in enumerate(self.initial_state.wumpus_locations)}
+        self._wumpus_count = len(self._wumpus_bits)
+        self._gold_count = len(HuntWumpusState.gold_bits)
+        self._world_height = HuntWumpusState.world_size[1]
+        self.state_index_size = ((HuntWumpusState.world_size[0] * HuntWumpusState.world_size[1] * 4 * 2) 
+                                 << (self._wumpus_count + self._gold_count)) * 4
+
+    def get_state_index(self, state):
+        """
+        returns the number in range(state_index_size) identifying the state: agent cell, orientation, 
+        arrow, alive wumpuses, golds left, alive and climbed out. Different states of the problem 
+        always have different indexes (perfect hashing), so the states can be stored in arrays.
+        """
+        wumpus_mask = 0
+        for location in state.wumpus_locations:
+            wumpus_mask |= self._wumpus_bits[location]
+
+        index = ((state.agent_location.x * self._world_height + state.agent_location.y) * 4 
+                 + self._orientation_indexes[(state.agent_orientation.x, state.agent_orientation.y)]) * 2 \
+                + state.is_arrow_available
+        index = (((index << self._wumpus_count) | wumpus_mask) << self._gold_count) | state.gold_mask
+        return index * 4 + state.is_agent_alive * 2 + state.has_agent_climbed_out
+
+    def get_state_from_index(self, index):
+        """
+        returns the HuntWumpusState with the given index (the inverse of get_state_index), without
+        heuristic_cost
+        """
+        has_agent_climbed_out, is_agent_alive = bool(index & 1), bool(index >> 1 & 1)
+        index >>= 2
+        gold_mask = index & ((1 << self._gold_count) - 1)
+        index >>= self._gold_count
+        wumpus_mask = index & ((1 << self._wumpus_count) - 1)
+        index >>= self._wumpus_count
+        is_arrow_available = bool(index & 1)
+        cell, orientation_index = divmod(index >> 1, 4)
+        x, y = divmod(cell, self._world_height)
+
+        return HuntWumpusState(SmartCoordinate(x, y),
+                               list(ORIENTATION_VECTORS.values())[orientation_index],
+                               is_agent_alive,
+                               is_arrow_available,
+                               has_agent_climbed_out,
+                               tuple(location for location, bit in self._wumpus_bits.items() if wumpus_mask & bit),
+                               tuple(location for location, bit in HuntWumpusState.gold_bits.items() if gold_mask & bit),
+                               gold_mask=gold_mask)
+
     def get_best_actions_for(self, state):
         """
         calculate the best rotation actions for the current state, improving the efficiency 
-        of the rotation of the agent
+        of the rotation of the agent.
+        The actions depending only on the world are precomputed for each cell and orientation, 
+        at runtime only shooting, grabbing and climbing are checked against the state.
+        It returns a tuple shared by all states with the same useful actions.
         """
+        if state.has_agent_climbed_out or not state.is_agent_alive:
+            return ()
+
         if state.gold_locations and state.gold_locations[0] in HuntWumpusState.pit_locations:
-            return []
+            return ()
 
-        effective_actions = set(self.get_effective_actions_for(state))
-        useless_actions = set()
+        # on an exit without golds left climbing out is the only sensible action
+        if self.is_exit_reached(state):
+            return self._actions_by_mask[self._action_bits[self.possible_actions.CLIMB]]
 
-        # no shoot if there is no wumpus to kill
-        if state.agent_location + state.agent_orientation not in state.wumpus_locations:
-            useless_actions.add(Hunter.Actions.SHOOT)
+        agent_location = state.agent_location
+        agent_orientation = state.agent_orientation
+        mask = self._action_masks[(agent_location.x, agent_location.y, agent_orientation.x, agent_orientation.y)]
 
         # no climb out if we haven't grabbed the gold
         if state.gold_locations:
-            useless_actions.add(Hunter.Actions.CLIMB)
+            mask &= ~self._action_bits[self.possible_actions.CLIMB]
+            if agent_location in state.gold_locations:
+                mask |= self._action_bits[self.possible_actions.GRAB]
 
-        # no move into a pit
-        if state.agent_location + state.agent_orientation in HuntWumpusState.pit_locations:
-            useless_actions.add(Hunter.Actions.MOVE)
-        
-        # best rotation moves to get around obstacles
-        agent_orientation = state.agent_orientation
-        perpendicular_orientation = state.agent_orientation.get_perpendicular_vector_clockwise()
-
-        east_location = state.agent_location + perpendicular_orientation
-        south_location = state.agent_location - agent_orientation
-        west_location = state.agent_location - perpendicular_orientation
-
-        if (not self.is_legal(west_location, for_state=state) 
-           or west_location in HuntWumpusState.pit_locations): # WEST is a block
-            if (not self.is_legal(east_location, for_state=state) 
-               or east_location in HuntWumpusState.pit_locations): # EAST is a block
-                if (not self.is_legal(south_location, for_state=state) 
-                   or south_location in HuntWumpusState.pit_locations): # SOUTH is a block
-                    useless_actions = useless_actions.union(set([Hunter.Actions.RIGHT, Hunter.Actions.LEFT]))
-                else: # SOUTH not a block
-                    useless_actions = useless_actions.union(set([Hunter.Actions.LEFT]))
-            else: # EAST not a block
-                useless_actions = useless_actions.union(set([Hunter.Actions.LEFT]))
-        else: #WEST not a block
-            if (not self.is_legal(east_location, for_state=state) 
-                or east_location in HuntWumpusState.pit_locations): # EAST is a block
-                useless_actions = useless_actions.union(set([Hunter.Actions.RIGHT]))
-
-        return effective_actions - useless_actions
-
-    def get_successor_state_from(self, state, *, with_action):
+        # no shoot if there is no wumpus to kill
+        if state.is_arrow_available and agent_location + agent_orientation in state.wumpus_locations:
+            mask |= self._action_bits[self.possible_actions.SHOOT]
+
+        return self._actions_by_mask[mask]
+
+    def get_successor_state_from(self, state, *, with_action, with_heuristic=True):
         """
         returns the successor HuntWumpusState resulting from applying the given action
-        on the given state
+        on the given state (without computing its heuristic_cost if with_heuristic is False)
         """
         action = with_action
 
         if action not in self.get_effective_actions_for(state):
-            return deepcopy(state)
+            return self.get_copy_of(state)
 
         def get_LEFT_successor_from(state):
             return HuntWumpusState(state.agent_location, 
@@ -455,7 +792,8 @@ class HuntWumpusProblem(object):
                                    state.is_arrow_available, 
                                    state.has_agent_climbed_out, 
                                    state.wumpus_locations, 
-                                   state.gold_locations)
+                                   state.gold_locations, 
+                                   gold_mask=state.gold_mask)
 
         def get_RIGHT_successor_from(state):
             return HuntWumpusState(state.agent_location, 
@@ -464,7 +802,8 @@ class HuntWumpusProblem(object):
                                    state.is_arrow_available, 
                                    state.has_agent_climbed_out, 
                                    state.wumpus_locations, 
-                                   state.gold_locations)
+                                   state.gold_locations, 
+                                   gold_mask=state.gold_mask)
 
         def get_MOVE_successor_from(state):
             new_location = (state.agent_location + state.agent_orientation)
@@ -480,27 +819,31 @@ class HuntWumpusProblem(object):
                                    state.is_arrow_available, 
                                    state.has_agent_climbed_out, 
                                    state.wumpus_locations,
-                                   state.gold_locations)
+                                   state.gold_locations, 
+                                   gold_mask=state.gold_mask)
 
         def get_SHOOT_successor_from(state):
-            remaining_wumpus = list(filter(lambda element: element != (state.agent_location + state.agent_orientation), state.wumpus_locations))
+            target_location = state.agent_location + state.agent_orientation
+            remaining_wumpus = tuple(location for location in state.wumpus_locations if location != target_location)
             return HuntWumpusState(state.agent_location, 
                                    state.agent_orientation, 
                                    state.is_agent_alive, 
                                    False, 
                                    state.has_agent_climbed_out, 
                                    remaining_wumpus, 
-                                   state.gold_locations)
+                                   state.gold_locations, 
+                                   gold_mask=state.gold_mask)
 
         def get_GRAB_successor_from(state):
-            remaining_golds = list(filter(lambda element: element != state.agent_location, state.gold_locations))
+            remaining_golds = tuple(location for location in state.gold_locations if location != state.agent_location)
             return HuntWumpusState(state.agent_location, 
                                    state.agent_orientation, 
                                    state.is_agent_alive, 
                                    state.is_arrow_available, 
                                    state.has_agent_climbed_out, 
                                    state.wumpus_locations, 
-                                   remaining_golds)
+                                   remaining_golds, 
+                                   gold_mask=state.gold_mask & ~HuntWumpusState.gold_bits[state.agent_location])
 
         def get_CLIMB_successor_from(state):
             return HuntWumpusState(state.agent_location, 
@@ -508,46 +851,129 @@ class HuntWumpusProblem(object):
                                    state.is_agent_alive, 
                                    state.is_arrow_available, 
                                    state.agent_location in HuntWumpusState.exit_locations, 
-                                   state.wumpus_locations, state.gold_locations)
+                                   state.wumpus_locations, state.gold_locations, 
+                                   gold_mask=state.gold_mask)
 
         switcher = {
-            Hunter.Actions.LEFT: get_LEFT_successor_from,
-            Hunter.Actions.RIGHT: get_RIGHT_successor_from,
-            Hunter.Actions.MOVE: get_MOVE_successor_from,
-            Hunter.Actions.SHOOT: get_SHOOT_successor_from,
-            Hunter.Actions.GRAB: get_GRAB_successor_from,
-            Hunter.Actions.CLIMB: get_CLIMB_successor_from
+            self.possible_actions.LEFT: get_LEFT_successor_from,
+            self.possible_actions.RIGHT: get_RIGHT_successor_from,
+            self.possible_actions.MOVE: get_MOVE_successor_from,
+            self.possible_actions.SHOOT: get_SHOOT_successor_from,
+            self.possible_actions.GRAB: get_GRAB_successor_from,
+            self.possible_actions.CLIMB: get_CLIMB_successor_from
         }
 
-        get_successor_state_from = switcher.get(action, lambda x: deepcopy(state))
-        successor = get_successor_state_from(state)
-        successor.heuristic_cost = self.heuristic_func(successor)
+        get_successor_state_from = switcher.get(action, self.get_copy_of)
+        successor = self.get_canonical_state(get_successor_state_from(state))
+        if with_heuristic:
+            successor.heuristic_cost = self.heuristic_func(successor)
         return successor
 
+    def get_copy_of(self, state):
+        """
+        returns a new HuntWumpusState equal to the given one (sharing its locations, which never 
+        change), so its heuristic_cost can be assigned independently
+        """
+        return HuntWumpusState(state.agent_location, 
+                               state.agent_orientation, 
+                               state.is_agent_alive, 
+                               state.is_arrow_available, 
+                               state.has_agent_climbed_out, 
+                               state.wumpus_locations, 
+                               state.gold_locations, 
+                               state.heuristic_cost, 
+                               state.gold_mask)
+
+    def is_exit_reached(self, state):
+        """
+        returns True if the agent is alive on an exit without golds left to grab (it only has to climb out)
+        """
+        return (state.is_agent_alive and not state.has_agent_climbed_out and not state.gold_locations 
+                and state.agent_location in HuntWumpusState.exit_locations)
+
+    def get_canonical_state(self, state):
+        """
+        returns the representative of the states that are interchangeable for the rest of the plan:
+        when the agent is dead or has climbed out no action is available and when it has reached an exit 
+        without golds left it can only climb out, so orientation, arrow and wumpuses don't matter anymore
+        """
+        if not state.is_agent_alive:
+            return HuntWumpusState(state.agent_location, 
+                                   ORIENTATION_VECTORS["N"], 
+                                   False, 
+                                   False, 
+                                   state.has_agent_climbed_out, 
+                                   (), 
+                                   ())
+
+        if state.has_agent_climbed_out or self.is_exit_reached(state):
+            return HuntWumpusState(state.agent_location, 
+                                   ORIENTATION_VECTORS["N"], 
+                                   True, 
+                                   False, 
+                                   state.has_agent_climbed_out, 
+                                   (), 
+                                   state.gold_locations, 
+                                   gold_mask=state.gold_mask)
+
+        return state
+
     def is_goal_state(self, state):
         """
         returns True if the agent has grabbed the gold and climbed out of the world
         """
         return state.has_agent_climbed_out and not state.gold_locations and state.is_agent_alive
 
-    def get_child_from(self, node, *, with_action):
+    def get_child_from(self, node, *, with_action, with_heuristic=True):
         """
         returns the child HuntWumpusNode resulting from applying the given action on 
-        the given node
+        the given node (without computing the heuristic_cost of its state if with_heuristic is False)
         """   
         action = with_action
 
-        next_state = self.get_successor_state_from(node.state, with_action=action)
+        state = node.state
+        next_state = self.get_successor_state_from(state, with_action=action, with_heuristic=with_heuristic)
 
-        get_action_cost_from = self.action_costs.get(action, lambda x, y, z: 1)
-        action_cost = get_action_cost_from(node.state, action, next_state)
+        action_cost = self._action_costs[action]
+        action_reward = 0
 
-        get_action_reward_from = self.action_rewards.get(action, lambda x, y, z: 0)
-        action_reward = get_action_reward_from(node.state, action, next_state)
+        # shooting costs more when it uses the arrow, dying and grabbing a gold are rewarded
+        if action is self.possible_actions.SHOOT:
+            if state.is_arrow_available and not next_state.is_arrow_available:
+                action_cost = self._arrow_cost
+        elif action is self.possible_actions.MOVE:
+            if not next_state.is_agent_alive:
+                action_reward = self._death_reward
+        elif action is self.possible_actions.GRAB:
+            if len(state.gold_locations) > len(next_state.gold_locations):
+                action_reward = self._gold_reward
 
         return HuntWumpusNode(next_state, node.path_cost + action_cost, 
                               node.reward + action_reward, action, node)
 
+    def get_children_from(self, node):
+        """
+        returns the child HuntWumpusNodes of the best actions for the state of the given node, evaluating 
+        the heuristic of all their states in one call (see evaluate_heuristic)
+        """
+        children = [self.get_child_from(node, with_action=action, with_heuristic=False) 
+                    for action in self.get_best_actions_for(node.state)]
+
+        for child, heuristic_cost in zip(children, self.evaluate_heuristic([child.state for child in children])):
+            child.state.heuristic_cost = heuristic_cost
+        return children
+
+    def evaluate_heuristic(self, states):
+        """
+        returns the list of heuristic costs of the given states, computed in one call when the heuristic 
+        function has a batch version (its batch attribute, taking the list of states), which shares the 
+        work common to the states (e.g. the children of an expansion)
+        """
+        batch_heuristic_func = getattr(self.heuristic_func, "batch", None)
+        if batch_heuristic_func is not None:
+            return batch_heuristic_func(states)
+        return [self.heuristic_func(state) for state in states]
+
     def unwrap_solution(self, node):
         """
         returns all actions performed from the initial_node to the given node
@@ -0,0 +1,92 @@
+from linear_space import SmartCoordinate, SmartVector
+
+# Orientation helpers of the heuristics as constant lookup tables: which orientations reach a
+# destination, which ones move away from it and how many turns are needed to face it only depend
+# on the signs of the offset to the destination (3x3) and on the orientation of the agent (4).
+# The compute_* functions fill the tables, tests/test_orientation_tables.py checks the tables against
+# the original helpers of heuristic_functions.py.
+
+ALL_ORIENTATIONS = (SmartVector(1, 0), SmartVector(0, 1), SmartVector(0, -1), SmartVector(-1, 0))
+
+
+def compute_orientations_to_reach(to_location, *, from_location):
+    """
+    returns the list of vectors aligned to the destination, from the from_location
+    """
+    if from_location == to_location:
+        return []
+    elif to_location.x == from_location.x: # goal and agent on same row (axes Y)
+        return [SmartVector(0, 1) if to_location.y > from_location.y else SmartVector(0, -1)]
+    elif to_location.y == from_location.y:
+        return [SmartVector(1, 0) if to_location.x > from_location.x else SmartVector(-1, 0)]
+    else:
+        y_component = 1 if to_location.y > from_location.y else -1
+        x_component = 1 if to_location.x > from_location.x else -1
+        return [SmartVector(x_component, 0), SmartVector(0, y_component)]
+
+def compute_orientations_to_move_away_from(to_location, *, from_location):
+    """
+    returns the list of vectors that take you away from the destination
+    """
+    reaching_orientations = compute_orientations_to_reach(to_location, from_location=from_location)
+    return [vector for vector in ALL_ORIENTATIONS if vector not in reaching_orientations]
+
+def compute_cost_to_orientate_to(to_location, *, from_location, with_orientation):
+    """
+    returns the minimum number of turns to orientate the agent to point to the destination location
+    """
+    reaching_orientations = compute_orientations_to_reach(to_location, from_location=from_location)
+
+    if not reaching_orientations or with_orientation in reaching_orientations:
+        return 0
+
+    perpendicular_orientation = with_orientation.get_perpendicular_vector_clockwise()
+    if perpendicular_orientation in reaching_orientations or -perpendicular_orientation in reaching_orientations:
+        return 1
+    return 2
+
+
+SIGNS = (-1, 0, 1)
+_ORIGIN = SmartCoordinate(0, 0)
+
+# {(sign dx, sign dy): (SmartVector)}
+ORIENTATIONS_TO_REACH = {(x_sign, y_sign): tuple(compute_orientations_to_reach(SmartCoordinate(x_sign, y_sign),
+                                                                               from_location=_ORIGIN))
+                         for x_sign in SIGNS for y_sign in SIGNS}
+
+# {(sign dx, sign dy): (SmartVector)}
+ORIENTATIONS_TO_MOVE_AWAY_FROM = {(x_sign, y_sign): tuple(compute_orientations_to_move_away_from(
+                                                              SmartCoordinate(x_sign, y_sign), from_location=_ORIGIN))
+                                  for x_sign in SIGNS for y_sign in SIGNS}
+
+# {(sign dx, sign dy, orientation x, orientation y): number of turns}
+COSTS_TO_ORIENTATE = {(x_sign, y_sign, orientation.x, orientation.y):
+                          compute_cost_to_orientate_to(SmartCoordinate(x_sign, y_sign), from_location=_ORIGIN,
+                                                       with_orientation=orientation)
+                      for x_sign in SIGNS for y_sign in SIGNS for orientation in ALL_ORIENTATIONS}
+
+
+def get_orientations_to_reach(to_location, *, from_location):
+    """
+    returns the tuple of vectors aligned to the destination, from the from_location
+    """
+    dx = to_location.x - from_location.x
+    dy = to_location.y - from_location.y
+    return ORIENTATIONS_TO_REACH[((dx > 0) - (dx < 0), (dy > 0) - (dy < 0))]
+
+def get_orientations_to_move_away_from(to_location, *, from_location):
+    """
+    returns the tuple of vectors that take you away from the destination
+    """
+    dx = to_location.x - from_location.x
+    dy = to_location.y - from_location.y
+    return ORIENTATIONS_TO_MOVE_AWAY_FROM[((dx > 0) - (dx < 0), (dy > 0) - (dy < 0))]
+
+def get_cost_to_orientate_to(to_location, *, from_location, with_orientation):
+    """
+    returns the minimum number of turns to orientate the agent to point to the destination location
+    (the orientation can be any object with unit x and y, e.g. the offset between adjacent cells)
+    """
+    dx = to_location.x - from_location.x
+    dy = to_location.y - from_location.y
+    return COSTS_TO_ORIENTATE[((dx > 0) - (dx < 0), (dy > 0) - (dy < 0), with_orientation.x, with_orientation.y)]
@@ -0,0 +1,273 @@
+import os, sys
+sys.path.insert(1, os.path.join(os.path.dirname(os.path.abspath(__file__)), "modules"))
+
+import math
+import multiprocessing
+import queue
+from heapq import heappush, heappop
+
+from modules.linear_space import SmartCoordinate, SmartVector
+from modules.hunt_wumpus_model import HuntWumpusState, HuntWumpusNode, HuntWumpusProblem, HuntWumpusResult
+from search_algorithms import SearchStatistics, is_infeasible
+from solve import DEFAULT_HEURISTIC, load_heuristic
+
+# Hash Distributed A* (HDA*): the states are partitioned among the worker processes by their hash,
+# every worker owns the open and closed lists of its states and sends the generated nodes to their
+# owners in batches.
+# The search ends when all workers are idle (no node with f lower than the cost of the best solution
+# found) and no batch of nodes is in flight, so the solution is optimal if the heuristic is admissible.
+
+# nodes expanded by a worker before sending the generated nodes to their owners
+EXPANSIONS_PER_ROUND = 32
+
+def pack_state(state):
+    """
+    returns the HuntWumpusState as a tuple of numbers (cheap to send to other processes and with
+    the same hash in all of them)
+    """
+    return (state.agent_location.x, state.agent_location.y,
+            state.agent_orientation.x, state.agent_orientation.y,
+            state.is_agent_alive, state.is_arrow_available, state.has_agent_climbed_out,
+            tuple((location.x, location.y) for location in state.wumpus_locations),
+            tuple((location.x, location.y) for location in state.gold_locations))
+
+def unpack_state(packed_state):
+    """
+    returns the HuntWumpusState packed with pack_state
+    """
+    x, y, orientation_x, orientation_y, is_agent_alive, is_arrow_available, has_agent_climbed_out, \
+        wumpus_locations, gold_locations = packed_state
+
+    return HuntWumpusState(SmartCoordinate(x, y),
+                           SmartVector(orientation_x, orientation_y),
+                           is_agent_alive,
+                           is_arrow_available,
+                           has_agent_climbed_out,
+                           tuple(SmartCoordinate(x, y) for x, y in wumpus_locations),
+                           tuple(SmartCoordinate(x, y) for x, y in gold_locations))
+
+
+def _run_worker(worker_id, world_description, heuristic, inboxes, results, lock,
+                in_flight_batches, busy_workers, solution_cost, done, batch_size):
+    """
+    Main loop of a HDA* worker, messages received in the inbox:
+    - ("nodes", [(packed_state, path_cost, heuristic_cost, reward, parent_packed_state, action, is_goal)])
+            nodes generated by other workers (or the initial node) owned by this worker
+    - ("report",)
+            asks for the best solution found by the worker and its statistics
+    - ("trace", packed_state)
+            asks for the parent and the action that generated the given state (to rebuild the path)
+    - ("stop",)
+            ends the worker
+    """
+    heuristic_func = load_heuristic(heuristic) if heuristic else (lambda state: 0)
+    problem = HuntWumpusProblem.from_dict(world_description, heuristic_func=heuristic_func)
+    workers = len(inboxes)
+    inbox = inboxes[worker_id]
+
+    frontier = [] # heap of (f, heuristic_cost, order, packed_state)
+    reached = {} # {packed_state: (path_cost, reward, parent_packed_state, action)}
+    outboxes = [[] for _ in range(workers)]
+    best_solution = None # (path_cost, reward, packed_state)
+    is_busy = True
+    order = 0
+    expanded_nodes = 0
+    sent_batches = 0
+
+    def insert(nodes):
+        nonlocal order, best_solution
+        for packed_state, path_cost, heuristic_cost, reward, parent, action, is_goal in nodes:
+            if path_cost + heuristic_cost >= solution_cost.value:
+                continue
+            if packed_state in reached and reached[packed_state][0] <= path_cost:
+                continue
+
+            reached[packed_state] = (path_cost, reward, parent, action)
+
+            if is_goal:
+                best_solution = (path_cost, reward, packed_state)
+                with lock:
+                    solution_cost.value = min(solution_cost.value, path_cost)
+            else:
+                order += 1
+                heappush(frontier, (path_cost + heuristic_cost, heuristic_cost, order, packed_state))
+
+    def send_generated_nodes():
+        nonlocal sent_batches
+        for owner, nodes in enumerate(outboxes):
+            if nodes:
+                # the batch is counted before sending it, so it is never missed by termination detection
+                with lock:
+                    in_flight_batches.value += 1
+                inboxes[owner].put(("nodes", nodes))
+                outboxes[owner] = []
+                sent_batches += 1
+
+    while True:
+        try:
+            message = inbox.get_nowait() if is_busy else inbox.get(timeout=0.05)
+        except queue.Empty:
+            message = None
+
+        if message is not None:
+            if message[0] == "nodes":
+                insert(message[1])
+                with lock:
+                    if not is_busy:
+                        busy_workers.value += 1
+                        is_busy = True
+                    in_flight_batches.value -= 1
+            elif message[0] == "report":
+                results.put(("report", best_solution, expanded_nodes, len(reached), sent_batches))
+            elif message[0] == "trace":
+                path_cost, reward, parent, action = reached[message[1]]
+                results.put(("trace", parent, action))
+            elif message[0] == "stop":
+                return
+            continue
+
+        if not is_busy:
+            continue
+
+        if frontier and frontier[0][0] < solution_cost.value:
+            for _ in range(EXPANSIONS_PER_ROUND):
+                if not frontier or frontier[0][0] >= solution_cost.value:
+                    break
+
+                f, heuristic_cost, _, packed_state = heappop(frontier)
+                path_cost, reward, _, _ = reached[packed_state]
+
+                # skipping nodes reached again with a lower cost after being pushed
+                if f > path_cost + heuristic_cost:
+                    continue
+
+                node = HuntWumpusNode(unpack_state(packed_state), path_cost, reward)
+                expanded_nodes += 1
+
+                local_nodes = []
+                for action in problem.get_best_actions_for(node.state):
+                    child = problem.get_child_from(node, with_action=action)
+                    packed_child = pack_state(child.state)
+                    owner = hash(packed_child) % workers
+                    generated_node = (packed_child, child.path_cost, child.state.heuristic_cost, child.reward,
+                                      packed_state, action.value, problem.is_goal_state(child.state))
+
+                    if owner == worker_id:
+                        local_nodes.append(generated_node)
+                    else:
+                        outboxes[owner].append(generated_node)
+                        if len(outboxes[owner]) >= batch_size:
+                            send_generated_nodes()
+
+                insert(local_nodes)
+
+            send_generated_nodes()
+        else:
+            send_generated_nodes()
+            with lock:
+                busy_workers.value -= 1
+                is_busy = False
+                if busy_workers.value == 0 and in_flight_batches.value == 0:
+                    done.set()
+
+
+class ParallelSearchStatistics(SearchStatistics):
+    """
+    Collects the statistics of a parallel search:
+    - visited_nodes: number
+            the number of nodes expanded by all workers
+    - reached_states: number
+            the number of states stored in the closed lists of all workers
+    - sent_batches: number
+            the number of batches of nodes sent between workers
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.reached_states = 0
+        self.sent_batches = 0
+
+    def __str__(self):
+        return f"ParallelSearchStatistics: (visited_nodes = {self.visited_nodes}, " \
+               + f"reached_states = {self.reached_states}, sent_batches = {self.sent_batches})"
+
+    def __repr__(self):
+        return self.__str__()
+
+
+def parallel_astar_search(world_description, heuristic=DEFAULT_HEURISTIC, workers=4, *,
+                          batch_size=256, statistics=None):
+    """
+    HDA* search on the world described with the schema of the JSON files in the data folder, using
+    the heuristic function with the given name (None for UCS) and the given number of worker processes.
+    It returns the HuntWumpusResult with the optimal sequence of actions (HuntWumpusActions).
+    """
+    statistics = statistics if statistics is not None else ParallelSearchStatistics()
+    heuristic_func = load_heuristic(heuristic) if heuristic else (lambda state: 0)
+    problem = HuntWumpusProblem.from_dict(world_description, heuristic_func=heuristic_func)
+
+    if problem.is_goal_state(problem.initial_state):
+        statistics.visited_nodes += 1
+        return HuntWumpusResult([], 0)
+
+    if is_infeasible(problem, statistics):
+        return HuntWumpusResult([], 0)
+
+    lock = multiprocessing.Lock()
+    in_flight_batches = multiprocessing.Value("i", 1, lock=False)
+    busy_workers = multiprocessing.Value("i", workers, lock=False)
+    solution_cost = multiprocessing.Value("d", math.inf, lock=False)
+    done = multiprocessing.Event()
+    inboxes = [multiprocessing.Queue() for _ in range(workers)]
+    results = multiprocessing.Queue()
+
+    processes = [multiprocessing.Process(target=_run_worker,
+                                         args=(worker_id, world_description, heuristic, inboxes, results, lock,
+                                               in_flight_batches, busy_workers, solution_cost, done, batch_size),
+                                         daemon=True)
+                 for worker_id in range(workers)]
+
+    for process in processes:
+        process.start()
+
+    try:
+        packed_initial_state = pack_state(problem.initial_state)
+        initial_node = (packed_initial_state, 0, problem.initial_state.heuristic_cost, 0, None, None, False)
+        inboxes[hash(packed_initial_state) % workers].put(("nodes", [initial_node]))
+
+        while not done.wait(timeout=0.1):
+            if any(process.exitcode is not None for process in processes):
+                raise RuntimeError("A worker of the parallel A* search ended unexpectedly")
+
+        best_solution = None
+        for inbox in inboxes:
+            inbox.put(("report",))
+        for _ in processes:
+            _, solution, expanded_nodes, reached_states, sent_batches = results.get()
+            statistics.visited_nodes += expanded_nodes
+            statistics.reached_states += reached_states
+            statistics.sent_batches += sent_batches
+            if solution is not None and (best_solution is None or solution[0] < best_solution[0]):
+                best_solution = solution
+
+        if best_solution is None:
+            return HuntWumpusResult([], 0)
+
+        # rebuilding the path asking each state to its owner
+        path_cost, reward, packed_state = best_solution
+        sequence_actions = []
+        while packed_state is not None:
+            inboxes[hash(packed_state) % workers].put(("trace", packed_state))
+            _, packed_state, action = results.get()
+            if action is not None:
+                sequence_actions.append(problem.possible_actions(action))
+
+        sequence_actions.reverse()
+        return HuntWumpusResult(sequence_actions, reward - path_cost)
+    finally:
+        for inbox in inboxes:
+            inbox.put(("stop",))
+        for process in processes:
+            process.join(timeout=1)
+            if process.is_alive():
+                process.terminate()
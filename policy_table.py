@@ -0,0 +1,252 @@
+import os, sys
+sys.path.insert(1, os.path.join(os.path.dirname(os.path.abspath(__file__)), "modules"))
+
+import struct
+from array import array
+from collections import deque
+from heapq import heappush, heappop
+
+from modules.hunt_wumpus_model import HuntWumpusNode, HuntWumpusResult, HuntWumpusState, ORIENTATION_VECTORS
+from modules.linear_space import SmartCoordinate
+from search_algorithms import DENSE_REACHED_MAX_SIZE, SearchStatistics
+from solution_cache import world_fingerprint
+
+# Policy table of a world for all the starts of the hunter: the state graph reachable from every
+# free cell and orientation is enumerated once, then a single backward Dijkstra from the goal
+# states gives, for every state, the cost of its cheapest plan and the first action of the plan.
+# The plan from any start is then read in O(plan length), following the next actions.
+#
+# The table is indexed by the perfect index of the states (HuntWumpusProblem.get_state_index), so
+# it stores no states, and it is saved in a little endian binary file:
+#   - header: magic (4 bytes), format version (uint16), length of the world key (uint16), length
+#     of the action names (uint16), number of states (uint64)
+#   - the world key (see PolicyTable.get_world_key) and the comma separated action names (utf-8)
+#   - the next action of each state: its index in the action names (uint8, NO_ACTION if none)
+#   - the cost of the plan of each state (uint32, UNREACHABLE if it has none)
+
+MAGIC = b"HWPT"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sHHHQ")
+
+NO_ACTION = 0xFF
+UNREACHABLE = 0xFFFFFFFF
+
+
+class PolicyStatistics(SearchStatistics):
+    """
+    Collects the statistics of the construction of a policy table:
+    - states: number
+            the number of states reachable from the starts
+    - edges: number
+            the number of transitions between them (with the best actions of each state)
+    - goal_states: number
+            the number of goal states reached
+    - starts: number
+            the number of starts (free cells and orientations) the states are reached from
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.states = 0
+        self.edges = 0
+        self.goal_states = 0
+        self.starts = 0
+
+    def __str__(self):
+        return f"PolicyStatistics: (visited_nodes = {self.visited_nodes}, states = {self.states}, " \
+               + f"edges = {self.edges}, goal_states = {self.goal_states}, starts = {self.starts})"
+
+    def __repr__(self):
+        return self.__str__()
+
+
+class PolicyTable(object):
+    """
+    Next action and cost to the goal of every state of a world (see the description at the top
+    of the file):
+    - world_key: str
+            identifies the world without the hunter and the cost model (see get_world_key)
+    - action_names: (str)
+            the names of the actions, in the order of their indexes in next_actions
+    - next_actions: array("B")
+            the index of the first action of the cheapest plan of each state (by state index)
+    - costs: array("I")
+            the cost of the cheapest plan of each state (by state index)
+    """
+
+    def __init__(self, world_key, action_names, next_actions, costs):
+        self.world_key = world_key
+        self.action_names = tuple(action_names)
+        self.next_actions = next_actions
+        self.costs = costs
+
+    @staticmethod
+    def get_world_key(problem):
+        """
+        returns the key of the world of the given problem ignoring the hunter (the table serves all
+        the starts), with the fingerprint of its cost model
+        """
+        world_description = problem.to_dict()
+        world_description["hunters"] = []
+        return f"{world_fingerprint(world_description)}|{problem.cost_model_id}"
+
+    @classmethod
+    def build(cls, problem, statistics=None):
+        """
+        returns the PolicyTable of the world of the given problem, built with one backward Dijkstra
+        from the goal states over the states reachable from all the starts. It raises ValueError if
+        the state space is larger than DENSE_REACHED_MAX_SIZE, as the table has an entry per state index.
+        """
+        if problem.state_index_size > DENSE_REACHED_MAX_SIZE:
+            raise ValueError(f"The {problem.state_index_size} state indexes of the world don't fit in a policy table "
+                             + f"(at most {DENSE_REACHED_MAX_SIZE})")
+
+        statistics = statistics if statistics is not None else PolicyStatistics()
+        actions = list(problem.possible_actions)
+        action_indexes = {action: index for index, action in enumerate(actions)}
+
+        # every free cell and orientation, with the arrow, the wumpuses and the golds of the problem
+        initial_state = problem.initial_state
+        width, height = HuntWumpusState.world_size
+        starts = [HuntWumpusState(location, orientation, wumpus_locations=initial_state.wumpus_locations,
+                                  gold_locations=initial_state.gold_locations, gold_mask=initial_state.gold_mask)
+                  for location in (SmartCoordinate(x, y) for x in range(width) for y in range(height))
+                  if problem.is_legal(location, for_state=initial_state)
+                     and location not in HuntWumpusState.pit_locations
+                     and location not in initial_state.wumpus_locations
+                  for orientation in ORIENTATION_VECTORS.values()]
+        statistics.starts = len(starts)
+
+        # enumerating the reachable states, with the reversed transitions
+        predecessors = {} # {state index: [(state index, action index, cost)]}
+        goal_indexes = []
+        reached = set()
+        frontier = deque()
+        for state in starts:
+            index = problem.get_state_index(state)
+            if index not in reached:
+                reached.add(index)
+                frontier.append((state, index))
+
+        while frontier:
+            state, index = frontier.popleft()
+            if problem.is_goal_state(state):
+                goal_indexes.append(index)
+                continue
+
+            node = HuntWumpusNode(state)
+            statistics.visited_nodes += 1
+            for action in problem.get_best_actions_for(state):
+                child = problem.get_child_from(node, with_action=action, with_heuristic=False)
+                child_index = problem.get_state_index(child.state)
+                predecessors.setdefault(child_index, []).append((index, action_indexes[action], child.path_cost))
+                statistics.edges += 1
+                if child_index not in reached:
+                    reached.add(child_index)
+                    frontier.append((child.state, child_index))
+
+        statistics.states = len(reached)
+        statistics.goal_states = len(goal_indexes)
+
+        # backward Dijkstra from all the goal states
+        next_actions = array("B", bytes([NO_ACTION])) * problem.state_index_size
+        costs = array("I", [UNREACHABLE]) * problem.state_index_size
+        frontier = []
+        for index in goal_indexes:
+            costs[index] = 0
+            heappush(frontier, (0, index))
+
+        while frontier:
+            cost, index = heappop(frontier)
+            if cost > costs[index]:
+                continue
+            for predecessor_index, action_index, action_cost in predecessors.get(index, ()):
+                if cost + action_cost < costs[predecessor_index]:
+                    costs[predecessor_index] = cost + action_cost
+                    next_actions[predecessor_index] = action_index
+                    heappush(frontier, (cost + action_cost, predecessor_index))
+
+        return cls(cls.get_world_key(problem), [action.name for action in actions], next_actions, costs)
+
+    def is_valid_for(self, problem):
+        """
+        returns True if the table was built for the world and the cost model of the given problem
+        """
+        return self.world_key == self.get_world_key(problem) \
+               and len(self.next_actions) == problem.state_index_size
+
+    def get_next_action(self, problem, state):
+        """
+        returns the first action of the cheapest plan from the given state (an action of the
+        possible actions of the problem), None if the state is a goal or has no plan
+        """
+        action_index = self.next_actions[problem.get_state_index(state)]
+        if action_index == NO_ACTION:
+            return None
+        return problem.possible_actions[self.action_names[action_index]]
+
+    def get_cost(self, problem, state):
+        """
+        returns the cost of the cheapest plan from the given state, None if it has no plan
+        """
+        cost = self.costs[problem.get_state_index(state)]
+        return cost if cost != UNREACHABLE else None
+
+    def get_plan(self, problem, state=None):
+        """
+        returns the HuntWumpusResult of the cheapest plan from the given state (the initial state
+        of the problem by default), following the next actions of the table. A cheapest plan never
+        visits a state twice, so a table whose actions go on for more steps than the state indexes
+        (e.g. a corrupt file) gives no plan.
+        """
+        node = HuntWumpusNode(state if state is not None else problem.initial_state)
+        sequence_actions = []
+
+        while (action := self.get_next_action(problem, node.state)) is not None:
+            if len(sequence_actions) >= problem.state_index_size:
+                return HuntWumpusResult([], 0)
+            node = problem.get_child_from(node, with_action=action, with_heuristic=False)
+            sequence_actions.append(action)
+
+        if not problem.is_goal_state(node.state):
+            return HuntWumpusResult([], 0)
+        return HuntWumpusResult(sequence_actions, node.reward - node.path_cost)
+
+    def save(self, path):
+        """
+        writes the table to the given path in the binary format described at the top of the file
+        """
+        world_key = self.world_key.encode("utf-8")
+        action_names = ",".join(self.action_names).encode("utf-8")
+        costs = self.costs
+        if sys.byteorder == "big":
+            costs = array("I", costs)
+            costs.byteswap()
+
+        with open(path, "wb") as table_file:
+            table_file.write(HEADER.pack(MAGIC, FORMAT_VERSION, len(world_key), len(action_names),
+                                         len(self.next_actions)))
+            table_file.write(world_key)
+            table_file.write(action_names)
+            self.next_actions.tofile(table_file)
+            costs.tofile(table_file)
+
+    @classmethod
+    def load(cls, path):
+        """
+        returns the PolicyTable read from the given path (see save)
+        """
+        with open(path, "rb") as table_file:
+            magic, version, world_key_length, action_names_length, size = HEADER.unpack(table_file.read(HEADER.size))
+            if magic != MAGIC or version != FORMAT_VERSION:
+                raise ValueError(f"{path} is not a policy table (version {FORMAT_VERSION})")
+
+            world_key = table_file.read(world_key_length).decode("utf-8")
+            action_names = table_file.read(action_names_length).decode("utf-8").split(",")
+            next_actions, costs = array("B"), array("I")
+            next_actions.fromfile(table_file, size)
+            costs.fromfile(table_file, size)
+
+        if sys.byteorder == "big":
+            costs.byteswap()
+        return cls(world_key, action_names, next_actions, costs)
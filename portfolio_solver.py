@@ -0,0 +1,165 @@
+import os, sys
+sys.path.insert(1, os.path.join(os.path.dirname(os.path.abspath(__file__)), "modules"))
+
+import json
+import multiprocessing
+import queue
+import time
+from collections import Counter
+
+from solve import DEFAULT_HEURISTIC, parse_arguments, solve_world
+from solution_cache import world_fingerprint
+
+# Portfolio solver: the same world is solved by several configurations (algorithm, heuristic) in
+# parallel processes, the first solution found is returned and the other searches are terminated.
+# The first solution is the optimal one only if every configuration of the portfolio is optimal.
+# The winning configuration of every world is appended to a JSON lines log, so the log can be
+# summarized per type of world to choose a better default configuration.
+#
+# usage: python portfolio_solver.py WORLD_JSON [--log PATH]
+#        python portfolio_solver.py --summary [--log PATH]
+
+DEFAULT_LOG_PATH = ".hunt_wumpus_portfolio.jsonl"
+
+# (algorithm, heuristic) raced by default, all optimal: UCS and A* with an admissible heuristic.
+# The other heuristics (e.g. the ones of the sample outputs) may overestimate the cost to the goal,
+# so A* with them can answer first with a worse plan.
+DEFAULT_PORTFOLIO = (
+    ("astar", "heuristic_func_multi_goal_mst"),
+    ("ucs", None)
+)
+
+# seconds between the checks that the processes of the portfolio are still running
+POLL_SECONDS = 0.5
+
+
+def get_world_type(world_description):
+    """
+    returns a coarse description of the world used to group the portfolio results: size, number of
+    wumpuses, number of golds and percentage of pits (rounded to 10%)
+    """
+    width, height = world_description["size"]
+    wumpuses = world_description.get("wumpuses", [])
+    golds = world_description.get("golds", [])
+    # a flat location is a single object
+    wumpus_count = 1 if wumpuses and isinstance(wumpuses[0], int) else len(wumpuses)
+    gold_count = 1 if golds and isinstance(golds[0], int) else len(golds)
+    pit_percentage = round(10 * len(world_description.get("pits", [])) / (width * height)) * 10
+
+    return f"{width}x{height} wumpuses={wumpus_count} golds={gold_count} pits={pit_percentage}%"
+
+
+def _run_configuration(configuration, world_description, results):
+    algorithm, heuristic = configuration
+    try:
+        results.put((configuration, solve_world(world_description, algorithm, heuristic or DEFAULT_HEURISTIC)))
+    except Exception as error:
+        results.put((configuration, {"error": f"{type(error).__name__}: {error}"}))
+
+
+def solve_with_portfolio(world_description, portfolio=DEFAULT_PORTFOLIO, *, log_path=DEFAULT_LOG_PATH):
+    """
+    solves the world described with the schema of the JSON files in the data folder (either as a
+    JSON string or as a dict) running every configuration of the portfolio in its own process and
+    returns the first solution found (see solve.solve_world) with the winning "algorithm" and
+    "heuristic" and the "portfolio_time" (in seconds, including the startup of the processes).
+    A configuration whose process dies without answering counts as failed.
+    The result is appended to the log (if log_path is not None).
+    """
+    if isinstance(world_description, str):
+        world_description = json.loads(world_description)
+
+    start_time = time.perf_counter()
+    results = multiprocessing.Queue()
+    processes = [multiprocessing.Process(target=_run_configuration,
+                                         args=(configuration, world_description, results),
+                                         daemon=True)
+                 for configuration in portfolio]
+
+    for process in processes:
+        process.start()
+
+    errors = {} # {configuration: error}
+    try:
+        while len(errors) < len(processes):
+            try:
+                (algorithm, heuristic), solution = results.get(timeout=POLL_SECONDS)
+            except queue.Empty:
+                # processes killed (or crashed in the interpreter) never put their result
+                for configuration, process in zip(portfolio, processes):
+                    if configuration not in errors and not process.is_alive() and process.exitcode != 0:
+                        errors[configuration] = f"process exited with code {process.exitcode}"
+                continue
+
+            if "error" not in solution:
+                break
+            errors[(algorithm, heuristic)] = solution["error"]
+        else:
+            raise ValueError(f"No configuration of the portfolio solved the world: {list(errors.values())}")
+    finally:
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+        for process in processes:
+            process.join()
+
+    solution["algorithm"] = algorithm
+    solution["heuristic"] = heuristic
+    solution["portfolio_time"] = time.perf_counter() - start_time
+
+    if log_path is not None:
+        with open(log_path, "a") as log_file:
+            log_file.write(json.dumps({"fingerprint": world_fingerprint(world_description),
+                                       "world_type": get_world_type(world_description),
+                                       "algorithm": algorithm,
+                                       "heuristic": heuristic,
+                                       "search_time": solution["search_time"],
+                                       "portfolio_time": solution["portfolio_time"]}) + "\n")
+
+    return solution
+
+
+def summarize_portfolio_log(log_path=DEFAULT_LOG_PATH):
+    """
+    returns {world_type: Counter({(algorithm, heuristic): wins})} from the log of the portfolio solver
+    """
+    summary = {}
+    with open(log_path) as log_file:
+        for line in log_file:
+            if line.strip():
+                entry = json.loads(line)
+                summary.setdefault(entry["world_type"], Counter())[(entry["algorithm"], entry["heuristic"])] += 1
+
+    return summary
+
+
+def main(*args):
+    try:
+        options, flags, world_paths = parse_arguments(args, {"--log": DEFAULT_LOG_PATH}, {"--summary"})
+    except ValueError as error:
+        print(error, file=sys.stderr)
+        return -1
+
+    if "--summary" in flags and not world_paths:
+        for world_type, wins in sorted(summarize_portfolio_log(options["--log"]).items()):
+            print(f"{world_type}: " + ", ".join(f"{algorithm} {heuristic or ''}".strip() + f" ({count})"
+                                                 for (algorithm, heuristic), count in wins.most_common()))
+        return 0
+
+    if len(world_paths) != 1 or flags:
+        print("usage: python portfolio_solver.py WORLD_JSON [--log PATH] | --summary [--log PATH]", file=sys.stderr)
+        return -1
+
+    with open(world_paths[0]) as world_file:
+        try:
+            solution = solve_with_portfolio(world_file.read(), log_path=options["--log"])
+        except ValueError as error:
+            print(error, file=sys.stderr)
+            return -1
+
+    print(json.dumps(solution))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(*sys.argv[1:]))
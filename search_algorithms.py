@@ -0,0 +1,446 @@
+import os, sys
+sys.path.insert(1, os.path.join(os.path.dirname(os.path.abspath(__file__)), "modules"))
+
+import math
+from array import array
+from collections import deque
+from heapq import heappush, heappop
+
+from modules.hunt_wumpus_model import HuntWumpusResult, HuntWumpusNode
+
+# Search algorithms shared by the players and the command line solver (solve.py).
+# This module only depends on the problem model, so it can be imported without loading
+# the wumpus environment.
+
+class SearchStatistics(object):
+    """
+    Collects the statistics of a search:
+    - visited_nodes: number
+            the number of nodes expanded by the search algorithm
+    - heuristic_evaluations: number
+            the number of evaluations of the heuristic function (only counted by lazy A*)
+    - avoided_heuristic_evaluations: number
+            the number of generated nodes whose heuristic was never evaluated (only counted by lazy A*)
+    - max_frontier_size: number
+            the largest number of nodes in the frontier (only counted by A* and partial expansion A*)
+    - infeasibility_reason: str
+            why the problem has no solution, when it is found before searching (None otherwise)
+    """
+
+    def __init__(self):
+        self.visited_nodes = 0
+        self.heuristic_evaluations = 0
+        self.avoided_heuristic_evaluations = 0
+        self.max_frontier_size = 0
+        self.infeasibility_reason = None
+
+    def __str__(self):
+        return f"SearchStatistics: (visited_nodes = {self.visited_nodes}, " \
+               + f"heuristic_evaluations = {self.heuristic_evaluations}, " \
+               + f"avoided_heuristic_evaluations = {self.avoided_heuristic_evaluations}, " \
+               + f"max_frontier_size = {self.max_frontier_size}, " \
+               + f"infeasibility_reason = {self.infeasibility_reason})"
+
+    def __repr__(self):
+        return self.__str__()
+
+
+# largest number of state indexes stored by DenseReached (8 bytes each), larger state spaces use a dict
+DENSE_REACHED_MAX_SIZE = 1 << 22
+
+class DenseReached(object):
+    """
+    Closed list of the values (path costs or f values) of the reached states stored in an array 
+    indexed by the perfect index of the states (see HuntWumpusProblem.get_state_index), used like 
+    the dict {state: value} of the searches without keeping the states:
+    - values: array("d")
+            the value of each state index, math.inf for the states never reached
+    """
+
+    def __init__(self, problem):
+        self.problem = problem
+        self.values = array("d", [math.inf]) * problem.state_index_size
+        # the index of the last state looked up, it is usually stored right after the lookup
+        self._last_state = None
+        self._last_index = None
+
+    def _get_index(self, state):
+        if state is not self._last_state:
+            self._last_state = state
+            self._last_index = self.problem.get_state_index(state)
+        return self._last_index
+
+    def get(self, state, default=None):
+        value = self.values[self._get_index(state)]
+        return default if value == math.inf else value
+
+    def __contains__(self, state):
+        return self.values[self._get_index(state)] != math.inf
+
+    def __getitem__(self, state):
+        value = self.values[self._get_index(state)]
+        if value == math.inf:
+            raise KeyError(state)
+        return value
+
+    def __setitem__(self, state, value):
+        self.values[self._get_index(state)] = value
+
+
+def get_reached_store(problem, dense):
+    """
+    returns the closed list of a search: a DenseReached if dense and the state space of the problem 
+    is small enough, a dict otherwise
+    """
+    if dense and problem.state_index_size <= DENSE_REACHED_MAX_SIZE:
+        return DenseReached(problem)
+    return {}
+
+
+def is_infeasible(problem, statistics):
+    """
+    returns True if the problem has no solution according to the check done before searching 
+    (see HuntWumpusProblem.get_infeasibility_reason), storing the reason in the statistics
+    """
+    statistics.infeasibility_reason = problem.get_infeasibility_reason()
+    return statistics.infeasibility_reason is not None
+
+
+def _resume_search(problem, algorithm, checkpoint, reached, statistics):
+    """
+    returns the frontier and the best solution (None if none) of the checkpoint of the search, 
+    restoring its reached states and statistics, or None if there is no checkpoint to resume
+    """
+    checkpoint_search = checkpoint.load(problem, algorithm, statistics)
+    if checkpoint_search is None:
+        return None
+
+    frontier, solution, reached_indexes, reached_values = checkpoint_search
+    if isinstance(reached, DenseReached):
+        for index, value in zip(reached_indexes, reached_values):
+            reached.values[index] = value
+    else:
+        for index, value in zip(reached_indexes, reached_values):
+            reached[problem.get_state_from_index(index)] = value
+    return frontier, solution
+
+
+def _save_search(problem, algorithm, checkpoint, frontier, solution, reached, statistics):
+    """
+    writes the checkpoint of the search (see search_checkpoint.SearchCheckpoint)
+    """
+    if isinstance(reached, DenseReached):
+        reached_indexes = array("Q", [index for index, value in enumerate(reached.values) if value != math.inf])
+        reached_values = array("d", [reached.values[index] for index in reached_indexes])
+    else:
+        reached_indexes = array("Q", [problem.get_state_index(state) for state in reached])
+        reached_values = array("d", reached.values())
+    checkpoint.save(problem, algorithm, frontier, solution, reached_indexes, reached_values, statistics)
+
+
+def astar_search(problem, statistics=None, *, dense_closed_list=False, checkpoint=None):
+    """
+    Implementation of the pseudocode UCS AIMA4e found on:
+    https://github.com/aimacode/aima-pseudocode/blob/master/md/Uniform-Cost-Search.md
+    Added heuristic function and cost to optimize search algorithm
+    (with optional closed list stored in an array, see DenseReached, and optional periodic
+    checkpoint to resume the search from, see search_checkpoint.SearchCheckpoint)
+    """
+    statistics = statistics if statistics is not None else SearchStatistics()
+
+    if (problem.is_goal_state(problem.initial_state)):
+        statistics.visited_nodes += 1
+        return HuntWumpusResult([], 0)
+
+    if is_infeasible(problem, statistics):
+        return HuntWumpusResult([], 0)
+
+    frontier = []
+    reached = get_reached_store(problem, dense_closed_list) # {state: int}
+    solution = HuntWumpusNode(problem.initial_state, math.inf)
+
+    resumed_search = _resume_search(problem, "astar", checkpoint, reached, statistics) if checkpoint is not None else None
+    if resumed_search is not None:
+        frontier, resumed_solution = resumed_search
+        solution = resumed_solution or solution
+    else:
+        initial_node = HuntWumpusNode(problem.initial_state)
+        heappush(frontier, initial_node)
+        reached[initial_node.state] = initial_node.get_cost_heuristic_sum()
+
+    while frontier and (node := heappop(frontier)).get_cost_heuristic_sum() < solution.get_cost_heuristic_sum():
+        # the frontier doesn't update the value of a node that is already present when a cheaper
+        # one is pushed, it will just add the cheaper one in a lower position.
+        # When backtracking occurs it is not needed to expand a node that was already expanded with
+        # a lower value, therefore we can safely skip it.
+        if node.get_cost_heuristic_sum() > reached[node.state]:
+            continue
+
+        childs = problem.get_children_from(node)
+        statistics.visited_nodes += 1
+
+        for child in childs:
+            if (child.state not in reached) or (child.get_cost_heuristic_sum() < reached[child.state]):
+                reached[child.state] = child.get_cost_heuristic_sum()
+                heappush(frontier, child)
+
+                if problem.is_goal_state(child.state) and child.get_cost_heuristic_sum() < solution.get_cost_heuristic_sum():
+                    solution = child
+
+        statistics.max_frontier_size = max(statistics.max_frontier_size, len(frontier))
+
+        if checkpoint is not None and checkpoint.is_due(statistics.visited_nodes):
+            _save_search(problem, "astar", checkpoint, frontier, solution, reached, statistics)
+
+    if checkpoint is not None:
+        checkpoint.remove()
+
+    sequence_actions = problem.unwrap_solution(solution)
+    if sequence_actions:
+        return HuntWumpusResult(sequence_actions, solution.reward - solution.path_cost)
+    else:
+        return HuntWumpusResult([], 0)
+
+
+def partial_expansion_astar_search(problem, statistics=None, *, margin=1):
+    """
+    Partial Expansion A* (PEA*): every node of the frontier has a stored F value (its own f when it is 
+    generated). When it is popped all its children are generated, but only the ones with f not higher 
+    than F plus the margin are pushed, the others are dropped and the node is pushed back with the 
+    lowest f of the dropped children as its new F: when the search reaches it again its children are 
+    generated again. So the frontier never holds the children with f higher than the cost of the solution, 
+    at the cost of expanding nodes more than once (counted by visited_nodes, a larger margin expands less 
+    and keeps more children). max_frontier_size counts the nodes pushed back too.
+    """
+    statistics = statistics if statistics is not None else SearchStatistics()
+
+    if (problem.is_goal_state(problem.initial_state)):
+        statistics.visited_nodes += 1
+        return HuntWumpusResult([], 0)
+
+    if is_infeasible(problem, statistics):
+        return HuntWumpusResult([], 0)
+
+    frontier = [] # [(F, node)]
+    reached = {} # {state: int}
+    solution = HuntWumpusNode(problem.initial_state, math.inf)
+
+    initial_node = HuntWumpusNode(problem.initial_state)
+    heappush(frontier, (initial_node.get_cost_heuristic_sum(), initial_node))
+    reached[initial_node.state] = initial_node.get_cost_heuristic_sum()
+
+    while frontier and (entry := heappop(frontier))[0] < solution.get_cost_heuristic_sum():
+        stored_f, node = entry
+        if node.get_cost_heuristic_sum() > reached[node.state]:
+            continue
+
+        childs = problem.get_children_from(node)
+        statistics.visited_nodes += 1
+        next_stored_f = math.inf
+
+        for child in childs:
+            child_f = child.get_cost_heuristic_sum()
+
+            # goals are kept even if not pushed, they are already complete solutions
+            if problem.is_goal_state(child.state) and child_f < solution.get_cost_heuristic_sum():
+                solution = child
+
+            # children reached with a lower f are never pushed, they don't defer the node either
+            if (child.state in reached) and (child_f >= reached[child.state]):
+                continue
+            if child_f > stored_f + margin:
+                next_stored_f = min(next_stored_f, child_f)
+            else:
+                reached[child.state] = child_f
+                heappush(frontier, (child_f, child))
+
+        if next_stored_f < solution.get_cost_heuristic_sum():
+            heappush(frontier, (next_stored_f, node))
+
+        statistics.max_frontier_size = max(statistics.max_frontier_size, len(frontier))
+
+    sequence_actions = problem.unwrap_solution(solution)
+    if sequence_actions:
+        return HuntWumpusResult(sequence_actions, solution.reward - solution.path_cost)
+    else:
+        return HuntWumpusResult([], 0)
+
+
+def lazy_astar_search(problem, statistics=None, *, cheap_heuristic_func=lambda state: 0):
+    """
+    A* search evaluating the heuristic function of the problem only when a node is popped (Lazy A*):
+    children are pushed with a cheap bound, the largest between the heuristic of the parent minus the 
+    cost of the action and the cheap heuristic of the child. When a node is popped its heuristic is 
+    evaluated and, if it is higher than the bound, the node is pushed again.
+    Goal children are evaluated as soon as they are generated, as astar_search does, so they are 
+    compared with the best solution found with the same values. The heuristic of each state is 
+    evaluated once: the nodes of a state already evaluated take its value instead of the bound.
+    """
+    statistics = statistics if statistics is not None else SearchStatistics()
+
+    if (problem.is_goal_state(problem.initial_state)):
+        statistics.visited_nodes += 1
+        return HuntWumpusResult([], 0)
+
+    if is_infeasible(problem, statistics):
+        return HuntWumpusResult([], 0)
+
+    frontier = []
+    reached = {} # {state: int} path cost of the best node reached for each state
+    evaluated_states = {} # {state: number} heuristic of the states evaluated so far
+    deferred_evaluations = 0
+    previous_evaluations = statistics.heuristic_evaluations
+    solution = HuntWumpusNode(problem.initial_state, math.inf)
+
+    initial_node = HuntWumpusNode(problem.initial_state)
+    heappush(frontier, initial_node)
+    reached[initial_node.state] = initial_node.path_cost
+    evaluated_states[initial_node.state] = initial_node.state.heuristic_cost
+    statistics.heuristic_evaluations += 1
+
+    while frontier and (node := heappop(frontier)).get_cost_heuristic_sum() < solution.get_cost_heuristic_sum():
+        if node.path_cost > reached[node.state]:
+            continue
+
+        # a node of an equal state may have been evaluated after this one was pushed with the bound
+        bound = node.state.heuristic_cost
+        if node.state not in evaluated_states:
+            evaluated_states[node.state] = problem.heuristic_func(node.state)
+            statistics.heuristic_evaluations += 1
+        node.state.heuristic_cost = evaluated_states[node.state]
+        # the node is in the right position only if the bound wasn't lower than the heuristic
+        if node.state.heuristic_cost > bound:
+            heappush(frontier, node)
+            continue
+
+        childs = [problem.get_child_from(node, with_action=action, with_heuristic=False) 
+                  for action in problem.get_best_actions_for(node.state)]
+        statistics.visited_nodes += 1
+
+        for child in childs:
+            if child.state not in evaluated_states:
+                deferred_evaluations += 1
+            if (child.state not in reached) or (child.path_cost < reached[child.state]):
+                if child.state in evaluated_states:
+                    child.state.heuristic_cost = evaluated_states[child.state]
+                elif problem.is_goal_state(child.state):
+                    evaluated_states[child.state] = problem.heuristic_func(child.state)
+                    statistics.heuristic_evaluations += 1
+                    child.state.heuristic_cost = evaluated_states[child.state]
+                else:
+                    child.state.heuristic_cost = max(node.state.heuristic_cost - (child.path_cost - node.path_cost), 
+                                                     cheap_heuristic_func(child.state))
+
+                reached[child.state] = child.path_cost
+                heappush(frontier, child)
+
+                if problem.is_goal_state(child.state) and child.get_cost_heuristic_sum() < solution.get_cost_heuristic_sum():
+                    solution = child
+
+    # the eager search evaluates the heuristic of every generated node, the ones of states without a 
+    # heuristic yet were deferred and only some of them were evaluated (the initial state is not a child)
+    statistics.avoided_heuristic_evaluations += (deferred_evaluations + 1 
+                                                 - (statistics.heuristic_evaluations - previous_evaluations))
+
+    sequence_actions = problem.unwrap_solution(solution)
+    if sequence_actions:
+        return HuntWumpusResult(sequence_actions, solution.reward - solution.path_cost)
+    else:
+        return HuntWumpusResult([], 0)
+
+
+def ucs_search(problem, statistics=None, *, dense_closed_list=False, checkpoint=None):
+    """
+    Implementation of the pseudocode UCS AIMA4e found on:
+    https://github.com/aimacode/aima-pseudocode/blob/master/md/Uniform-Cost-Search.md
+    (with optional closed list stored in an array, see DenseReached, and optional periodic
+    checkpoint, see astar_search)
+    """
+    statistics = statistics if statistics is not None else SearchStatistics()
+
+    if (problem.is_goal_state(problem.initial_state)):
+        statistics.visited_nodes += 1
+        return HuntWumpusResult([], 0)
+
+    if is_infeasible(problem, statistics):
+        return HuntWumpusResult([], 0)
+
+    frontier = [HuntWumpusNode(problem.initial_state)]
+    reached = get_reached_store(problem, dense_closed_list) # {state: int}
+    solution = HuntWumpusNode(problem.initial_state, math.inf)
+
+    resumed_search = _resume_search(problem, "ucs", checkpoint, reached, statistics) if checkpoint is not None else None
+    if resumed_search is not None:
+        frontier, resumed_solution = resumed_search
+        solution = resumed_solution or solution
+
+    while frontier and (node := heappop(frontier)).path_cost < solution.path_cost:
+        childs = [problem.get_child_from(node, with_action= action) for action in problem.get_best_actions_for(node.state)]
+        statistics.visited_nodes += 1
+        for child in childs:
+            if (child.state not in reached) or (child.path_cost < reached[child.state]):
+                reached[child.state] = child.path_cost
+                heappush(frontier, child)
+                if problem.is_goal_state(child.state) and child.path_cost < solution.path_cost:
+                    solution = child
+
+        if checkpoint is not None and checkpoint.is_due(statistics.visited_nodes):
+            _save_search(problem, "ucs", checkpoint, frontier, solution, reached, statistics)
+
+    if checkpoint is not None:
+        checkpoint.remove()
+
+    sequence_actions = problem.unwrap_solution(solution)
+    if sequence_actions:
+        return HuntWumpusResult(sequence_actions, solution.reward - solution.path_cost)
+    else:
+        return HuntWumpusResult([], 0)
+
+
+def breadth_first_search(problem, statistics=None):
+    """
+    Implementation of the pseudocode found on:
+    https://github.com/aimacode/aima-pseudocode/blob/master/md/Breadth-First-Search.md
+    (AIMA4e version)
+    """
+    statistics = statistics if statistics is not None else SearchStatistics()
+    node = HuntWumpusNode(problem.initial_state)
+
+    if problem.is_goal_state(node.state):
+        return HuntWumpusResult(problem.unwrap_solution(node), node.path_cost + node.reward)
+
+    if is_infeasible(problem, statistics):
+        return HuntWumpusResult([], 0)
+
+    frontier = deque([node])
+    reached = set([problem.initial_state])
+
+    while frontier:
+        node = frontier.popleft()
+        childs = [problem.get_child_from(node, with_action=action) for action in problem.get_best_actions_for(node.state)]
+        statistics.visited_nodes += 1
+        for child in childs:
+            child_state = child.state
+            if problem.is_goal_state(child_state):
+                return HuntWumpusResult(problem.unwrap_solution(child), child.path_cost + child.reward)
+            if child_state not in reached:
+                reached.add(child_state)
+                frontier.append(child)
+
+    return HuntWumpusResult([], 0)
+
+
+# search algorithms available by name (used by the command line tools)
+SEARCH_ALGORITHMS = {
+    "astar": astar_search,
+    "lazy_astar": lazy_astar_search,
+    "pea_astar": partial_expansion_astar_search,
+    "ucs": ucs_search,
+    "bfs": breadth_first_search
+}
+
+# search algorithms (names) that use the heuristic function of the problem
+INFORMED_SEARCH_ALGORITHMS = {"astar", "lazy_astar", "pea_astar"}
+
+# search algorithms (names) that can write checkpoints and resume from them
+CHECKPOINT_SEARCH_ALGORITHMS = {"astar", "ucs"}
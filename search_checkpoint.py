@@ -0,0 +1,194 @@
+import os, sys
+sys.path.insert(1, os.path.join(os.path.dirname(os.path.abspath(__file__)), "modules"))
+
+import struct
+import time
+from array import array
+
+from modules.hunt_wumpus_model import HuntWumpusNode
+from solution_cache import world_fingerprint
+
+# Checkpoints of the A* and UCS searches (see astar_search and ucs_search): the frontier, the
+# reached states and the counters of the statistics are written periodically to a file, and a
+# search started with the same checkpoint resumes from it instead of starting again.
+# The states are packed as their perfect index (HuntWumpusProblem.get_state_index) and the nodes
+# as arrays, all in little endian byte order (the arrays are swapped on big endian machines):
+#   - header: magic (4 bytes), format version, length of the search key, number of nodes, number
+#     of frontier nodes, number of reached states (uint64 each but the magic)
+#   - the search key (see get_search_key, utf-8), the counters of the statistics (uint64) and the
+#     position of the best solution found among the nodes (int64, -1 if none)
+#   - the nodes of the frontier and their ancestors, parents first: state index (uint64), parent
+#     position (int64, -1 for the root), action index (uint8), path cost and reward (int64) and
+#     heuristic cost (double)
+#   - the positions of the frontier nodes, in the order of the heap (uint64)
+#   - the reached states: state index (uint64) and value (double)
+
+MAGIC = b"HWCK"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4s5Q")
+
+# counters of the statistics stored in the checkpoint
+STATISTICS_COUNTERS = ("visited_nodes", "heuristic_evaluations", "avoided_heuristic_evaluations", "max_frontier_size")
+
+NO_NODE = -1
+
+
+class SearchCheckpoint(object):
+    """
+    Periodic checkpoint of a search, written to the given path every given number of seconds or of
+    expanded nodes (whichever comes first, None disables each one), with:
+    - saves: number
+            the number of checkpoints written
+    - save_time: number
+            the seconds spent writing them (the overhead on the search)
+    - bytes_written: number
+            the size of the last checkpoint
+    - resumed: bool
+            whether the last search was resumed from a checkpoint
+    """
+
+    def __init__(self, path, *, seconds=60, nodes=None):
+        self.path = path
+        self.seconds = seconds
+        self.nodes = nodes
+        self.saves = 0
+        self.save_time = 0
+        self.bytes_written = 0
+        self.resumed = False
+        self._last_time = time.perf_counter()
+        self._last_nodes = 0
+
+    @staticmethod
+    def get_search_key(problem, algorithm):
+        """
+        returns the key identifying the search, a checkpoint is only resumed by the same algorithm on
+        the same world with the same heuristic and cost model
+        """
+        heuristic = getattr(problem.heuristic_func, "__name__", "")
+        return "|".join([world_fingerprint(problem.to_dict()), algorithm, heuristic, problem.cost_model_id])
+
+    def is_due(self, visited_nodes):
+        """
+        returns True if a checkpoint has to be written, given the nodes expanded by the search
+        """
+        return (self.nodes is not None and visited_nodes - self._last_nodes >= self.nodes) \
+               or (self.seconds is not None and time.perf_counter() - self._last_time >= self.seconds)
+
+    def save(self, problem, algorithm, frontier, solution, reached_indexes, reached_values, statistics):
+        """
+        writes the checkpoint of the search (see the description at the top of the file), replacing
+        the previous one only when the new one is complete
+        """
+        start_time = time.perf_counter()
+        actions = list(problem.possible_actions)
+        action_indexes = {action: index for index, action in enumerate(actions)}
+
+        # the nodes are numbered parents first, following the parents of each node until a numbered one
+        positions = {} # {id(node): position}
+        state_indexes, parents, node_actions = array("Q"), array("q"), array("B")
+        path_costs, rewards, heuristic_costs = array("q"), array("q"), array("d")
+
+        def add_node(node):
+            chain = []
+            while node is not None and id(node) not in positions:
+                chain.append(node)
+                node = node.parent
+            for node in reversed(chain):
+                positions[id(node)] = len(state_indexes)
+                state_indexes.append(problem.get_state_index(node.state))
+                parents.append(positions[id(node.parent)] if node.parent is not None else NO_NODE)
+                node_actions.append(action_indexes[node.previous_action] if node.previous_action is not None else 0)
+                path_costs.append(node.path_cost)
+                rewards.append(node.reward)
+                heuristic_costs.append(node.state.heuristic_cost)
+
+        frontier_positions = array("Q")
+        for node in frontier:
+            add_node(node)
+            frontier_positions.append(positions[id(node)])
+        solution_position = NO_NODE
+        if solution.parent is not None:
+            add_node(solution)
+            solution_position = positions[id(solution)]
+
+        search_key = self.get_search_key(problem, algorithm).encode("utf-8")
+        counters = array("Q", [getattr(statistics, name) for name in STATISTICS_COUNTERS])
+
+        with open(self.path + ".new", "wb") as checkpoint_file:
+            checkpoint_file.write(HEADER.pack(MAGIC, FORMAT_VERSION, len(search_key), len(state_indexes),
+                                              len(frontier_positions), len(reached_indexes)))
+            checkpoint_file.write(search_key)
+            for numbers in (counters, array("q", [solution_position]), state_indexes, parents, node_actions,
+                            path_costs, rewards, heuristic_costs, frontier_positions, reached_indexes,
+                            reached_values):
+                if sys.byteorder == "big":
+                    numbers = array(numbers.typecode, numbers)
+                    numbers.byteswap()
+                numbers.tofile(checkpoint_file)
+            self.bytes_written = checkpoint_file.tell()
+        os.replace(self.path + ".new", self.path)
+
+        self.saves += 1
+        self._last_time = time.perf_counter()
+        self._last_nodes = statistics.visited_nodes
+        self.save_time += self._last_time - start_time
+
+    def load(self, problem, algorithm, statistics):
+        """
+        returns the frontier (heap of HuntWumpusNode), the best solution found (None if none) and the
+        indexes and values of the reached states of the checkpoint of the same search, restoring the
+        counters of the statistics. It returns None if there is no checkpoint of the search.
+        """
+        self.resumed = False
+        self._last_time = time.perf_counter()
+        self._last_nodes = 0
+        if not os.path.exists(self.path):
+            return None
+
+        with open(self.path, "rb") as checkpoint_file:
+            magic, version, search_key_length, nodes, frontier_size, reached_size = \
+                HEADER.unpack(checkpoint_file.read(HEADER.size))
+            if magic != MAGIC or version != FORMAT_VERSION:
+                raise ValueError(f"{self.path} is not a search checkpoint (version {FORMAT_VERSION})")
+            if checkpoint_file.read(search_key_length).decode("utf-8") != self.get_search_key(problem, algorithm):
+                return None
+
+            def read(typecode, size):
+                numbers = array(typecode)
+                numbers.fromfile(checkpoint_file, size)
+                if sys.byteorder == "big":
+                    numbers.byteswap()
+                return numbers
+
+            counters = read("Q", len(STATISTICS_COUNTERS))
+            solution_position = read("q", 1)[0]
+            state_indexes, parents, node_actions = read("Q", nodes), read("q", nodes), read("B", nodes)
+            path_costs, rewards, heuristic_costs = read("q", nodes), read("q", nodes), read("d", nodes)
+            frontier_positions = read("Q", frontier_size)
+            reached_indexes, reached_values = read("Q", reached_size), read("d", reached_size)
+
+        actions = list(problem.possible_actions)
+        restored_nodes = []
+        for position in range(nodes):
+            state = problem.get_state_from_index(state_indexes[position])
+            state.heuristic_cost = heuristic_costs[position]
+            parent = restored_nodes[parents[position]] if parents[position] != NO_NODE else None
+            restored_nodes.append(HuntWumpusNode(state, path_costs[position], rewards[position],
+                                                 actions[node_actions[position]] if parent is not None else None,
+                                                 parent))
+
+        for name, value in zip(STATISTICS_COUNTERS, counters):
+            setattr(statistics, name, value)
+        self._last_nodes = statistics.visited_nodes
+        self.resumed = True
+
+        frontier = [restored_nodes[position] for position in frontier_positions]
+        solution = restored_nodes[solution_position] if solution_position != NO_NODE else None
+        return frontier, solution, reached_indexes, reached_values
+
+    def remove(self):
+        """
+        removes the checkpoint (the search it belongs to is complete)
+        """
+        if os.path.exists(self.path):
+            os.remove(self.path)
@@ -0,0 +1,266 @@
+import os, sys
+sys.path.insert(1, os.path.abspath("modules/"))
+
+import hashlib
+import json
+import sqlite3
+import time
+from collections import OrderedDict
+from typing import NamedTuple, Iterable
+
+from modules.hunt_wumpus_model import HuntWumpusResult
+
+# path of the default cache file, it can be overridden with the environment variable below
+DEFAULT_CACHE_PATH = ".hunt_wumpus_solutions.sqlite"
+CACHE_PATH_VARIABLE = "HUNT_WUMPUS_SOLUTION_CACHE"
+
+class CachedSolution(NamedTuple):
+    """
+    represents a solution stored in the cache with:
+    - sequence_actions: [str]
+            the names of the actions needed to reach the solution of the problem
+    - total_reward: number
+            the total reward of the agent after performing all actions in the list
+    - visited_nodes: number
+            the number of nodes visited by the search algorithm that found the solution
+    - search_time: number
+            the time (in seconds) it took to the search algorithm to find the solution
+    """
+    sequence_actions: Iterable[str]
+    total_reward: int
+    visited_nodes: int
+    search_time: float
+
+
+def world_fingerprint(world_description):
+    """
+    returns a canonical hash of a world described with the schema of the JSON files in the
+    data folder (either as a JSON string or as a dict), it does not depend on the order of
+    the locations in the lists nor on the "id" of the world
+    """
+    if isinstance(world_description, str):
+        world_description = json.loads(world_description)
+
+    def canonical_locations(locations):
+        # a single location can be written without the wrapping list (e.g. "wumpuses": [3, 2])
+        if locations and not isinstance(locations[0], (list, tuple)):
+            locations = [locations]
+        return sorted([list(location) for location in locations])
+
+    hunters = [list(hunter) if len(hunter) > 2 else list(hunter) + ["N"]
+               for hunter in world_description.get("hunters", [])]
+
+    canonical_world = {
+        "size": list(world_description["size"]),
+        "hunters": sorted(hunters),
+        "pits": canonical_locations(world_description.get("pits", [])),
+        "wumpuses": canonical_locations(world_description.get("wumpuses", [])),
+        "exits": canonical_locations(world_description.get("exits", [])),
+        "golds": canonical_locations(world_description.get("golds", [])),
+        "blocks": canonical_locations(world_description.get("blocks", []))
+    }
+
+    encoded_world = json.dumps(canonical_world, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(encoded_world.encode("utf-8")).hexdigest()
+
+
+class SolutionCache(object):
+    """
+    Persistent store (SQLite) of the solutions found by the search algorithms, each solution
+    is identified by the fingerprint of the world, the search algorithm, the heuristic and
+    the cost model used to solve it:
+    - path: str
+            the path of the SQLite file where solutions are stored
+    - max_entries: number
+            maximum number of solutions kept on disk, least recently used ones are evicted first
+    - max_age: number
+            maximum age (in seconds) of a solution, older ones are evicted (None means no limit)
+    - memory_entries: number
+            number of solutions also kept in memory to answer repeated lookups without touching
+            the disk
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, *, max_entries=10000, max_age=None, memory_entries=1024):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self.memory_entries = memory_entries
+        self.hits = 0
+        self.misses = 0
+        self._memory = OrderedDict() # {key: (CachedSolution, created)}
+        self._last_accesses = {} # {key: time}, written to disk in batch by evict() and close()
+        self._entries = 0 # upper bound of the rows on disk, counted again by evict()
+
+        self._connection = sqlite3.connect(path)
+        self._connection.execute("""
+            CREATE TABLE IF NOT EXISTS solutions (
+                key TEXT PRIMARY KEY,
+                world TEXT NOT NULL,
+                algorithm TEXT NOT NULL,
+                heuristic TEXT NOT NULL,
+                cost_model TEXT NOT NULL,
+                sequence_actions TEXT NOT NULL,
+                total_reward INTEGER NOT NULL,
+                visited_nodes INTEGER NOT NULL,
+                search_time REAL NOT NULL,
+                created REAL NOT NULL,
+                last_access REAL NOT NULL
+            )""")
+        self._connection.execute("CREATE INDEX IF NOT EXISTS solutions_last_access ON solutions (last_access)")
+        self._connection.commit()
+        self._entries = self._connection.execute("SELECT COUNT(*) FROM solutions").fetchone()[0]
+
+    @staticmethod
+    def get_key(problem, *, algorithm, heuristic="", cost_model=None):
+        """
+        returns the key identifying the solution of the given problem (HuntWumpusProblem)
+        """
+        cost_model = cost_model if cost_model is not None else problem.cost_model_id
+        return "|".join([world_fingerprint(problem.to_dict()), algorithm, heuristic, cost_model])
+
+    def get(self, key):
+        """
+        returns the CachedSolution stored with the given key, None if there is no valid one
+        """
+        now = time.time()
+
+        if key in self._memory:
+            solution, created = self._memory[key]
+            if self.max_age is None or now - created <= self.max_age:
+                self._memory.move_to_end(key)
+                self._last_accesses[key] = now
+                self.hits += 1
+                return solution
+            del self._memory[key]
+
+        row = self._connection.execute("""
+            SELECT sequence_actions, total_reward, visited_nodes, search_time, created
+            FROM solutions WHERE key = ?""", (key,)).fetchone()
+
+        if row is None or (self.max_age is not None and now - row[4] > self.max_age):
+            self.misses += 1
+            return None
+
+        self._last_accesses[key] = now
+        solution = CachedSolution(json.loads(row[0]), row[1], row[2], row[3])
+        self._remember(key, solution, row[4])
+        self.hits += 1
+        return solution
+
+    def put(self, key, result, *, visited_nodes=0, search_time=0.0):
+        """
+        stores the given HuntWumpusResult with the given key, evicting old solutions when there
+        are more than max_entries
+        """
+        now = time.time()
+        world, algorithm, heuristic, cost_model = key.split("|")
+        solution = CachedSolution([action.name for action in result.sequence_actions],
+                                  result.total_reward, visited_nodes, search_time)
+
+        self._connection.execute("""
+            INSERT OR REPLACE INTO solutions VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+            (key, world, algorithm, heuristic, cost_model, json.dumps(solution.sequence_actions),
+             solution.total_reward, visited_nodes, search_time, now, now))
+        self._remember(key, solution, now)
+
+        # replaced keys are counted too, evict() counts the rows again
+        self._entries += 1
+        if self._entries > self.max_entries:
+            self.evict()
+        else:
+            self._connection.commit()
+
+    def evict(self):
+        """
+        removes the solutions that are too old and the least recently used ones exceeding
+        max_entries
+        """
+        self._flush_last_accesses()
+
+        if self.max_age is not None:
+            self._connection.execute("DELETE FROM solutions WHERE created < ?", (time.time() - self.max_age,))
+
+        self._connection.execute("""
+            DELETE FROM solutions WHERE key IN (
+                SELECT key FROM solutions ORDER BY last_access DESC LIMIT -1 OFFSET ?)""",
+            (self.max_entries,))
+        self._connection.commit()
+        self._entries = self._connection.execute("SELECT COUNT(*) FROM solutions").fetchone()[0]
+
+    def invalidate(self, *, cost_model=None, keep_cost_model=None):
+        """
+        removes the stored solutions computed with the given cost model, or all the ones not
+        computed with keep_cost_model (e.g. invalidate(keep_cost_model=problem.cost_model_id) to keep 
+        only the solutions of the current game mode), with no arguments it removes all solutions
+        """
+        if cost_model is not None:
+            self._connection.execute("DELETE FROM solutions WHERE cost_model = ?", (cost_model,))
+        elif keep_cost_model is not None:
+            self._connection.execute("DELETE FROM solutions WHERE cost_model != ?", (keep_cost_model,))
+        else:
+            self._connection.execute("DELETE FROM solutions")
+
+        self._connection.commit()
+        self._memory.clear()
+        self._last_accesses.clear()
+        self._entries = self._connection.execute("SELECT COUNT(*) FROM solutions").fetchone()[0]
+
+    def close(self):
+        self._flush_last_accesses()
+        self._connection.commit()
+        self._connection.close()
+
+    def _flush_last_accesses(self):
+        self._connection.executemany("UPDATE solutions SET last_access = ? WHERE key = ?", 
+                                     [(last_access, key) for key, last_access in self._last_accesses.items()])
+        self._last_accesses.clear()
+
+    def _remember(self, key, solution, created):
+        self._memory[key] = (solution, created)
+        self._memory.move_to_end(key)
+        if len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+
+def solve_with_cache(problem, algorithm, heuristic, search, solution_cache=None):
+    """
+    returns the HuntWumpusResult of the given problem and the number of visited nodes, taken from
+    the solution cache (the given one, or the default one if enabled) when the same world was
+    already solved with the same algorithm and heuristic. Otherwise search(problem) is called, it
+    returns the result and the visited nodes, and the solution is stored in the cache.
+    """
+    solution_cache = solution_cache or get_default_solution_cache()
+    if solution_cache is None:
+        return search(problem)
+
+    cache_key = SolutionCache.get_key(problem, algorithm=algorithm, heuristic=heuristic)
+    cached_solution = solution_cache.get(cache_key)
+    if cached_solution is not None:
+        return HuntWumpusResult([problem.possible_actions[name] for name in cached_solution.sequence_actions],
+                                cached_solution.total_reward), cached_solution.visited_nodes
+
+    search_start_time = time.perf_counter()
+    result, visited_nodes = search(problem)
+    solution_cache.put(cache_key, result, visited_nodes=visited_nodes,
+                       search_time=time.perf_counter() - search_start_time)
+    return result, visited_nodes
+
+
+_default_cache = None
+
+def get_default_solution_cache():
+    """
+    returns the SolutionCache stored in the path given by the HUNT_WUMPUS_SOLUTION_CACHE
+    environment variable, None if the variable is not set (the cache is disabled)
+    """
+    global _default_cache
+
+    path = os.environ.get(CACHE_PATH_VARIABLE)
+    if not path:
+        return None
+
+    if _default_cache is None or _default_cache.path != path:
+        # solutions of other cost models are kept, they are keyed by the fingerprint of their costs
+        _default_cache = SolutionCache(path)
+
+    return _default_cache
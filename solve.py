@@ -0,0 +1,282 @@
+import time
+PROCESS_START_TIME = time.perf_counter()
+
+import os, sys
+sys.path.insert(1, os.path.join(os.path.dirname(os.path.abspath(__file__)), "modules"))
+
+import json
+from collections import deque
+
+from modules.hunt_wumpus_model import HuntWumpusProblem
+from search_algorithms import CHECKPOINT_SEARCH_ALGORITHMS, INFORMED_SEARCH_ALGORITHMS, SEARCH_ALGORITHMS, SearchStatistics
+
+IMPORTS_END_TIME = time.perf_counter()
+
+# Command line solver: it only imports the problem model and the search algorithms, the heuristic
+# functions are imported only by A* and the wumpus environment only when an episode is played.
+#
+# usage: python solve.py WORLD_JSON [--algorithm astar|lazy_astar|ucs|bfs] [--heuristic HEURISTIC] [--play] [--quiet]
+#                       [--checkpoint PATH] [--checkpoint-seconds SECONDS]
+#        python solve.py --jsonl [WORLDS_JSONL] [--workers N] [--unordered] [--algorithm ...] [--heuristic ...]
+#
+# with --jsonl the worlds are read one per line (from the given file or from the standard input) and
+# the solutions are written one per line as soon as they are available.
+# With --checkpoint the search (astar or ucs) is saved to the given file every --checkpoint-seconds
+# (60 by default) and a solver started again with the same file resumes it (see search_checkpoint.py)
+
+DEFAULT_ALGORITHM = "astar"
+DEFAULT_HEURISTIC = "heuristic_func_smart_manhattan"
+
+
+def load_heuristic(name):
+    """
+    returns the heuristic function with the given name defined in heuristic_functions.py
+    """
+    import heuristic_functions
+
+    heuristic_func = getattr(heuristic_functions, name, None)
+    if not name.startswith("heuristic_func") or not callable(heuristic_func):
+        raise ValueError(f"Heuristic {name} not among the ones defined in heuristic_functions.py")
+
+    return heuristic_func
+
+
+def solve_world(world_description, algorithm=DEFAULT_ALGORITHM, heuristic=DEFAULT_HEURISTIC, *, checkpoint=None):
+    """
+    solves the world described with the schema of the JSON files in the data folder (either as
+    a JSON string or as a dict) and returns the solution as a dict with the names of the actions,
+    the total reward, the visited nodes and the search time (in seconds).
+    When there is no solution the agent just climbs out (as the players do).
+    The search is saved to and resumed from the given SearchCheckpoint (only A* and UCS).
+    """
+    if isinstance(world_description, str):
+        world_description = json.loads(world_description)
+
+    search = SEARCH_ALGORITHMS[algorithm]
+    heuristic_func = load_heuristic(heuristic) if algorithm in INFORMED_SEARCH_ALGORITHMS else (lambda state: 0)
+
+    search_start_time = time.perf_counter()
+    problem = HuntWumpusProblem.from_dict(world_description, heuristic_func=heuristic_func)
+    statistics = SearchStatistics()
+    if checkpoint is not None:
+        result = search(problem, statistics, checkpoint=checkpoint)
+    else:
+        result = search(problem, statistics)
+    search_time = time.perf_counter() - search_start_time
+
+    solution = {
+        "actions": [action.name for action in result.sequence_actions] or ["CLIMB"],
+        "reward": result.total_reward if result.sequence_actions else -1,
+        "solved": bool(result.sequence_actions),
+        "visited_nodes": statistics.visited_nodes,
+        "search_time": search_time
+    }
+
+    if statistics.infeasibility_reason is not None:
+        solution["unsolvable_reason"] = statistics.infeasibility_reason
+
+    if "id" in world_description:
+        solution["id"] = world_description["id"]
+
+    return solution
+
+
+def _solve_line(line_number, line, algorithm, heuristic):
+    """
+    solves the world described in the given line of a JSON lines input, errors in the description
+    of the world are reported in the solution instead of stopping the stream
+    """
+    try:
+        solution = solve_world(line, algorithm, heuristic)
+    except (ValueError, KeyError, IndexError, TypeError) as error:
+        solution = {"error": f"{type(error).__name__}: {error}"}
+
+    solution["line"] = line_number
+    return solution
+
+
+def stream_solutions(lines, algorithm=DEFAULT_ALGORITHM, heuristic=DEFAULT_HEURISTIC, *, workers=1, ordered=True):
+    """
+    solves the worlds described in the given JSON lines (one world per line) yielding each solution 
+    (see solve_world, plus the number of the line) as soon as it is available.
+    With more than one worker the worlds are solved in parallel processes, yielding the solutions 
+    in the order of the lines if ordered is True or in order of completion otherwise.
+    At most 2 * workers lines are read in advance, so memory doesn't depend on the input size.
+    """
+    numbered_lines = ((line_number, line) for line_number, line in enumerate(lines, 1) if line.strip())
+
+    if workers <= 1:
+        for line_number, line in numbered_lines:
+            yield _solve_line(line_number, line, algorithm, heuristic)
+        return
+
+    from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+    max_pending_solutions = 2 * workers
+
+    with ProcessPoolExecutor(workers) as executor:
+        if ordered:
+            pending_solutions = deque()
+            for line_number, line in numbered_lines:
+                pending_solutions.append(executor.submit(_solve_line, line_number, line, algorithm, heuristic))
+                while pending_solutions and (pending_solutions[0].done() 
+                                             or len(pending_solutions) >= max_pending_solutions):
+                    yield pending_solutions.popleft().result()
+
+            while pending_solutions:
+                yield pending_solutions.popleft().result()
+        else:
+            pending_solutions = set()
+            for line_number, line in numbered_lines:
+                pending_solutions.add(executor.submit(_solve_line, line_number, line, algorithm, heuristic))
+                if len(pending_solutions) >= max_pending_solutions:
+                    done_solutions, pending_solutions = wait(pending_solutions, return_when=FIRST_COMPLETED)
+                    for solution in done_solutions:
+                        yield solution.result()
+
+            while pending_solutions:
+                done_solutions, pending_solutions = wait(pending_solutions, return_when=FIRST_COMPLETED)
+                for solution in done_solutions:
+                    yield solution.result()
+
+
+def play_solution(world_json, actions):
+    """
+    plays an episode of the wumpus environment performing the given actions (names)
+    """
+    import wumpus as wws
+
+    class PlanPlayer(wws.InformedPlayer, wws.UserPlayer):
+        """Informed player performing a sequence of actions computed in advance."""
+
+        def start_episode(self, world: wws.WumpusWorld):
+            self.sequence_actions = [wws.Hunter.Actions[name] for name in actions]
+
+        def end_episode(self, outcome: int, alive: bool, success: bool):
+            print(self.name + ' says: ' + 'Episode completed, my reward is {}'.format(outcome))
+
+        def play(self, turn: int, percept, actions):
+            return self.sequence_actions[turn]
+
+    world = wws.WumpusWorld.from_JSON(world_json)
+    world.run_episode(PlanPlayer())
+
+
+def parse_arguments(args, options, flags):
+    """
+    parses the command line arguments (by hand, since argparse would double the startup time) 
+    returning the values of the given options (updating their default values), the given flags 
+    found in the arguments and the positional arguments
+    """
+    options = dict(options)
+    found_flags = set()
+    positional_arguments = []
+    arguments = list(args)
+
+    while arguments:
+        argument = arguments.pop(0)
+        if argument in options and arguments:
+            options[argument] = arguments.pop(0)
+        elif argument in flags:
+            found_flags.add(argument)
+        elif not argument.startswith("--"):
+            positional_arguments.append(argument)
+        else:
+            raise ValueError(f"Unknown option {argument}")
+
+    return options, found_flags, positional_arguments
+
+
+def main(*args):
+    try:
+        options, flags, world_paths = parse_arguments(args, 
+                                                      {"--algorithm": DEFAULT_ALGORITHM, 
+                                                       "--heuristic": DEFAULT_HEURISTIC, 
+                                                       "--workers": "1", 
+                                                       "--checkpoint": None, 
+                                                       "--checkpoint-seconds": "60"}, 
+                                                      {"--play", "--quiet", "--jsonl", "--unordered"})
+    except ValueError as error:
+        print(error, file=sys.stderr)
+        return -1
+
+    if "--jsonl" in flags:
+        return _main_jsonl(world_paths, options, flags)
+
+    if len(world_paths) != 1 or options["--algorithm"] not in SEARCH_ALGORITHMS:
+        print("usage: python solve.py WORLD_JSON [--algorithm {}] [--heuristic HEURISTIC] [--play] [--quiet] "
+              "[--checkpoint PATH] [--checkpoint-seconds SECONDS]".format("|".join(SEARCH_ALGORITHMS)), file=sys.stderr)
+        return -1
+
+    checkpoint = None
+    if options["--checkpoint"] is not None:
+        if options["--algorithm"] not in CHECKPOINT_SEARCH_ALGORITHMS:
+            print("Checkpoints are only available for {}".format("|".join(sorted(CHECKPOINT_SEARCH_ALGORITHMS))), 
+                  file=sys.stderr)
+            return -1
+
+        from search_checkpoint import SearchCheckpoint
+        try:
+            checkpoint = SearchCheckpoint(options["--checkpoint"], seconds=float(options["--checkpoint-seconds"]))
+        except ValueError:
+            print(f"Invalid --checkpoint-seconds {options['--checkpoint-seconds']}", file=sys.stderr)
+            return -1
+
+    with open(world_paths[0]) as world_file:
+        world_json = world_file.read()
+
+    try:
+        solution = solve_world(world_json, options["--algorithm"], options["--heuristic"], checkpoint=checkpoint)
+    except ValueError as error:
+        print(error, file=sys.stderr)
+        return -1
+
+    solution_time = time.perf_counter()
+    print(json.dumps(solution))
+
+    if "--quiet" not in flags:
+        print(f"imports: {(IMPORTS_END_TIME - PROCESS_START_TIME) * 1000:.2f} ms, "
+              + f"search: {solution['search_time'] * 1000:.2f} ms, "
+              + f"total: {(solution_time - PROCESS_START_TIME) * 1000:.2f} ms", file=sys.stderr)
+
+    if "--play" in flags:
+        play_solution(world_json, solution["actions"])
+
+    return 0
+
+
+def _main_jsonl(world_paths, options, flags):
+    if (len(world_paths) > 1 or options["--algorithm"] not in SEARCH_ALGORITHMS 
+        or not options["--workers"].isdigit()):
+        print("usage: python solve.py --jsonl [WORLDS_JSONL] [--workers N] [--unordered] "
+              + "[--algorithm {}] [--heuristic HEURISTIC] [--quiet]".format("|".join(SEARCH_ALGORITHMS)), 
+              file=sys.stderr)
+        return -1
+
+    try:
+        if options["--algorithm"] in INFORMED_SEARCH_ALGORITHMS:
+            load_heuristic(options["--heuristic"])
+    except ValueError as error:
+        print(error, file=sys.stderr)
+        return -1
+
+    worlds_file = open(world_paths[0]) if world_paths and world_paths[0] != "-" else sys.stdin
+    solved_worlds = 0
+
+    with worlds_file:
+        for solution in stream_solutions(worlds_file, options["--algorithm"], options["--heuristic"], 
+                                         workers=int(options["--workers"]), 
+                                         ordered="--unordered" not in flags):
+            print(json.dumps(solution), flush=True)
+            solved_worlds += 1
+
+    if "--quiet" not in flags:
+        print(f"imports: {(IMPORTS_END_TIME - PROCESS_START_TIME) * 1000:.2f} ms, "
+              + f"worlds: {solved_worlds}, "
+              + f"total: {(time.perf_counter() - PROCESS_START_TIME) * 1000:.2f} ms", file=sys.stderr)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(*sys.argv[1:]))
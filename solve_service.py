@@ -0,0 +1,298 @@
+import os, sys
+sys.path.insert(1, os.path.join(os.path.dirname(os.path.abspath(__file__)), "modules"))
+
+import asyncio
+import json
+import signal
+import socket
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from search_algorithms import INFORMED_SEARCH_ALGORITHMS, SEARCH_ALGORITHMS
+from solve import DEFAULT_ALGORITHM, DEFAULT_HEURISTIC, load_heuristic, parse_arguments, solve_world
+from solution_cache import world_fingerprint
+
+# Local solving service: it keeps a pool of worker processes ready to search, so the game servers
+# don't pay the startup of a new Python process for every world. The protocol is made of JSON lines,
+# every request line gets exactly one response line:
+#
+#   {"world": {...}, "algorithm": "astar", "heuristic": "heuristic_func_smart_manhattan"}
+#       -> the solution of the world (see solve.solve_world) or {"error": "..."}
+#   {"command": "statistics"}
+#       -> the counters of the service (see SolveService.get_statistics)
+#
+# usage: python solve_service.py serve [--socket PATH | --port PORT] [--workers N]
+#        python solve_service.py solve WORLD_JSON [--socket PATH | --port PORT] [--algorithm ...] [--heuristic ...]
+#        python solve_service.py statistics [--socket PATH | --port PORT]
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+class SolveService(object):
+    """
+    Solves worlds in a pool of worker processes, concurrent requests for the same world (same
+    fingerprint, algorithm and heuristic) are coalesced into a single search:
+    - workers: number
+            the number of worker processes (None means one per CPU), the pool is created again
+            when a worker dies
+    - latency_window: number
+            the number of recent requests used to compute the latency percentiles
+    """
+
+    def __init__(self, workers=None, latency_window=1000):
+        self.workers = workers
+        self.executor = ProcessPoolExecutor(workers)
+        self.started = time.perf_counter()
+        self.requests = 0
+        self.coalesced_requests = 0
+        self.searches = 0
+        self.errors = 0
+        self.total_latency = 0.0
+        self.recent_latencies = deque(maxlen=latency_window)
+        self._pending_solutions = {} # {key: asyncio.Future}
+
+    async def solve(self, world, algorithm=DEFAULT_ALGORITHM, heuristic=DEFAULT_HEURISTIC):
+        """
+        returns the solution of the given world (see solve.solve_world), joining the search
+        already running for the same world if there is one
+        """
+        request_start_time = time.perf_counter()
+        self.requests += 1
+
+        try:
+            # invalid requests fail here, before reaching the workers
+            if algorithm not in SEARCH_ALGORITHMS:
+                raise ValueError(f"Search algorithm {algorithm} not among {', '.join(SEARCH_ALGORITHMS)}")
+            if algorithm in INFORMED_SEARCH_ALGORITHMS:
+                load_heuristic(heuristic)
+            else:
+                heuristic = ""
+
+            key = "|".join([world_fingerprint(world), algorithm, heuristic])
+            solution = self._pending_solutions.get(key)
+
+            if solution is None:
+                executor = self.executor
+                try:
+                    solution = asyncio.get_running_loop().run_in_executor(executor, solve_world, world, algorithm,
+                                                                          heuristic)
+                except BrokenProcessPool:
+                    self._restart_executor(executor)
+                    raise
+                self._pending_solutions[key] = solution
+                solution.add_done_callback(lambda done_solution: self._forget(key, done_solution, executor))
+                self.searches += 1
+            else:
+                self.coalesced_requests += 1
+
+            # a client going away must not cancel the search shared with other clients
+            return await asyncio.shield(solution)
+        except Exception:
+            self.errors += 1
+            raise
+        finally:
+            latency = time.perf_counter() - request_start_time
+            self.total_latency += latency
+            self.recent_latencies.append(latency)
+
+    def get_statistics(self):
+        """
+        returns the counters of the service: requests, coalesced requests, searches, errors,
+        throughput (requests per second) and latency (mean and percentiles of recent requests)
+        """
+        uptime = time.perf_counter() - self.started
+        recent_latencies = sorted(self.recent_latencies)
+
+        def percentile(fraction):
+            if not recent_latencies:
+                return 0.0
+            return recent_latencies[min(len(recent_latencies) - 1, int(fraction * len(recent_latencies)))]
+
+        return {
+            "uptime": uptime,
+            "requests": self.requests,
+            "coalesced_requests": self.coalesced_requests,
+            "searches": self.searches,
+            "pending_searches": len(self._pending_solutions),
+            "errors": self.errors,
+            "throughput": self.requests / uptime if uptime > 0 else 0.0,
+            "mean_latency": self.total_latency / self.requests if self.requests else 0.0,
+            "p50_latency": percentile(0.5),
+            "p99_latency": percentile(0.99),
+            "max_latency": recent_latencies[-1] if recent_latencies else 0.0
+        }
+
+    async def handle_connection(self, reader, writer):
+        """
+        answers the requests (JSON lines) of a client until it closes the connection
+        """
+        try:
+            while line := await reader.readline():
+                if not line.strip():
+                    continue
+
+                response = await self.handle_request(line)
+                writer.write(json.dumps(response).encode("utf-8") + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def handle_request(self, line):
+        try:
+            request = json.loads(line)
+            if request.get("command") == "statistics":
+                return self.get_statistics()
+
+            world = request["world"]
+            algorithm = request.get("algorithm", DEFAULT_ALGORITHM)
+            heuristic = request.get("heuristic", DEFAULT_HEURISTIC)
+        except (ValueError, KeyError, TypeError, AttributeError) as error:
+            # malformed requests never reach solve(), they are counted here
+            self.requests += 1
+            self.errors += 1
+            return {"error": f"{type(error).__name__}: {error}"}
+
+        try:
+            return await self.solve(world, algorithm, heuristic)
+        except Exception as error:
+            # including the errors of the workers (e.g. BrokenProcessPool when one of them dies)
+            return {"error": f"{type(error).__name__}: {error}"}
+
+    def close(self):
+        self.executor.shutdown(cancel_futures=True)
+
+    def _forget(self, key, solution, executor):
+        # later requests for the same world start a new search
+        if self._pending_solutions.get(key) is solution:
+            del self._pending_solutions[key]
+
+        if not solution.cancelled() and isinstance(solution.exception(), BrokenProcessPool):
+            self._restart_executor(executor)
+
+    def _restart_executor(self, executor):
+        # a dead worker breaks the whole pool, the next requests go to a new one
+        if self.executor is executor:
+            executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = ProcessPoolExecutor(self.workers)
+
+
+async def serve(*, socket_path=None, host=DEFAULT_HOST, port=DEFAULT_PORT, workers=None):
+    """
+    runs the solving service on the given Unix socket, or on the given localhost port if no
+    socket path is given, until it is cancelled or it receives SIGTERM
+    """
+    service = SolveService(workers)
+
+    if socket_path is not None:
+        server = await asyncio.start_unix_server(service.handle_connection, path=socket_path)
+    else:
+        server = await asyncio.start_server(service.handle_connection, host=host, port=port)
+
+    serving = asyncio.ensure_future(server.serve_forever())
+    asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, serving.cancel)
+
+    try:
+        async with server:
+            await serving
+    except asyncio.CancelledError:
+        pass
+    finally:
+        service.close()
+        if socket_path is not None and os.path.exists(socket_path):
+            os.remove(socket_path)
+
+
+class SolveClient(object):
+    """
+    Blocking client of the solving service (one request at a time per client)
+    """
+
+    def __init__(self, *, socket_path=None, host=DEFAULT_HOST, port=DEFAULT_PORT, timeout=None):
+        if socket_path is not None:
+            self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._socket.settimeout(timeout)
+            self._socket.connect(socket_path)
+        else:
+            self._socket = socket.create_connection((host, port), timeout=timeout)
+
+        self._file = self._socket.makefile("rwb")
+
+    def solve(self, world, algorithm=DEFAULT_ALGORITHM, heuristic=DEFAULT_HEURISTIC):
+        """
+        returns the solution of the given world (dict or JSON string), see solve.solve_world
+        """
+        if isinstance(world, str):
+            world = json.loads(world)
+
+        return self._send({"world": world, "algorithm": algorithm, "heuristic": heuristic})
+
+    def get_statistics(self):
+        return self._send({"command": "statistics"})
+
+    def close(self):
+        self._file.close()
+        self._socket.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exception):
+        self.close()
+
+    def _send(self, request):
+        self._file.write(json.dumps(request).encode("utf-8") + b"\n")
+        self._file.flush()
+        response = self._file.readline()
+        if not response:
+            raise ConnectionError("The solving service closed the connection")
+
+        return json.loads(response)
+
+
+def main(*args):
+    try:
+        options, flags, arguments = parse_arguments(args,
+                                                    {"--socket": None,
+                                                     "--port": str(DEFAULT_PORT),
+                                                     "--workers": None,
+                                                     "--algorithm": DEFAULT_ALGORITHM,
+                                                     "--heuristic": DEFAULT_HEURISTIC},
+                                                    set())
+        command = arguments[0] if arguments else None
+        port = int(options["--port"])
+        workers = int(options["--workers"]) if options["--workers"] is not None else None
+    except ValueError as error:
+        print(error, file=sys.stderr)
+        return -1
+
+    if command == "serve" and len(arguments) == 1:
+        print(f"Solving service listening on {options['--socket'] or f'{DEFAULT_HOST}:{port}'}", file=sys.stderr)
+        try:
+            asyncio.run(serve(socket_path=options["--socket"], port=port, workers=workers))
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    if command in ("solve", "statistics") and len(arguments) == (2 if command == "solve" else 1):
+        with SolveClient(socket_path=options["--socket"], port=port) as client:
+            if command == "solve":
+                with open(arguments[1]) as world_file:
+                    response = client.solve(world_file.read(), options["--algorithm"], options["--heuristic"])
+            else:
+                response = client.get_statistics()
+
+        print(json.dumps(response))
+        return 0 if "error" not in response else -1
+
+    print("usage: python solve_service.py serve|solve WORLD_JSON|statistics "
+          + "[--socket PATH | --port PORT] [--workers N] [--algorithm ALGORITHM] [--heuristic HEURISTIC]",
+          file=sys.stderr)
+    return -1
+
+
+if __name__ == "__main__":
+    sys.exit(main(*sys.argv[1:]))
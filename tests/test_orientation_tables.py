@@ -0,0 +1,109 @@
+import os, sys
+sys.path.insert(1, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "modules"))
+
+import unittest
+from itertools import product
+
+from linear_space import SmartCoordinate, SmartVector
+import orientation_tables
+
+# Equivalence of the orientation lookup tables (orientation_tables.py) with the helpers they replaced
+# in heuristic_functions.py. The reference helpers below are a verbatim copy of the original ones, so
+# the tables are not only checked against the compute_* functions that fill them.
+
+def _get_orientations_to_reach(to_location, *, from_location):
+    """
+    rerturns the list of vectors aligned to to the destination, from the from_location
+    """
+    #list of vectors reaching the destination                
+    reaching_destination_orientations = []
+
+    if from_location == to_location:
+        return []
+    elif to_location.x == from_location.x: # goal and agent on same row (axes Y)
+        if to_location.y > from_location.y:
+            reaching_destination_orientations.append(SmartVector(0, 1))
+        else:
+            reaching_destination_orientations.append(SmartVector(0, -1))
+    elif to_location.y == from_location.y:
+        if to_location.x > from_location.x:
+            reaching_destination_orientations.append(SmartVector(1, 0))
+        else:
+            reaching_destination_orientations.append(SmartVector(-1, 0))
+    else:
+        y_component = 1 if to_location.y > from_location.y else -1
+        x_component = 1 if to_location.x > from_location.x else -1
+        reaching_destination_orientations.extend([SmartVector(x_component, 0), 
+                                                  SmartVector(0, y_component)])
+
+    return reaching_destination_orientations
+
+def _get_orientations_to_move_away_from(to_location, *, from_location):
+    """
+    rerturns the list of vectors that take you away from the destination
+    """       
+    all_vectors = [SmartVector(1, 0), SmartVector(0, 1), SmartVector(0, -1), SmartVector(-1, 0)]
+    return [vec for vec in all_vectors if vec not in _get_orientations_to_reach(to_location, 
+                                                                                from_location=from_location)]
+def _get_cost_to_orientate_to(to_location, *, from_location, with_orientation):
+    """
+    returns the minimum cost to orientate the agent to point to the destination location
+    """
+    from_orientation = with_orientation
+               
+    reaching_destination_orientations = _get_orientations_to_reach(to_location, from_location=from_location)
+
+    if not reaching_destination_orientations:
+        return 0
+
+    if from_orientation not in reaching_destination_orientations:
+        return (1 if from_orientation.get_perpendicular_vector_clockwise() in reaching_destination_orientations 
+                    or -from_orientation.get_perpendicular_vector_clockwise() in reaching_destination_orientations
+               else 2)
+    else:
+        return 0
+
+
+# every pair of cells of a grid of this size is checked, with every orientation
+GRID_SIZE = 7
+
+LOCATIONS = [SmartCoordinate(x, y) for x in range(GRID_SIZE) for y in range(GRID_SIZE)]
+ORIENTATIONS = [SmartVector(1, 0), SmartVector(0, 1), SmartVector(0, -1), SmartVector(-1, 0)]
+
+
+class OrientationTablesTest(unittest.TestCase):
+
+    def test_orientations_to_reach(self):
+        for from_location, to_location in product(LOCATIONS, LOCATIONS):
+            self.assertEqual(list(orientation_tables.get_orientations_to_reach(to_location, from_location=from_location)),
+                             _get_orientations_to_reach(to_location, from_location=from_location),
+                             (from_location, to_location))
+
+    def test_orientations_to_move_away_from(self):
+        for from_location, to_location in product(LOCATIONS, LOCATIONS):
+            self.assertEqual(list(orientation_tables.get_orientations_to_move_away_from(to_location, 
+                                                                                        from_location=from_location)),
+                             _get_orientations_to_move_away_from(to_location, from_location=from_location),
+                             (from_location, to_location))
+
+    def test_cost_to_orientate_to(self):
+        for from_location, to_location, orientation in product(LOCATIONS, LOCATIONS, ORIENTATIONS):
+            self.assertEqual(orientation_tables.get_cost_to_orientate_to(to_location, from_location=from_location,
+                                                                         with_orientation=orientation),
+                             _get_cost_to_orientate_to(to_location, from_location=from_location,
+                                                       with_orientation=orientation),
+                             (from_location, to_location, orientation))
+
+    def test_cost_to_orientate_to_with_offset(self):
+        # the best neighbour heuristics pass the offset to the adjacent cell instead of a SmartVector
+        for from_location, to_location, orientation in product(LOCATIONS, LOCATIONS, ORIENTATIONS):
+            offset = (from_location + orientation) - from_location
+            self.assertEqual(orientation_tables.get_cost_to_orientate_to(to_location, from_location=from_location,
+                                                                         with_orientation=offset),
+                             _get_cost_to_orientate_to(to_location, from_location=from_location,
+                                                       with_orientation=SmartVector.from_coordinate(offset)),
+                             (from_location, to_location, orientation))
+
+
+if __name__ == "__main__":
+    unittest.main()
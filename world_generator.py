@@ -0,0 +1,57 @@
+import random
+from collections import deque
+
+# Generator of random worlds (using the schema of the JSON files in the data folder), used to
+# benchmark the search algorithms on worlds larger than the ones in the data folder.
+
+def _is_reachable(free_cells, start, destinations):
+    """
+    returns True if all destinations can be reached from start moving through the free cells
+    """
+    visited = {start}
+    frontier = deque([start])
+
+    while frontier:
+        x, y = frontier.popleft()
+        for neighbour in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
+            if neighbour in free_cells and neighbour not in visited:
+                visited.add(neighbour)
+                frontier.append(neighbour)
+
+    return all(destination in visited for destination in destinations)
+
+
+def generate_world(size, *, pit_ratio=0.1, wumpuses=1, golds=1, exits=1, seed=None, max_attempts=100):
+    """
+    returns a random world of the given size (width, height) where the hunter starts in (0, 0)
+    facing north on the first exit and all golds and exits can be reached from the hunter avoiding
+    the pits (wumpuses are placed without checking, they may have to be killed to reach a gold),
+    or None if no such world was generated within max_attempts
+    """
+    generator = random.Random(seed)
+    width, height = size
+
+    for attempt in range(max_attempts):
+        cells = [(x, y) for x in range(width) for y in range(height) if (x, y) != (0, 0)]
+        generator.shuffle(cells)
+
+        exit_locations = [(0, 0)] + cells[:exits - 1]
+        cells = cells[exits - 1:]
+        gold_locations, cells = cells[:golds], cells[golds:]
+        wumpus_locations, cells = cells[:wumpuses], cells[wumpuses:]
+        pit_locations = cells[:int(pit_ratio * width * height)]
+
+        free_cells = set((x, y) for x in range(width) for y in range(height)) - set(pit_locations)
+        if _is_reachable(free_cells, (0, 0), gold_locations + exit_locations):
+            return {
+                "id": f"generated world {width}x{height} (seed {seed}, attempt {attempt})",
+                "size": [width, height],
+                "hunters": [[0, 0, "N"]],
+                "pits": [list(location) for location in pit_locations],
+                "wumpuses": [list(location) for location in wumpus_locations],
+                "exits": [list(location) for location in exit_locations],
+                "golds": [list(location) for location in gold_locations],
+                "blocks": []
+            }
+
+    return None